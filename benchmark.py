@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+无界面性能基准
+在 QT_QPA_PLATFORM=offscreen 下用合成的 tasks.json（1k / 10k / 100k 任务，
+重复规则、完成状态混合）测量启动到首帧、启动到首屏任务绘制、load_tasks、save_tasks、
+check_reminders、自动归档、delete_selected 的耗时及峰值内存，结果写成 JSON，便于对比不同提交。
+
+用法：
+    python benchmark.py                          # 默认 1000 10000 100000
+    python benchmark.py --sizes 1000 --backend sqlite -o bench.json
+    python benchmark.py --formats                # 只比较 JSON 与二进制快照的读写
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from config import ROOT_PATH
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SEED = 20240101
+TIMEOUT = 600          # 单个规模子进程的超时（秒）
+EDIT_RATIO = 0.01      # 保存前修改的任务比例
+DELETE_RATIO = 0.1     # 批量删除的任务比例（不连续的行）
+ARCHIVE_AFTER_DAYS = 20
+
+_qt_objects = []
+
+
+# ========== 数据集 ==========
+def generate_tasks(count, seed=SEED):
+    """合成任务：提醒时间分布在前后 30 天内，约一半已到期，1/4 已完成
+
+    带上 id，与真实数据文件一致，避免首次保存时触发补写 id 的完整快照。
+    """
+    from core.recurrence import REPEAT_OPTIONS
+
+    rng = random.Random(seed)
+    now = int(time.time())
+    tasks = []
+    for i in range(count):
+        remind_at = now + rng.randint(-30 * 86400, 30 * 86400)
+        tasks.append({
+            "id": f"{rng.getrandbits(128):032x}",
+            "text": f"任务 {i} " + "x" * rng.randint(0, 40),
+            "remind_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(remind_at)),
+            "repeat": rng.choice(REPEAT_OPTIONS),
+            "done": rng.random() < 0.25
+        })
+    return tasks
+
+
+def write_dataset(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_tasks(count), f, ensure_ascii=False, indent=2)
+
+
+# ========== 测量工具 ==========
+def peak_rss_bytes():
+    """当前进程的峰值常驻内存（字节），无法获取时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _windows_peak_rss():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def wait_for(signal, timeout_ms=TIMEOUT * 1000):
+    """阻塞运行事件循环直到 signal 发出，超时返回 False"""
+    from PyQt6.QtCore import QEventLoop, QTimer
+
+    loop = QEventLoop()
+    fired = []
+    signal.connect(lambda *args: (fired.append(True), loop.quit()))
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    return bool(fired)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+# ========== 单个规模（子进程） ==========
+def run_one(data_file, backend):
+    """在当前进程中跑一轮，返回各项耗时（毫秒）"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    start_time = time.perf_counter()
+
+    from PyQt6.QtCore import QItemSelection, QItemSelectionModel
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    from views.MainWindow import MainWindow
+
+    data_dir = os.path.dirname(data_file)
+    window = MainWindow(start_time=start_time, data_file=data_file,
+                        db_file=os.path.join(data_dir, "tasks.db"), backend=backend, archive_after_days=0)
+    # 提醒只在下面显式调用时处理，避免加载过程中定时器触发混进加载耗时
+    window.startupFinished.connect(lambda: window.timer.timeout.disconnect())
+    load_start = time.perf_counter()
+    window.show()
+    if not wait_for(window.loadingFinished):
+        raise TimeoutError("加载任务超时")
+    result = {"load_tasks_ms": (time.perf_counter() - load_start) * 1000}
+    app.processEvents()
+    result["first_frame_ms"] = window.first_frame_ms      # 启动到窗口首帧
+    result["first_paint_ms"] = window.first_paint_ms      # 启动到首屏任务绘制
+    result["tasks"] = len(window.tasks)
+    window.finish_startup()
+
+    # 保存：修改一部分任务后立即写盘；再单独测一次完整快照
+    rng = random.Random(SEED)
+    model = window.task_model
+    for row in rng.sample(range(len(window.tasks)), int(len(window.tasks) * EDIT_RATIO)):
+        task = window.tasks.at(row)
+        model.update_task(task.id, done=not task.done)
+    result["save_tasks_ms"] = timed(window.save_tasks)
+    result["compact_ms"] = timed(lambda: (window.store.compact(), window.store.flush()))
+
+    # 提醒：第一次处理全部已到期任务，第二次应几乎为零
+    result["check_reminders_ms"] = timed(window.check_reminders)
+    result["check_reminders_idle_ms"] = timed(window.check_reminders)
+
+    # 归档：提醒时间早于 20 天的已完成任务（约占 1/24）写入归档并移出列表
+    window.archive_after_days = ARCHIVE_AFTER_DAYS
+    start = time.perf_counter()
+    window.archive_done_tasks()
+    if not wait_for(window.archiveFinished):
+        raise TimeoutError("归档超时")
+    result["archive_ms"] = (time.perf_counter() - start) * 1000
+    result["archived"] = result["tasks"] - len(window.tasks)
+
+    # 批量删除不连续的行
+    rows = sorted(rng.sample(range(len(window.tasks)), int(len(window.tasks) * DELETE_RATIO)))
+    selection = QItemSelection()
+    for row in rows:
+        index = model.index(row)
+        selection.select(index, index)
+    window.task_list.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+    result["delete_selected_ms"] = timed(window.delete_selected)
+    result["deleted"] = len(rows)
+    result["save_after_delete_ms"] = timed(window.save_tasks)
+
+    window.store.close()
+    result["peak_rss_bytes"] = peak_rss_bytes()
+    # Qt 对象保留到 os._exit：offscreen 平台下析构托盘图标偶尔会段错误
+    _qt_objects.extend((app, window))
+    return result
+
+
+# ========== 快照格式 ==========
+def run_formats(sizes):
+    """JSON 快照与二进制快照的写入、加载（二进制为惰性）、全部解码耗时及文件大小"""
+    from core.binary_snapshot import BinaryStore, write_snapshot
+    from core.journal import JournalStore
+    from core.storage import atomic_write_text
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="todo-bench-") as tmp:
+        for size in sizes:
+            print(f"正在比较快照格式 {size} 个任务 ...", flush=True)
+            tasks = generate_tasks(size)
+            json_file = os.path.join(tmp, f"{size}.json")
+            binary_file = os.path.join(tmp, f"{size}.bin")
+            result = {
+                "size": size,
+                "json_write_ms": timed(lambda: atomic_write_text(json_file, json.dumps(tasks, ensure_ascii=False))),
+                "binary_write_ms": timed(lambda: write_snapshot(binary_file, tasks)),
+                "json_bytes": os.path.getsize(json_file),
+                "binary_bytes": os.path.getsize(binary_file),
+            }
+            for name, store in (("json", JournalStore(json_file)), ("binary", BinaryStore(binary_file))):
+                loaded = []
+                result[f"{name}_load_ms"] = timed(lambda: [loaded.extend(chunk) for chunk in store.iter_tasks()])
+                result[f"{name}_decode_all_ms"] = timed(lambda: [task.text for task in loaded])
+                store.close()
+            results.append(result)
+            print("  " + ", ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                                   for k, v in result.items()))
+    return results
+
+
+# ========== 汇总 ==========
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_PATH,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, backend):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="todo-bench-") as tmp:
+        for size in sizes:
+            size_dir = os.path.join(tmp, str(size))
+            os.makedirs(size_dir)
+            data_file = os.path.join(size_dir, "tasks.json")
+            write_dataset(data_file, size)
+            print(f"正在测试 {size} 个任务 ({backend}) ...", flush=True)
+
+            # 每个规模单独起一个进程，首帧耗时和峰值内存互不影响
+            env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-one", data_file, "--backend", backend],
+                cwd=ROOT_PATH, env=env, capture_output=True, text=True, timeout=TIMEOUT
+            )
+            lines = process.stdout.strip().splitlines()
+            if process.returncode != 0 or not lines:
+                print(f"测试失败 ({size}):", process.stderr.strip())
+                results.append({"size": size, "error": process.stderr.strip()[-2000:]})
+                continue
+            result = json.loads(lines[-1])
+            result["size"] = size
+            results.append(result)
+            print("  " + ", ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                                   for k, v in result.items()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TodoList 无界面性能基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="数据集任务数")
+    parser.add_argument("--backend", choices=["journal", "sqlite", "binary"], default="journal", help="存储后端")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="结果 JSON 文件")
+    parser.add_argument("--formats", action="store_true", help="只比较 JSON 与二进制快照格式")
+    parser.add_argument("--run-one", metavar="DATA_FILE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        result = run_one(args.run_one, args.backend)
+        print(json.dumps(result), flush=True)
+        # 跳过 Qt 对象析构，避免关闭窗口时的确认对话框
+        os._exit(0)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    if args.formats:
+        report["results"] = run_formats(args.sizes)
+    else:
+        report["backend"] = args.backend
+        report["results"] = run_suite(args.sizes, args.backend)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入: {os.path.abspath(args.output)}")
+    return all("error" not in r for r in report["results"])
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+命令行客户端（不导入 Qt）
+有实例在运行时把请求交给它（core/ipc.py），界面随之刷新；否则直接读写存储。
+
+用法：
+    python cli.py add "写周报" --at "2024-01-05 17:00" --repeat 每周
+    python cli.py list [--all] [--query 周报] [--json]
+    python cli.py done 3f2a9c1b [更多 id 或 id 前缀...]
+    python cli.py import tasks.json        # JSON 数组（字段同 add）或每行一条任务的文本
+    python cli.py --timeout 600 import big.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from config import DATA_FILE, DB_FILE, IPC_BULK_TIMEOUT_S, IPC_TIMEOUT_S, STORAGE_BACKEND
+from core import ipc
+from core.commands import execute, format_task_line
+from core.history import EventLog, completion_events
+from core.recurrence import REPEAT_OPTIONS
+
+
+def read_import_file(path):
+    """JSON 数组（元素为任务字典或文字）或纯文本（每个非空行一条任务）"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        content = f.read()
+    if content.lstrip().startswith("["):
+        items = json.loads(content)
+    else:
+        items = [line.strip() for line in content.splitlines() if line.strip()]
+    return [{"text": item} if isinstance(item, str) else item for item in items]
+
+
+def build_request(args):
+    if args.command == "add":
+        return {"cmd": "add", "text": args.text, "remind_time": args.at, "repeat": args.repeat}
+    if args.command == "list":
+        return {"cmd": "list", "all": args.all, "query": args.query}
+    if args.command == "done":
+        return {"cmd": "complete", "ids": args.ids}
+    return {"cmd": "import", "tasks": read_import_file(args.file)}
+
+
+def request_timeout(args):
+    if args.timeout is not None:
+        return args.timeout
+    return IPC_BULK_TIMEOUT_S if args.command == "import" else IPC_TIMEOUT_S
+
+
+def execute_local(request):
+    """没有实例在运行：直接加载存储执行，修改写回后退出"""
+    from core.storage import create_storage
+    from core.tasks import TaskManager
+
+    store = create_storage(STORAGE_BACKEND, DATA_FILE, DB_FILE)
+    try:
+        manager = TaskManager()
+        for chunk in store.iter_tasks():
+            manager.extend(chunk)
+        manager.add_listener(store.record)
+        completions = []
+        manager.add_listener(lambda records: completions.extend(completion_events(records)))
+        response = execute(manager, request)
+        # 进程马上退出，写盘失败不会再重试：必须确认写入后才报告成功
+        if not store.flush():
+            raise OSError(f"保存任务失败: {store.error}")
+        EventLog(os.path.join(os.path.dirname(os.fspath(DATA_FILE)), "completions.jsonl")).append(completions)
+    finally:
+        store.close()
+    return response
+
+
+def print_response(args, response):
+    if args.command == "add":
+        print("已添加:", format_task_line(response["task"]))
+    elif args.command == "list":
+        if args.json:
+            print(json.dumps(response["tasks"], ensure_ascii=False, indent=2))
+        else:
+            for task in response["tasks"]:
+                print(format_task_line(task))
+    elif args.command == "done":
+        print(f"已完成 {len(response['ids'])} 个任务")
+    else:
+        print(f"已导入 {response['count']} 个任务")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="待办事项命令行客户端")
+    parser.add_argument("--timeout", type=float,
+                        help=f"等待运行中实例响应的秒数，默认 {IPC_TIMEOUT_S}（import 为 {IPC_BULK_TIMEOUT_S}）")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="添加任务")
+    add.add_argument("text", help="任务内容")
+    add.add_argument("--at", help="提醒时间 yyyy-MM-dd HH:mm，默认现在")
+    add.add_argument("--repeat", choices=REPEAT_OPTIONS, help="重复周期")
+
+    show = commands.add_parser("list", help="列出任务（按提醒时间）")
+    show.add_argument("--all", action="store_true", help="包括已完成的任务")
+    show.add_argument("--query", default="", help="只列出包含这些词的任务")
+    show.add_argument("--json", action="store_true", help="输出 JSON")
+
+    done = commands.add_parser("done", help="标记任务完成")
+    done.add_argument("ids", nargs="+", help="任务 id 或 id 前缀（list 中显示的 8 位）")
+
+    load = commands.add_parser("import", help="批量导入任务")
+    load.add_argument("file", help="JSON 数组或每行一条任务的文本文件")
+
+    args = parser.parse_args(argv)
+    try:
+        request = build_request(args)
+        timeout = request_timeout(args)
+        # 实例尚在加载任务时请求会排队，至少等待批量命令的时长
+        response = ipc.request(ipc.server_name(DATA_FILE), request, timeout=timeout,
+                               pending_timeout=max(timeout, IPC_BULK_TIMEOUT_S))
+        if response is None:
+            response = execute_local(request)
+    except TimeoutError as e:
+        print("执行失败:", e, "（请求可能仍在执行；可用 --timeout 加长等待）", file=sys.stderr)
+        return 1
+    except (OSError, ValueError) as e:
+        print("执行失败:", e, file=sys.stderr)
+        return 1
+
+    if not response.get("ok"):
+        print("执行失败:", response.get("error"), file=sys.stderr)
+        return 1
+    print_response(args, response)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,5 +5,59 @@ ROOT_PATH = Path(__file__).parent
 SRC_PATH = ROOT_PATH / 'src'
 IMG_PATH = SRC_PATH / 'img'
 DATA_FILE = SRC_PATH / 'data' / 'tasks.json'
+DB_FILE = SRC_PATH / 'data' / 'tasks.db'
 PYTHON_PATH = Path(sys.executable).parent
-PYINSTALLER_PATH = PYTHON_PATH / 'pyinstaller'
\ No newline at end of file
+PYINSTALLER_PATH = PYTHON_PATH / 'pyinstaller'
+
+# 保存防抖：连续编辑在该时间窗口内合并为一次后台写入
+SAVE_DEBOUNCE_MS = 500
+# 写盘失败后重试的间隔，失败的修改保留在内存中直到写入成功
+SAVE_RETRY_MS = 10000
+# 变更日志超过该大小后在后台压缩为新的 tasks.json 快照
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# 存储后端："journal"（tasks.json + 变更日志）、"sqlite"（tasks.db）或 "binary"（tasks.bin 二进制快照 + 变更日志），
+# 后两者首次启动时自动迁移 tasks.json
+STORAGE_BACKEND = "journal"
+
+# 启动时分块加载：首块约为一屏，之后每块的任务数
+LOAD_FIRST_CHUNK = 50
+LOAD_CHUNK_SIZE = 2000
+
+# 归档：完成且提醒时间早于该天数的任务移入 data/archive/ 下的 gzip 分段（0 表示不归档）
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_SEGMENT_BYTES = 1024 * 1024
+
+# 提醒通知：首条到期后等待该时长，期间到期的提醒合并为一条；
+# 最多连续弹出 NOTIFY_BURST 条，之后每 NOTIFY_INTERVAL_S 秒最多一条（其余排队合并）
+NOTIFY_WINDOW_MS = 1000
+NOTIFY_INTERVAL_S = 10
+NOTIFY_BURST = 3
+
+# 专注计时器（番茄钟）默认时长（分钟）
+FOCUS_MINUTES = 25
+
+# 主题："light"、"dark" 或 "auto"（跟随系统）
+THEME = "light"
+
+# 多设备同步：网盘同步的共享目录（None 表示不同步），每隔 SYNC_INTERVAL_S 秒以及本地修改后
+# SYNC_DEBOUNCE_MS 毫秒交换一轮增量；本地同步状态每 SYNC_CHECKPOINT_ROUNDS 轮写一次检查点
+SYNC_DIR = None
+SYNC_INTERVAL_S = 30
+SYNC_DEBOUNCE_MS = 2000
+SYNC_CHECKPOINT_ROUNDS = 20
+
+# 命令行客户端等待运行中实例响应的秒数；import 等批量命令以及实例尚在加载任务时使用更长的等待
+IPC_TIMEOUT_S = 5
+IPC_BULK_TIMEOUT_S = 120
+
+# 冷启动预算：--profile-startup 时窗口首帧超过该耗时即视为超标（退出码 1）
+STARTUP_BUDGET_MS = 1500
+
+# 性能统计（默认关闭；环境变量 TODO_METRICS=1 也可开启）
+METRICS_ENABLED = False
+# 统计文件：.prom 结尾写 Prometheus 文本，否则追加 JSON Lines
+METRICS_FILE = SRC_PATH / 'data' / 'metrics.jsonl'
+METRICS_DUMP_INTERVAL_S = 60
+# 界面线程超过该时长没有响应即记为一次卡顿
+STALL_THRESHOLD_MS = 200
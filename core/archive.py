@@ -0,0 +1,175 @@
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+from core.tasks import format_time
+
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{6})\.jsonl\.gz$")
+
+
+def _segment_name(number):
+    return f"segment-{number:06d}.jsonl.gz"
+
+
+def _read_segment(path, offset=0):
+    """读取一个归档段中从字节偏移 offset（某个 gzip 成员的起点）开始的记录，返回 (记录列表, 是否读完整)
+
+    段尾不完整（写入中途崩溃，或另一个进程正在写）时返回已读到的部分。
+    """
+    records = []
+    try:
+        with open(path, "rb") as raw:
+            raw.seek(offset)
+            with gzip.open(raw, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        return records, False
+    except (OSError, EOFError, zlib.error) as e:
+        print("读取归档失败:", path, e)
+        return records, False
+    return records, True
+
+
+class TaskArchive:
+    """已完成任务的归档层：与数据文件同目录下的 archive/ 中，若干只追加的 gzip 分段
+
+    每次归档 / 恢复把一批记录写成一个独立的 gzip 成员追加到当前分段末尾并落盘，
+    分段超过 segment_bytes 后换新分段。记录格式与变更日志相似：
+        {"op": "archive", "id": ..., "task": {...}, "archived_at": ...}
+        {"op": "restore", "id": ...}
+    读取时按顺序回放，已恢复的任务不再出现；同一任务重复归档以最后一次为准。
+    回放结果缓存在内存中：之后只解码新追加的 gzip 成员（包括其他进程写入的），
+    分段被替换或截短时才重新回放全部分段，搜索不随归档历史增长而变慢。
+    不依赖 Qt，方法可在任意线程调用。
+    """
+
+    def __init__(self, directory, segment_bytes=1024 * 1024):
+        self.directory = os.fspath(directory)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._current = None   # 本进程中确认可以继续追加的分段路径
+        self._read_sizes = {}  # 已回放的分段路径 -> 回放到的字节数
+        self._live = {}        # 仍在归档中的任务：id -> 任务字典（含 archived_at），按归档顺序
+        self._texts = {}       # id -> 小写文字，供搜索
+
+    # ========== 写入 ==========
+    def append(self, tasks, archived_at=None):
+        """归档一批任务字典（含 id），返回归档的数量"""
+        archived_at = format_time(time.time() if archived_at is None else archived_at)
+        records = [{"op": "archive", "id": task["id"], "task": {k: v for k, v in task.items() if k != "id"},
+                    "archived_at": archived_at} for task in tasks]
+        self._write(records)
+        return len(records)
+
+    def restore(self, task_ids):
+        """登记这些任务已移回任务列表"""
+        self._write([{"op": "restore", "id": task_id} for task_id in task_ids])
+
+    def _write(self, records):
+        if not records:
+            return
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+        with self._lock:
+            path = self._writable_segment()
+            with open(path, "ab") as f:
+                f.write(gzip.compress(data))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _writable_segment(self):
+        if self._current is not None and os.path.getsize(self._current) < self.segment_bytes:
+            return self._current
+
+        os.makedirs(self.directory, exist_ok=True)
+        segments = self.segments()
+        path = segments[-1] if segments else None
+        # 本进程第一次写入时检查最后一个分段是否完整，损坏的分段不再追加，免得后面的记录也读不出来
+        if path is None or os.path.getsize(path) >= self.segment_bytes or not self._is_intact(path):
+            number = int(SEGMENT_PATTERN.match(os.path.basename(path)).group(1)) + 1 if path else 1
+            path = os.path.join(self.directory, _segment_name(number))
+        self._current = path
+        return path
+
+    @staticmethod
+    def _is_intact(path):
+        try:
+            with gzip.open(path, "rb") as f:
+                while f.read(1024 * 1024):
+                    pass
+            return True
+        except (OSError, EOFError, zlib.error):
+            return False
+
+    # ========== 读取 ==========
+    def segments(self):
+        """按编号排列的分段路径"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directory, name) for name in sorted(names) if SEGMENT_PATTERN.match(name)]
+
+    def entries(self):
+        """仍在归档中的任务字典（含 id、archived_at），按归档顺序"""
+        with self._lock:
+            self._refresh()
+            return [dict(entry) for entry in self._live.values()]
+
+    def search(self, query="", limit=None):
+        """按文字搜索归档（空白分隔多个词，与关系，不区分大小写），最近归档的在前"""
+        terms = query.lower().split()
+        results = []
+        with self._lock:
+            self._refresh()
+            texts = self._texts
+            for task_id in reversed(self._live):
+                text = texts[task_id]
+                if all(term in text for term in terms):
+                    results.append(dict(self._live[task_id]))
+                    if limit is not None and len(results) >= limit:
+                        break
+        return results
+
+    def _refresh(self):
+        """回放自上次读取以来新增的记录（调用方持有 _lock）"""
+        sizes = {}
+        for path in self.segments():
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                continue
+        read = self._read_sizes
+        # 只有已读分段原样保留、至多变长时才能增量回放，否则从头回放
+        if any(path not in sizes or sizes[path] < size for path, size in read.items()) or \
+                (read and any(path < max(read) for path in sizes if path not in read)):
+            read.clear()
+            self._live.clear()
+            self._texts.clear()
+        last = max(sizes, default=None)
+        for path, size in sizes.items():
+            offset = read.get(path, 0)
+            if size > offset:
+                records, intact = _read_segment(path, offset)
+                self._apply(records)
+                # 最后一个分段不完整时可能还在写入，下次从同一位置重读（重复回放同一段记录结果不变）；
+                # 之前的分段已不会再追加，读到多少算多少
+                if intact or path != last:
+                    read[path] = size
+
+    def _apply(self, records):
+        live, texts = self._live, self._texts
+        for record in records:
+            if record.get("op") == "archive":
+                task_id = record["id"]
+                live.pop(task_id, None)
+                live[task_id] = {"id": task_id, **record["task"], "archived_at": record["archived_at"]}
+                texts[task_id] = live[task_id]["text"].lower()
+            elif record.get("op") == "restore":
+                live.pop(record["id"], None)
+                texts.pop(record["id"], None)
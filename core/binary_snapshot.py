@@ -0,0 +1,426 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from core.journal import JournalStore, apply_record, read_journal, read_tasks
+from core.recurrence import NO_REPEAT
+from core.storage import TASK_FIELDS
+from core.tasks import Task, format_time, parse_time
+
+# 文件布局（小端）：
+#   文件头    HEADER
+#   重复规则表 repeat_count 个 (u16 长度 + UTF-8)
+#   任务记录  count 个定长 RECORD，从 records_offset 开始
+#   字符串表  任务文字等变长数据，从 strings_offset 开始，记录中以 (偏移, 长度) 引用
+MAGIC = b"TDB1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIQQ")      # magic, version, 保留, count, repeat_count, records_offset, strings_offset
+RECORD = struct.Struct("<16sqIIHBx")     # id, remind_at, text 偏移, text 长度, repeat 序号, flags
+REF = struct.Struct("<II8x")             # 不是 32 位十六进制的 id：16 字节中存放 (偏移, 长度)
+
+FLAG_DONE = 0x01
+FLAG_ID_IN_TABLE = 0x02   # id 存在字符串表中
+FLAG_RAW_TIME = 0x04      # remind_time 无法与 epoch 互转（如夏令时缺失的时刻），原样存入字符串表，remind_at = 偏移 << 16 | 长度
+
+_TEXT_SLOT = Task.__dict__["text"]
+
+
+def _encode(text):
+    return text.encode("utf-8", "surrogatepass")
+
+
+def _decode(data):
+    return data.decode("utf-8", "surrogatepass")
+
+
+def _raw_id(task_id):
+    """32 位小写十六进制 id（new_task_id 生成的格式）压缩为 16 字节，其余返回 None"""
+    if len(task_id) != 32:
+        return None
+    try:
+        raw = bytes.fromhex(task_id)
+    except ValueError:
+        return None
+    return raw if raw.hex() == task_id else None
+
+
+_MINUTES = {f"{i:02d}": i for i in range(60)}
+
+
+class _EpochCache:
+    """按小时缓存 mktime 结果：同一小时内的时间只需加上分秒，省去逐条 mktime / strftime"""
+
+    def __init__(self):
+        self._hours = {}
+
+    def _hour(self, prefix):
+        base = parse_time(prefix + ":00:00")
+        # 整个小时都能与 epoch 无损互转才缓存（夏令时切换所在的小时逐条检查）
+        if base is None or format_time(base) != prefix + ":00:00" or format_time(base + 3599) != prefix + ":59:59":
+            return None
+        return base
+
+    def to_epoch(self, text):
+        """能无损还原为 text 的 epoch 秒，否则返回 None"""
+        prefix = text[:13]
+        base = self._hours.get(prefix, False)
+        if base is False:
+            base = self._hours[prefix] = self._hour(prefix)
+        minute, second = _MINUTES.get(text[14:16]), _MINUTES.get(text[17:19])
+        if base is not None and len(text) == 19 and text[13] == text[16] == ":" \
+                and minute is not None and second is not None:
+            return base + minute * 60 + second
+
+        remind_at = parse_time(text)
+        if remind_at is None or format_time(remind_at) != text:
+            return None
+        return remind_at
+
+
+# ========== 写入 ==========
+def encode_snapshot(tasks):
+    """任务字典序列 -> 快照字节"""
+    epochs = _EpochCache()
+    repeats = {}
+    records = []
+    strings = bytearray()
+
+    def add_string(value):
+        data = _encode(value)
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    count = 0
+    for task in tasks:
+        flags = FLAG_DONE if task.get("done") else 0
+
+        task_id = task["id"]
+        raw = _raw_id(task_id)
+        if raw is None:
+            raw = REF.pack(*add_string(task_id))
+            flags |= FLAG_ID_IN_TABLE
+
+        remind_time = task["remind_time"]
+        remind_at = epochs.to_epoch(remind_time)
+        if remind_at is None:
+            offset, length = add_string(remind_time)
+            remind_at = offset << 16 | length
+            flags |= FLAG_RAW_TIME
+
+        repeat = task.get("repeat", NO_REPEAT)
+        repeat_index = repeats.setdefault(repeat, len(repeats))
+        text_offset, text_length = add_string(task["text"])
+        records.append(RECORD.pack(raw, remind_at, text_offset, text_length, repeat_index, flags))
+        count += 1
+
+    repeat_table = bytearray()
+    for repeat in repeats:
+        data = _encode(repeat)
+        repeat_table += struct.pack("<H", len(data)) + data
+
+    records_offset = HEADER.size + len(repeat_table)
+    records_offset += -records_offset % 8
+    strings_offset = records_offset + count * RECORD.size
+    header = HEADER.pack(MAGIC, VERSION, 0, count, len(repeats), records_offset, strings_offset)
+
+    padding = b"\0" * (records_offset - HEADER.size - len(repeat_table))
+    return b"".join([header, bytes(repeat_table), padding, b"".join(records), bytes(strings)])
+
+
+def write_snapshot(path, tasks):
+    write_snapshot_bytes(path, encode_snapshot(tasks))
+
+
+def write_snapshot_bytes(path, data):
+    """原子写入二进制快照（先写临时文件并落盘，再 rename 覆盖）"""
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".bin", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# ========== 读取 ==========
+class BinarySnapshot:
+    """用 mmap 打开的二进制快照，按序号随用随解码
+
+    id、提醒时间、完成状态、重复规则可以批量读出（不解码文字）；
+    文字只在 text(i) 被调用时才从字符串表解码。
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.lock = threading.Lock()
+        self._lazy = []            # 引用本快照文字的 LazyTask，关闭前需要全部解码
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if len(self._map) < HEADER.size:
+            raise ValueError("二进制快照文件不完整")
+
+        magic, version, _, self.count, repeat_count, self.records_offset, self.strings_offset = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("不支持的二进制快照格式")
+
+        self.repeats = []
+        pos = HEADER.size
+        for _ in range(repeat_count):
+            (length,) = struct.unpack_from("<H", self._map, pos)
+            self.repeats.append(_decode(self._map[pos + 2:pos + 2 + length]))
+            pos += 2 + length
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """解码所有尚未读取的文字后关闭映射（Windows 上映射中的文件无法被替换）"""
+        with self.lock:
+            for task in self._lazy:
+                task._materialize()
+            self._lazy = []
+            if isinstance(self._map, mmap.mmap):
+                self._map.close()
+            self._map = None
+
+    def _string(self, offset, length):
+        start = self.strings_offset + offset
+        return _decode(self._map[start:start + length])
+
+    def _unpack(self, raw, remind_at, flags):
+        if flags & FLAG_ID_IN_TABLE:
+            task_id = self._string(*REF.unpack(raw))
+        else:
+            task_id = raw.hex()
+        if flags & FLAG_RAW_TIME:
+            remind_time = self._string(remind_at >> 16, remind_at & 0xFFFF)
+            remind_at = parse_time(remind_time)
+            if remind_at is None:
+                remind_at = int(time.time())
+        return task_id, remind_at
+
+    def records(self):
+        """逐条产出 (序号, id, remind_at, repeat, done)，不解码文字"""
+        # 复制记录区（每条 36 字节），迭代期间不占用映射，随时可以关闭
+        data = self._map[self.records_offset:self.strings_offset]
+        repeats = self.repeats
+        for index, (raw, remind_at, _, _, repeat, flags) in enumerate(RECORD.iter_unpack(data)):
+            task_id, remind_at = self._unpack(raw, remind_at, flags)
+            yield index, task_id, remind_at, repeats[repeat], bool(flags & FLAG_DONE)
+
+    def text(self, index):
+        _, _, offset, length, _, _ = RECORD.unpack_from(self._map, self.records_offset + index * RECORD.size)
+        return self._string(offset, length)
+
+    def task(self, index):
+        """完整解码为与 tasks.json 相同的任务字典"""
+        raw, remind_at, offset, length, repeat, flags = \
+            RECORD.unpack_from(self._map, self.records_offset + index * RECORD.size)
+        if flags & FLAG_RAW_TIME:
+            remind_time = self._string(remind_at >> 16, remind_at & 0xFFFF)
+        else:
+            remind_time = format_time(remind_at)
+        task_id, _ = self._unpack(raw, 0, flags & ~FLAG_RAW_TIME)
+        return {
+            "id": task_id,
+            "text": self._string(offset, length),
+            "remind_time": remind_time,
+            "repeat": self.repeats[repeat],
+            "done": bool(flags & FLAG_DONE)
+        }
+
+    def tasks(self):
+        for index in range(self.count):
+            yield self.task(index)
+
+    def lazy_task(self, index, task_id, remind_at, repeat, done):
+        task = LazyTask.__new__(LazyTask)
+        task.id = task_id
+        task.remind_at = remind_at
+        task.repeat = repeat
+        task.done = done
+        task.notified = False
+        task.focus_time_spent = 0
+        task._source = self
+        task._index = index
+        self._lazy.append(task)
+        return task
+
+
+class LazyTask(Task):
+    """文字在第一次读取时才从快照中解码的任务"""
+
+    __slots__ = ("_source", "_index")
+
+    @property
+    def text(self):
+        try:
+            return _TEXT_SLOT.__get__(self, LazyTask)
+        except AttributeError:
+            pass
+        with self._source.lock:
+            return self._materialize()
+
+    @text.setter
+    def text(self, value):
+        _TEXT_SLOT.__set__(self, value)
+
+    def _materialize(self):
+        try:
+            return _TEXT_SLOT.__get__(self, LazyTask)
+        except AttributeError:
+            value = self._source.text(self._index)
+            _TEXT_SLOT.__set__(self, value)
+            return value
+
+
+# ========== 格式转换 ==========
+def json_to_binary(json_path, binary_path):
+    """tasks.json（及其变更日志）-> 二进制快照，返回任务数"""
+    tasks, _ = read_tasks(os.fspath(json_path))
+    write_snapshot(binary_path, tasks.values())
+    return len(tasks)
+
+
+def binary_to_json(binary_path, json_path):
+    """二进制快照 -> tasks.json（与 JournalStore 压缩后的格式相同），返回任务数"""
+    from core.storage import atomic_write_text
+    import json
+
+    snapshot = BinarySnapshot(binary_path)
+    try:
+        tasks = [{field: task[field] for field in ("id",) + TASK_FIELDS} for task in snapshot.tasks()]
+    finally:
+        snapshot.close()
+    atomic_write_text(json_path, json.dumps(tasks, ensure_ascii=False, indent=2))
+    return len(tasks)
+
+
+class BinaryStore(JournalStore):
+    """二进制快照 + 追加式日志
+
+    tasks.bin 为快照，tasks.bin.journal 为变更日志（格式同 JournalStore）。
+    加载时快照中没有被日志修改过的任务以 LazyTask 形式产出，文字等到显示时再解码；
+    后台线程只保存相对快照的修改（overlay），压缩时按快照顺序合并写出新快照。
+    首次使用时若快照不存在而 tasks.json 存在，会自动转换。
+    """
+
+    def __init__(self, snapshot_path, json_path=None, compact_threshold=256 * 1024):
+        self.json_path = json_path
+        self._snapshot = None
+        self._index = {}      # id -> 快照中的序号
+        self._overlay = {}    # id -> 修改后的任务字典，None 表示已删除；新增任务按插入顺序排在最后
+        super().__init__(snapshot_path, os.fspath(snapshot_path) + ".journal", compact_threshold)
+
+    # ========== 加载 ==========
+    def load(self):
+        return [task.to_dict() | {"id": task.id} for chunk in self.iter_tasks() for task in chunk]
+
+    def iter_chunks(self, first_size=50, chunk_size=2000):
+        for chunk in self.iter_tasks(first_size, chunk_size):
+            yield [task.to_dict() | {"id": task.id} for task in chunk]
+
+    def iter_tasks(self, first_size=50, chunk_size=2000):
+        try:
+            self._prepare()
+            by_id = {}
+            for record in read_journal(self.journal_path):
+                by_id.setdefault(record["id"], []).append(record)
+            if os.path.exists(self.journal_path):
+                self._journal_size = os.path.getsize(self.journal_path)
+
+            chunk, size = [], first_size
+            if self._snapshot is not None:
+                snapshot = self._snapshot
+                for index, task_id, remind_at, repeat, done in snapshot.records():
+                    self._index[task_id] = index
+                    records = by_id.pop(task_id, None)
+                    if records is None:
+                        chunk.append(snapshot.lazy_task(index, task_id, remind_at, repeat, done))
+                    else:
+                        current = {task_id: snapshot.task(index)}
+                        for record in records:
+                            apply_record(current, record)
+                        self._overlay[task_id] = current.get(task_id)
+                        chunk.extend(Task.from_dict(item) for item in current.values())
+                    if len(chunk) >= size:
+                        yield chunk
+                        chunk, size = [], chunk_size
+
+            # 快照之后新增的任务
+            for records in by_id.values():
+                current = {}
+                for record in records:
+                    apply_record(current, record)
+                for task_id, item in current.items():
+                    self._overlay[task_id] = item
+                    chunk.append(Task.from_dict(item))
+            yield chunk
+        finally:
+            self._loaded.set()
+
+    def watch_path(self):
+        # 二进制快照不是给外部编辑的格式，不监视
+        return None
+
+    def _prepare(self):
+        if not os.path.exists(self.snapshot_path) and self.json_path and os.path.exists(self.json_path):
+            json_to_binary(self.json_path, self.snapshot_path)
+        if os.path.exists(self.snapshot_path):
+            self._snapshot = BinarySnapshot(self.snapshot_path)
+
+    # ========== 后台线程 ==========
+    def _apply(self, record):
+        task_id = record["id"]
+        if record["op"] != "add" and task_id not in self._overlay and task_id in self._index:
+            self._overlay[task_id] = self._snapshot.task(self._index[task_id])
+        current = {task_id: self._overlay[task_id]} if self._overlay.get(task_id) else {}
+        apply_record(current, record)
+        self._overlay[task_id] = current.get(task_id)
+
+    def _merged(self):
+        """快照与 overlay 合并后的任务字典，保持原有顺序"""
+        if self._snapshot is not None:
+            for index, task_id, _, _, _ in self._snapshot.records():
+                if task_id in self._overlay:
+                    task = self._overlay[task_id]
+                    if task is not None:
+                        yield task
+                else:
+                    yield self._snapshot.task(index)
+        for task_id, task in self._overlay.items():
+            if task is not None and task_id not in self._index:
+                yield task
+
+    def _compact(self):
+        data = encode_snapshot(self._merged())
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        write_snapshot_bytes(self.snapshot_path, data)
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self._journal_size = 0
+
+        self._snapshot = BinarySnapshot(self.snapshot_path)
+        self._index = {task_id: index for index, task_id, _, _, _ in self._snapshot.records()}
+        self._overlay = {}
+        self._snapshot_commits = self._batches_written
+
+    def _shutdown(self):
+        if self._snapshot is not None:
+            self._snapshot.close()
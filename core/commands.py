@@ -0,0 +1,96 @@
+import time
+
+from core.recurrence import NO_REPEAT, REPEAT_OPTIONS
+from core.tasks import Task, parse_time
+
+
+def new_task(item, now=None):
+    """命令行 / 导入的任务字典 -> Task（新 id）
+
+    item: {"text", "remind_time"（可选，yyyy-MM-dd HH:mm[:ss]，默认现在）, "repeat"（可选）, "done"（可选）}
+    """
+    text = str(item.get("text", "")).strip()
+    if not text:
+        raise ValueError("任务内容不能为空")
+
+    remind_time = item.get("remind_time")
+    if remind_time:
+        remind_time = str(remind_time).strip()
+        remind_at = parse_time(remind_time if len(remind_time) > 16 else remind_time + ":00")
+        if remind_at is None:
+            raise ValueError(f"无法识别的时间: {remind_time}")
+    else:
+        remind_at = time.time() if now is None else now
+
+    repeat = item.get("repeat") or NO_REPEAT
+    if repeat not in REPEAT_OPTIONS:
+        raise ValueError(f"不支持的重复周期: {repeat}（可选: {'、'.join(REPEAT_OPTIONS)}）")
+    return Task(text, remind_at, repeat, bool(item.get("done", False)))
+
+
+def task_to_dict(task):
+    return {"id": task.id, **task.to_dict()}
+
+
+def list_tasks(manager, query="", include_done=False):
+    """按提醒时间排列的任务字典；query 按空白拆成多个词（与关系），不区分大小写"""
+    terms = query.lower().split()
+    tasks = [task for task in manager
+             if (include_done or not task.done) and all(term in task.text.lower() for term in terms)]
+    tasks.sort(key=lambda task: task.remind_at)
+    return [task_to_dict(task) for task in tasks]
+
+
+def resolve_ids(manager, prefixes):
+    """id 或 id 前缀 -> 完整 id；找不到或有歧义时抛出 ValueError"""
+    ids = []
+    candidates = None
+    for prefix in prefixes:
+        if manager.get(prefix) is not None:
+            ids.append(prefix)
+            continue
+        if candidates is None:
+            candidates = [task.id for task in manager]
+        matches = [task_id for task_id in candidates if task_id.startswith(prefix)]
+        if not matches:
+            raise ValueError(f"找不到任务: {prefix}")
+        if len(matches) > 1:
+            raise ValueError(f"任务 id 前缀有歧义: {prefix}")
+        ids.append(matches[0])
+    return ids
+
+
+def format_task_line(task):
+    """命令行中显示的一行：短 id、时间、重复、完成状态、文字"""
+    mark = "✓" if task["done"] else " "
+    repeat = "" if task["repeat"] == NO_REPEAT else f" [{task['repeat']}]"
+    return f"{task['id'][:8]}  {task['remind_time']}  {mark} {task['text']}{repeat}"
+
+
+def execute(manager, request, add_tasks=None, update_tasks=None):
+    """执行一条 add / import / list / complete 请求，返回响应字典（见 core/ipc.py）
+
+    修改经由 add_tasks / update_tasks 完成，默认直接改 manager；界面中传入模型的方法，列表随之刷新。
+    """
+    add_tasks = add_tasks or manager.add_tasks
+    update_tasks = update_tasks or manager.update_many
+    cmd = request.get("cmd")
+    try:
+        if cmd == "add":
+            task = new_task(request)
+            add_tasks([task])
+            return {"ok": True, "task": task_to_dict(task)}
+        if cmd == "import":
+            now = time.time()
+            tasks = [new_task(item, now) for item in request.get("tasks", [])]
+            add_tasks(tasks)
+            return {"ok": True, "count": len(tasks)}
+        if cmd == "list":
+            return {"ok": True, "tasks": list_tasks(manager, request.get("query", ""), request.get("all", False))}
+        if cmd == "complete":
+            task_ids = resolve_ids(manager, request.get("ids", []))
+            update_tasks([(task_id, {"done": True}) for task_id in task_ids])
+            return {"ok": True, "ids": task_ids}
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": False, "error": f"未知的命令: {cmd}"}
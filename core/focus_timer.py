@@ -0,0 +1,146 @@
+import math
+import time
+
+from core.history import EventLog
+from core.tasks import format_time, parse_time
+
+# 默认专注时长（秒）
+DEFAULT_DURATION = 25 * 60
+# 短于该时长的中途停止不记录
+MIN_SESSION_SECONDS = 60
+
+
+class FocusTimer:
+    """专注计时器（番茄钟），不依赖 Qt
+
+    运行时只记录 time.monotonic 的截止时间，剩余时间每次按 截止时间 - 现在 重新计算，
+    不逐秒递减，定时器晚到、系统休眠都不会累积误差。界面只在显示的秒数变化时
+    （next_tick_delay）刷新，并在截止时间（remaining）处理完成。
+    时间可以传入 clock / wall 替换。
+    """
+
+    def __init__(self, duration=DEFAULT_DURATION, clock=time.monotonic, wall=time.time):
+        self.duration = duration
+        self.clock = clock
+        self.wall = wall
+        self.task_id = None
+        self._deadline = None      # 运行中：monotonic 截止时间
+        self._remaining = None     # 暂停中：冻结的剩余秒数
+        self._started_at = None    # 本次专注开始的墙上时间（写入记录）
+
+    # ========== 状态 ==========
+    def is_active(self):
+        """运行中或暂停中"""
+        return self.task_id is not None
+
+    def is_running(self):
+        return self._deadline is not None
+
+    def remaining(self):
+        """剩余秒数（浮点，不小于 0）；未开始时为完整时长"""
+        if self._deadline is not None:
+            return max(self._deadline - self.clock(), 0.0)
+        if self._remaining is not None:
+            return self._remaining
+        return float(self.duration)
+
+    def elapsed(self):
+        return self.duration - self.remaining()
+
+    def display_seconds(self):
+        """界面显示的秒数：向上取整，剩余 0.2 秒时仍显示 00:01"""
+        return math.ceil(self.remaining())
+
+    def next_tick_delay(self):
+        """距离显示的秒数下一次变化的秒数；未运行时返回 None"""
+        if self._deadline is None:
+            return None
+        remaining = self.remaining()
+        return remaining - (math.ceil(remaining) - 1) if remaining > 0 else 0.0
+
+    # ========== 控制 ==========
+    def start(self, task_id, duration=None):
+        """开始专注；已有进行中的专注时先停止，返回它的记录（可能为 None）"""
+        session = self.stop() if self.is_active() else None
+        if duration is not None:
+            self.duration = duration
+        self.task_id = task_id
+        self._started_at = self.wall()
+        self._remaining = None
+        self._deadline = self.clock() + self.duration
+        return session
+
+    def pause(self):
+        if self._deadline is not None:
+            self._remaining = self.remaining()
+            self._deadline = None
+
+    def resume(self):
+        if self.is_active() and self._deadline is None:
+            self._deadline = self.clock() + self._remaining
+            self._remaining = None
+
+    def stop(self):
+        """中途停止，返回已专注部分的记录；不足 MIN_SESSION_SECONDS 时返回 None"""
+        session = self._session(completed=False) if self.is_active() else None
+        self._reset()
+        if session is not None and session["seconds"] < MIN_SESSION_SECONDS:
+            return None
+        return session
+
+    def finish(self):
+        """时间到时调用：返回完整的专注记录并回到未开始状态；尚未到时返回 None"""
+        if not self.is_running() or self.remaining() > 0:
+            return None
+        session = self._session(completed=True)
+        self._reset()
+        return session
+
+    def _session(self, completed):
+        return {"task": self.task_id, "start": format_time(self._started_at),
+                "seconds": int(round(self.elapsed())), "completed": completed}
+
+    def _reset(self):
+        self.task_id = None
+        self._deadline = None
+        self._remaining = None
+        self._started_at = None
+
+
+def valid_session(session):
+    return bool(session.get("task")) and parse_time(session.get("start")) is not None
+
+
+class FocusLog(EventLog):
+    """专注记录：数据文件旁只追加的 JSON Lines，每行一次专注
+        {"task": id, "start": "yyyy-MM-dd HH:mm:ss", "seconds": 1500, "completed": true}
+
+    任务的 focus_time_spent 由记录累加得到，不写入任务数据文件，
+    记一次专注只追加一行并落盘，不需要重写 tasks.json。
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._seconds = {}     # task_id -> 累计专注秒数
+
+    def load(self):
+        """读取全部记录，返回 {task_id: 累计秒数}"""
+        seconds = {}
+        for session in self.read():
+            if valid_session(session):
+                seconds[session["task"]] = seconds.get(session["task"], 0) + int(session.get("seconds", 0))
+        with self._lock:
+            self._seconds = seconds
+            return dict(seconds)
+
+    def append_session(self, session):
+        """追加一次专注并落盘，返回该任务新的累计秒数"""
+        self.append([session])
+        with self._lock:
+            total = self._seconds.get(session["task"], 0) + session["seconds"]
+            self._seconds[session["task"]] = total
+            return total
+
+    def seconds(self, task_id):
+        with self._lock:
+            return self._seconds.get(task_id, 0)
@@ -0,0 +1,175 @@
+import datetime
+from bisect import bisect_left
+
+from core.search import day_range
+
+# 批量删除 / 移动的任务数超过总数的 1/_BULK_RATIO 时，整体过滤、合并比逐个插入删除（每次都要搬移列表）快
+_BULK_RATIO = 64
+
+OVERDUE, TODAY, UPCOMING, DONE = range(4)
+GROUP_NAMES = ("已过期", "今天", "以后", "已完成")
+
+
+class TaskGroups:
+    """按提醒时间排序的任务分组：已过期 / 今天 / 以后 / 已完成，不依赖 Qt
+
+    按自然日划分：完成的任务在“已完成”，未完成的按提醒时间落在今天之前、今天、今天之后。
+    每组是按 (remind_at, id) 排序的列表，用 bisect 定位；任务的时间或完成状态变化时
+    只从原组删除、插入新组的对应位置（move），不重排其他任务。
+    跨过零点时各组之间只有整段移动（day_moves + move_block），同样不整体重建。
+    修改分组的方法都先用只读的方法（position、locate、day_moves）算出位置，
+    调用方（列表模型）据此发出行变化的通知后再执行修改。
+    """
+
+    def __init__(self, now=None):
+        self.groups = [[] for _ in GROUP_NAMES]
+        self._keys = {}      # id -> (组, key)
+        self.set_day(now)
+
+    def set_day(self, now=None):
+        now = now or datetime.datetime.now()
+        self.day = now.date()
+        self.today_start, self.tomorrow_start = day_range(now)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, task_id):
+        return task_id in self._keys
+
+    # ========== 查询 ==========
+    def group_of(self, task):
+        if task.done:
+            return DONE
+        if task.remind_at < self.today_start:
+            return OVERDUE
+        if task.remind_at < self.tomorrow_start:
+            return TODAY
+        return UPCOMING
+
+    def task_id(self, group, index):
+        return self.groups[group][index][1]
+
+    def position(self, task_id):
+        """(组, 组内序号)，不在分组中时返回 None"""
+        entry = self._keys.get(task_id)
+        if entry is None:
+            return None
+        group, key = entry
+        return group, bisect_left(self.groups[group], key)
+
+    def locate(self, task):
+        """按任务当前的字段应处的位置 (组, 序号)；序号是从原位置删除之后的插入位置"""
+        group = self.group_of(task)
+        key = (task.remind_at, task.id)
+        index = bisect_left(self.groups[group], key)
+        old = self._keys.get(task.id)
+        if old is not None and old[0] == group and old[1] < key:
+            index -= 1
+        return group, index
+
+    # ========== 修改 ==========
+    def rebuild(self, tasks):
+        self.groups = [[] for _ in GROUP_NAMES]
+        self._keys = {}
+        self.extend(tasks)
+
+    def extend(self, tasks):
+        """批量加入：每组把新的部分排好序后接在末尾再排序，Timsort 合并两段有序数据是线性的"""
+        added = [[] for _ in GROUP_NAMES]
+        for task in tasks:
+            if task.id in self._keys:
+                continue
+            group = self.group_of(task)
+            key = (task.remind_at, task.id)
+            added[group].append(key)
+            self._keys[task.id] = (group, key)
+        for group, keys in enumerate(added):
+            if keys:
+                keys.sort()
+                self.groups[group].extend(keys)
+                self.groups[group].sort()
+
+    def subset(self, task_ids):
+        """只含 task_ids 的分组：结果较多时顺序扫描现有分组，较少时只排序这些任务"""
+        groups = TaskGroups.__new__(TaskGroups)
+        groups.day, groups.today_start, groups.tomorrow_start = self.day, self.today_start, self.tomorrow_start
+        if len(task_ids) * 8 > len(self._keys):
+            groups.groups = [[key for key in keys if key[1] in task_ids] for keys in self.groups]
+        else:
+            groups.groups = [[] for _ in GROUP_NAMES]
+            for task_id in task_ids:
+                entry = self._keys.get(task_id)
+                if entry is not None:
+                    groups.groups[entry[0]].append(entry[1])
+            for keys in groups.groups:
+                keys.sort()
+        groups._keys = {key[1]: (group, key) for group, keys in enumerate(groups.groups) for key in keys}
+        return groups
+
+    def add(self, task):
+        """加入任务，返回 (组, 序号)"""
+        group, index = self.locate(task)
+        key = (task.remind_at, task.id)
+        self.groups[group].insert(index, key)
+        self._keys[task.id] = (group, key)
+        return group, index
+
+    def remove(self, task_id):
+        """删除任务，返回原来的 (组, 序号)，不在分组中时返回 None"""
+        position = self.position(task_id)
+        if position is not None:
+            del self.groups[position[0]][position[1]]
+            del self._keys[task_id]
+        return position
+
+    def remove_many(self, task_ids):
+        """批量删除：数量较多时每组顺序过滤一次"""
+        task_ids = {task_id for task_id in task_ids if task_id in self._keys}
+        if len(task_ids) * _BULK_RATIO <= len(self._keys):
+            for task_id in task_ids:
+                self.remove(task_id)
+            return
+        for keys in self.groups:
+            keys[:] = [key for key in keys if key[1] not in task_ids]
+        for task_id in task_ids:
+            del self._keys[task_id]
+
+    def move(self, task):
+        """按任务当前的字段移到新位置，返回 (原位置, 新位置)"""
+        return self.remove(task.id), self.add(task)
+
+    def move_many(self, tasks):
+        """批量换位置：数量较多时整体删除后再合并加入，不逐个插入"""
+        if len(tasks) * _BULK_RATIO <= len(self._keys):
+            for task in tasks:
+                self.move(task)
+            return
+        self.remove_many(task.id for task in tasks)
+        self.extend(tasks)
+
+    # ========== 跨日 ==========
+    def day_moves(self, now):
+        """切换到 now 所在的一天需要的整段移动 [(原组, 个数, 新组)]，按顺序执行，每段都是
+        原组开头的若干个任务移到新组末尾；日期后退（系统时间被调回）时返回 None，需要 rebuild
+
+        日期前进时：今天和以后开头早于新一天的任务依次接到已过期末尾（它们都晚于原有的已过期任务），
+        以后开头属于新一天的任务接到今天末尾（今天此时已经移空）。
+        """
+        if now.date() < self.day:
+            return None
+        today_start, tomorrow_start = day_range(now)
+        today, upcoming = self.groups[TODAY], self.groups[UPCOMING]
+        to_overdue = bisect_left(today, (today_start,))
+        upcoming_overdue = bisect_left(upcoming, (today_start,))
+        upcoming_today = bisect_left(upcoming, (tomorrow_start,), upcoming_overdue) - upcoming_overdue
+        moves = [(TODAY, to_overdue, OVERDUE), (UPCOMING, upcoming_overdue, OVERDUE),
+                 (UPCOMING, upcoming_today, TODAY)]
+        return [move for move in moves if move[1]]
+
+    def move_block(self, source, count, target):
+        block = self.groups[source][:count]
+        del self.groups[source][:count]
+        self.groups[target].extend(block)
+        for key in block:
+            self._keys[key[1]] = (target, key)
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+
+from core.tasks import format_time, parse_time
+
+
+class EventLog:
+    """只追加的 JSON Lines 事件记录（专注、完成等），每条一行，写入后落盘
+
+    写入中途崩溃留下的不完整行在读取时跳过，下一次写入前先补一个换行。
+    read_from 从给定字节偏移读到最后一个完整行，供统计增量读取。
+    方法可在任意线程调用。
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._checked = False  # 是否已确认文件以换行结尾
+
+    def append(self, events):
+        if not events:
+            return
+        data = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events).encode("utf-8")
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                if not self._checked:
+                    self._checked = True
+                    if f.tell() > 0 and not _ends_with_newline(self.path):
+                        data = b"\n" + data
+                try:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except OSError:
+                    # 可能只写入了一部分：重试前重新检查结尾的换行
+                    self._checked = False
+                    raise
+
+    def read(self):
+        return self.read_from(0)[0]
+
+    def read_from(self, offset):
+        """返回 (offset 之后完整行中的事件列表, 读到的位置)；文件不存在时为 ([], 0)"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        end = data.rfind(b"\n") + 1
+        lines = [line for line in data[:end].splitlines() if line.strip()]
+        try:
+            # 通常每行都完整：拼成一个数组一次解析
+            events = json.loads(b"[" + b",".join(lines) + b"]")
+        except ValueError:
+            events = []
+            for line in lines:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+        return [event for event in events if isinstance(event, dict)], offset + end
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def completion_events(records, now=None):
+    """TaskManager 变更记录中本机“标记完成”的部分 -> completions.jsonl 的事件
+
+    同步或外部修改带来的完成（"remote" 记录）已由完成它的设备记录，不重复计入。
+    """
+    completed_at = format_time(time.time() if now is None else now)
+    return [{"task": record["id"], "time": completed_at}
+            for record in records if record["op"] == "done" and record["value"] and not record.get("remote")]
+
+
+class CompletionTimes:
+    """每个任务最近一次标记完成的时间（epoch 秒），供归档按完成时间计算任务的“年龄”
+
+    refresh 从 completions.jsonl 增量读入（只读上次之后新增的行）；note 登记本次运行中
+    刚完成、可能尚未写入日志的任务。方法可在任意线程调用。
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._times = {}
+
+    def note(self, task_id, completed_at):
+        with self._lock:
+            if completed_at > self._times.get(task_id, 0):
+                self._times[task_id] = completed_at
+
+    def refresh(self):
+        with self._lock:
+            events, self._offset = self.log.read_from(self._offset)
+        for event in events:
+            completed_at = parse_time(event.get("time"))
+            if completed_at is not None and event.get("task"):
+                self.note(event["task"], completed_at)
+
+    def get(self, task_id):
+        """最近一次完成的时间；没有记录（例如在有完成日志之前完成的任务）时返回 None"""
+        with self._lock:
+            return self._times.get(task_id)
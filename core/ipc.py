@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# 单实例通信：一次连接一个请求，请求和响应各为一行 JSON（UTF-8）
+#   请求 {"cmd": "add" | "list" | "complete" | "import" | "show", ...}
+#   响应 {"ok": true, ...} 或 {"ok": false, "error": "..."}
+#   实例尚未加载完时先回一行 {"pending": true}，加载完成后再写最终响应
+# 客户端不依赖 Qt；服务端为 views/InstanceServer.py（QLocalServer）。
+
+
+def server_name(data_file):
+    """按数据文件区分实例：同一份数据只允许一个窗口"""
+    digest = hashlib.sha1(os.path.abspath(os.fspath(data_file)).encode("utf-8")).hexdigest()[:12]
+    return f"fluent-todo-{digest}"
+
+
+def server_address(name):
+    """QLocalServer 实际监听的地址：Windows 为命名管道，其余为临时目录下的 Unix 套接字"""
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+def encode(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def decode(line):
+    return json.loads(line.decode("utf-8"))
+
+
+def request(name, message, timeout=5.0, pending_timeout=60.0):
+    """向运行中的实例发送请求并返回响应；没有实例在运行时返回 None
+
+    timeout 为等待响应的秒数；实例回复 pending（请求已排队，等待任务加载完）后改为等待 pending_timeout 秒。
+    超时抛出 TimeoutError，此时请求可能仍会被执行。Windows 命名管道不支持超时，一直等待。
+    """
+    address = server_address(name)
+    try:
+        if sys.platform == "win32":
+            with open(address, "r+b", buffering=0) as pipe:
+                pipe.write(encode(message))
+                return _read_response(pipe.read)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(address)
+            try:
+                sock.sendall(encode(message))
+                return _read_response(lambda size: sock.recv(size), lambda: sock.settimeout(pending_timeout))
+            except socket.timeout:
+                raise TimeoutError(f"实例在 {sock.gettimeout():g} 秒内没有响应") from None
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+
+def _read_response(read, on_pending=None):
+    """读取响应行，跳过 pending 行"""
+    data = bytearray()
+    while True:
+        end = data.find(b"\n")
+        if end < 0:
+            chunk = read(64 * 1024)
+            if not chunk:
+                raise ConnectionError("实例在响应前断开了连接")
+            data += chunk
+            continue
+        response = decode(bytes(data[:end + 1]))
+        del data[:end + 1]
+        if not response.get("pending"):
+            return response
+        if on_pending is not None:
+            on_pending()
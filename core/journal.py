@@ -0,0 +1,309 @@
+import json
+import os
+
+from core.storage import TaskStorage, TASK_FIELDS, atomic_write_text, iter_json_array, new_task_id
+
+
+def apply_record(tasks, record):
+    """把一条变更记录应用到 {id: task} 上；重复回放是幂等的"""
+    op = record["op"]
+    task_id = record["id"]
+    if op == "add":
+        task = dict(record["task"])
+        task["id"] = task_id
+        tasks[task_id] = task
+    elif op == "set":
+        task = tasks.get(task_id)
+        if task is not None:
+            task[record["field"]] = record["value"]
+    elif op == "done":
+        task = tasks.get(task_id)
+        if task is not None:
+            task["done"] = bool(record["value"])
+    elif op == "del":
+        tasks.pop(task_id, None)
+
+
+def file_signature(path):
+    """(修改时间, 大小)，用于区分自己写入的快照与外部修改；文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _edit_key(record):
+    op = record["op"]
+    if op == "set":
+        return record["id"], record["field"]
+    if op == "done":
+        return record["id"], "done"
+    return record["id"], op
+
+
+def journal_path_for(snapshot_path):
+    return os.path.splitext(os.fspath(snapshot_path))[0] + ".journal"
+
+
+def _normalize(task, assign_id=True):
+    """补全旧版 tasks.json 缺少的字段，返回是否缺少 id；assign_id 为 False 时不补写 id"""
+    missing_id = not task.get("id")
+    if missing_id and assign_id:
+        task["id"] = new_task_id()
+    task.setdefault("repeat", "不重复")
+    task.setdefault("done", False)
+    return missing_id
+
+
+def read_journal(journal_path):
+    records = []
+    if os.path.exists(journal_path):
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # 上次写入被中断留下的半行，忽略
+                    continue
+    return records
+
+
+def read_tasks(snapshot_path, journal_path=None):
+    """读取快照并回放日志，返回 ({id: task}, 是否需要补写 id)"""
+    if journal_path is None:
+        journal_path = journal_path_for(snapshot_path)
+    tasks = {}
+    needs_compact = False
+
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        for task in snapshot:
+            needs_compact |= _normalize(task)
+            tasks[task["id"]] = task
+
+    for record in read_journal(journal_path):
+        apply_record(tasks, record)
+
+    return tasks, needs_compact
+
+
+# 外部任务字典的字段 -> (允许的类型, 是否必需)
+_EXTERNAL_FIELDS = {"id": (str, False), "text": (str, True), "remind_time": (str, True),
+                    "repeat": (str, False), "done": (bool, False)}
+
+
+def _check_external(tasks):
+    """外部写入的内容格式不对时抛出 ValueError，整个文件不合并"""
+    if not isinstance(tasks, list):
+        raise ValueError("顶层不是任务数组")
+    for i, task in enumerate(tasks, 1):
+        if not isinstance(task, dict):
+            raise ValueError(f"第 {i} 个任务不是对象")
+        for field, (kind, required) in _EXTERNAL_FIELDS.items():
+            if field not in task:
+                if required:
+                    raise ValueError(f"第 {i} 个任务缺少 {field}")
+            elif not isinstance(task[field], kind):
+                raise ValueError(f"第 {i} 个任务的 {field} 类型错误")
+
+
+def read_snapshot(path):
+    """读取被外部修改的 tasks.json，返回 (文件签名, 任务字典列表)
+
+    读取前后签名不一致（对方还在写）时返回 (None, None)，稍后重试；
+    内容不是合法的任务数组（任何一个任务缺少字段或类型错误）时抛出 ValueError。
+    没有 id 的任务保持没有 id，合并时再按内容与现有任务对应（见 core/merge.match_ids）。
+    """
+    signature = file_signature(path)
+    if signature is None:
+        return None, None
+    with open(path, "r", encoding="utf-8") as f:
+        tasks = json.load(f)
+    if file_signature(path) != signature:
+        return None, None
+    _check_external(tasks)
+    for task in tasks:
+        _normalize(task, assign_id=False)
+    return signature, tasks
+
+
+class JournalStore(TaskStorage):
+    """追加式日志存储
+
+    tasks.json 为最近一次快照，同目录的 tasks.journal 按行追加 JSON 变更记录：
+        {"op": "add", "id": ..., "task": {...}}
+        {"op": "set", "id": ..., "field": "text", "value": ...}
+        {"op": "done", "id": ..., "value": true}
+        {"op": "del", "id": ...}
+    加载时在快照上回放日志；日志超过阈值后在后台线程压缩为新快照。
+    没有 id 的旧版 tasks.json 会在加载时补上 id 并重写快照。
+
+    同时记录快照之后的本地修改（local_edits）和快照文件签名，供合并外部修改使用；
+    快照被外部修改且尚未合并时不压缩，免得覆盖外部的内容。
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, compact_threshold=256 * 1024):
+        self.snapshot_path = os.fspath(snapshot_path)
+        self.journal_path = os.fspath(journal_path or journal_path_for(snapshot_path))
+        self.compact_threshold = compact_threshold
+
+        self._tasks = {}           # 后台线程维护的镜像状态 {id: task}
+        self._journal_size = 0
+        self._torn = False         # 上次追加日志失败，文件末尾可能有半行
+
+        self._edits = {}           # (id, 字段 / "add" / "del") -> 所在的提交批次号，0 为加载时日志中已有的
+        self._commits = 0          # 已提交的批次数（界面线程）
+        self._snapshot_commits = -1  # 最近一次快照已包含的批次数（后台线程）
+        self._pruned_at = -1       # _edits 上次按哪一次快照清理过
+        self._signature = None     # 最近一次读取 / 写入的快照文件签名
+        super().__init__()
+
+    # ========== 本地修改与外部修改 ==========
+    def watch_path(self):
+        return self.snapshot_path
+
+    def snapshot_signature(self):
+        return self._signature
+
+    def adopt_snapshot(self, signature):
+        """外部修改已合并进内存：之后以该文件为快照，允许再次压缩"""
+        self._signature = signature
+
+    def local_edits(self):
+        """快照之后尚未压缩进快照的本地修改 {id: {字段 / "add" / "del"}}（界面线程调用）"""
+        self._prune_edits()
+        edits = {}
+        for task_id, field in self._edits:
+            edits.setdefault(task_id, set()).add(field)
+        return edits
+
+    def _prune_edits(self):
+        """丢弃已压缩进快照的本地修改，每次压缩之后只清理一遍"""
+        snapshot = self._snapshot_commits
+        if snapshot != self._pruned_at:
+            self._pruned_at = snapshot
+            self._edits = {key: mark for key, mark in self._edits.items() if mark > snapshot}
+
+    def _mark_journal(self, records):
+        if self.watch_path() is None:
+            return
+        for record in records:
+            self._edits[_edit_key(record)] = 0
+
+    def record(self, records):
+        # 不监视外部修改的后端（二进制快照）用不到本地修改记录
+        if self.watch_path() is not None:
+            mark = self._commits + 1
+            for record in records:
+                self._edits[_edit_key(record)] = mark
+        super().record(records)
+
+    def commit(self):
+        if self._pending:
+            self._commits += 1
+        self._prune_edits()
+        super().commit()
+
+    # ========== 加载 ==========
+    def load(self):
+        """读取快照并回放日志，返回按顺序排列的任务字典列表"""
+        self._signature = file_signature(self.snapshot_path)
+        self._mark_journal(read_journal(self.journal_path))
+        tasks, needs_compact = read_tasks(self.snapshot_path, self.journal_path)
+        if os.path.exists(self.journal_path):
+            self._journal_size = os.path.getsize(self.journal_path)
+
+        self._tasks = tasks
+        self._loaded.set()
+        if needs_compact:
+            self.compact()
+        return [dict(task) for task in tasks.values()]
+
+    def iter_chunks(self, first_size=50, chunk_size=2000):
+        """流式读取快照，边读边回放该任务相关的日志记录，分块产出"""
+        tasks = {}
+        needs_compact = False
+        try:
+            # 日志有压缩阈值，总是很小，先按任务分组
+            self._signature = file_signature(self.snapshot_path)
+            by_id = {}
+            journal = read_journal(self.journal_path)
+            self._mark_journal(journal)
+            for record in journal:
+                by_id.setdefault(record["id"], []).append(record)
+            if os.path.exists(self.journal_path):
+                self._journal_size = os.path.getsize(self.journal_path)
+
+            chunk, size = [], first_size
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    for task in iter_json_array(f):
+                        needs_compact |= _normalize(task)
+                        current = {task["id"]: task}
+                        for record in by_id.pop(task["id"], ()):
+                            apply_record(current, record)
+                        for item in current.values():
+                            tasks[item["id"]] = item
+                            chunk.append(dict(item))
+                        if len(chunk) >= size:
+                            yield chunk
+                            chunk, size = [], chunk_size
+
+            # 快照之后新增的任务
+            for records in by_id.values():
+                current = {}
+                for record in records:
+                    apply_record(current, record)
+                for item in current.values():
+                    tasks[item["id"]] = item
+                    chunk.append(dict(item))
+            yield chunk
+        finally:
+            self._tasks = tasks
+            self._loaded.set()
+            if needs_compact:
+                self.compact()
+
+    # ========== 后台线程 ==========
+    def _needs_compact(self):
+        return self._journal_size >= self.compact_threshold
+
+    def _write(self, records):
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        if self._torn:
+            # 上次写入失败可能留下半行：另起一行再重写这批记录（回放是幂等的）
+            data = "\n" + data
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            self._torn = True
+            raise
+        self._torn = False
+        self._journal_size += len(data.encode("utf-8"))
+        for record in records:
+            self._apply(record)
+
+    def _apply(self, record):
+        """把已写入日志的记录应用到镜像状态"""
+        apply_record(self._tasks, record)
+
+    def _compact(self):
+        """先原子写入新快照再清空日志；中途崩溃时重放日志仍得到相同结果"""
+        if self._signature is not None and file_signature(self.snapshot_path) != self._signature:
+            # 快照被外部修改且尚未合并，不覆盖；变更继续留在日志中
+            return
+        tasks = [{field: task.get(field) for field in ("id",) + TASK_FIELDS} for task in self._tasks.values()]
+        atomic_write_text(self.snapshot_path, json.dumps(tasks, ensure_ascii=False, indent=2))
+        self._signature = file_signature(self.snapshot_path)
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self._journal_size = 0
+        self._snapshot_commits = self._batches_written
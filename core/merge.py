@@ -0,0 +1,88 @@
+from core.storage import new_task_id
+from core.tasks import parse_time
+
+# 本地修改记录中的字段名 -> Task 属性
+_FIELDS = {"text": "text", "remind_time": "remind_at", "repeat": "repeat", "done": "done"}
+
+
+def _content_key(item):
+    return item["text"], item["remind_time"], item.get("repeat", "不重复"), bool(item.get("done"))
+
+
+def match_ids(manager, theirs):
+    """给外部快照中没有 id 的任务补上 id（原地修改）
+
+    手工编辑的 tasks.json 可能不带 id，每次读取都生成新 id 会让合并把这些任务当作删除后重新添加。
+    依次沿用内容完全相同、其次文字相同的本地任务的 id（每个本地任务只用一次），都没有时才生成新 id。
+    """
+    missing = [item for item in theirs if not item.get("id")]
+    if not missing:
+        return
+    claimed = {item["id"] for item in theirs if item.get("id")}
+    by_content, by_text = {}, {}
+    for task in reversed(list(manager)):      # 倒序加入，pop() 时按原顺序取出
+        if task.id not in claimed:
+            by_content.setdefault(_content_key(task.to_dict()), []).append(task.id)
+            by_text.setdefault(task.text, []).append(task.id)
+
+    def take(candidates):
+        while candidates:
+            task_id = candidates.pop()
+            if task_id not in claimed:
+                claimed.add(task_id)
+                return task_id
+        return None
+
+    unmatched = []
+    for item in missing:
+        item["id"] = take(by_content.get(_content_key(item), []))
+        if item["id"] is None:
+            unmatched.append(item)
+    for item in unmatched:
+        item["id"] = take(by_text.get(item["text"], [])) or new_task_id()
+
+
+def merge_external(manager, theirs, local_edits):
+    """外部快照与内存中任务的逐任务差异，返回 (新增任务字典, [(id, 字段字典)], 删除的 id)
+
+    local_edits 为快照之后的本地修改 {id: {字段 / "add" / "del"}}（见 JournalStore.local_edits）。
+    没有 id 的外部任务先按内容与本地任务对应（见 match_ids）。冲突规则固定为本地优先：
+    - 两边都有的任务：本地改过的字段保留本地值，其余字段取外部的值；
+    - 只有外部有：本地删过的保持删除，否则新增（按外部顺序追加在末尾）；
+    - 只有本地有：本地新增或改过的保留，否则删除。
+    """
+    match_ids(manager, theirs)
+    added, changes, removed = [], [], []
+    seen = set()
+    for item in theirs:
+        task_id = item["id"]
+        if task_id in seen:
+            continue
+        seen.add(task_id)
+        edits = local_edits.get(task_id, ())
+        task = manager.get(task_id)
+        if task is None:
+            if "del" not in edits:
+                added.append(item)
+            continue
+
+        fields = {}
+        for field, attr in _FIELDS.items():
+            if field in edits or "add" in edits or field not in item:
+                continue
+            value = item[field]
+            if field == "remind_time":
+                value = parse_time(value)
+                if value is None:
+                    continue
+            elif field == "done":
+                value = bool(value)
+            if getattr(task, attr) != value:
+                fields[attr] = value
+        if fields:
+            changes.append((task_id, fields))
+
+    for task in manager:
+        if task.id not in seen and not local_edits.get(task.id):
+            removed.append(task.id)
+    return added, changes, removed
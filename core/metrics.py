@@ -0,0 +1,241 @@
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class _NullTimer:
+    """关闭统计时使用的空计时器，进入 / 退出都不做任何事"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """进程内的计数器 / 计时器 / 瞬时值，以及界面线程卡顿记录
+
+    默认关闭：关闭时 incr / observe / timer 只做一次属性判断，timed 装饰的函数
+    只多一层调用。可在任意线程中记录，导出时取一致的快照。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}                 # 名称 -> [次数, 总秒数, 最大秒数, 最近一次秒数]
+        self.gauges = {}
+        self.stalls = deque(maxlen=50)   # 最近的卡顿记录
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    # ========== 记录 ==========
+    def incr(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        if self.enabled:
+            with self._lock:
+                self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            stat = self.timers.get(name)
+            if stat is None:
+                self.timers[name] = [1, seconds, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[3] = seconds
+                if seconds > stat[2]:
+                    stat[2] = seconds
+
+    def timer(self, name):
+        """with metrics.timer("name"): ..."""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def timed(self, name=None):
+        """装饰器：记录函数每次调用的耗时"""
+        def decorator(func):
+            key = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(key, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record_stall(self, started_at, seconds, stack):
+        with self._lock:
+            self.stalls.append({
+                "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started_at)),
+                "ms": round(seconds * 1000, 1),
+                "stack": stack
+            })
+        self.incr("gui_stalls")
+        self.observe("gui_stall", seconds)
+
+    # ========== 导出 ==========
+    def snapshot(self):
+        with self._lock:
+            return {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timers": {
+                    name: {"count": count, "total_ms": round(total * 1000, 3),
+                           "avg_ms": round(total / count * 1000, 3), "max_ms": round(peak * 1000, 3),
+                           "last_ms": round(last * 1000, 3)}
+                    for name, (count, total, peak, last) in self.timers.items()
+                },
+                "stalls": list(self.stalls)
+            }
+
+    def to_prometheus(self, prefix="todo"):
+        """Prometheus 文本格式（计时器导出为 summary 的 _count / _sum 及最大值 gauge）"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = _metric_name(prefix, name) + "_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            for name, value in sorted(self.gauges.items()):
+                metric = _metric_name(prefix, name)
+                lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+            for name, (count, total, peak, _) in sorted(self.timers.items()):
+                metric = _metric_name(prefix, name) + "_seconds"
+                lines += [f"# TYPE {metric} summary", f"{metric}_count {count}", f"{metric}_sum {total:.6f}",
+                          f"# TYPE {metric}_max gauge", f"{metric}_max {peak:.6f}"]
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(prefix, name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", f"{prefix}_{name}")
+
+
+# 全局实例：各模块直接 from core.metrics import metrics
+metrics = Metrics()
+
+
+class MetricsExporter:
+    """后台线程定期把统计写入文件：.prom 为 Prometheus 文本（整体替换），其余为 JSON Lines（追加）"""
+
+    def __init__(self, metrics, path, interval=60):
+        self.metrics = metrics
+        self.path = os.fspath(path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """停止并写出最后一次"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def dump(self):
+        from core.storage import atomic_write_text
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.path.endswith(".prom"):
+            atomic_write_text(self.path, self.metrics.to_prometheus())
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.metrics.snapshot(), ensure_ascii=False) + "\n")
+
+    def _run(self):
+        while True:
+            stopped = self._stop.wait(self.interval)
+            try:
+                self.dump()
+            except OSError as e:
+                print("写入统计失败:", e)
+            if stopped:
+                return
+
+
+class StallWatchdog:
+    """界面线程卡顿检测
+
+    界面线程定时调用 beat()；后台线程发现心跳停顿超过 threshold 秒时，
+    抓取一次界面线程的调用栈，待心跳恢复后把卡顿时长和调用栈记入 metrics。
+    """
+
+    def __init__(self, metrics, threshold=0.2, thread_id=None):
+        self.metrics = metrics
+        self.threshold = threshold
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self._last_beat = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+
+    def start(self):
+        self._last_beat = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def beat(self):
+        self._last_beat = time.perf_counter()
+
+    def _capture_stack(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return []
+        return [line.rstrip() for line in traceback.format_stack(frame)[-12:]]
+
+    def _run(self):
+        poll = self.threshold / 2
+        stall_beat, stack = None, None
+        while not self._stop.wait(poll):
+            last_beat = self._last_beat
+            gap = time.perf_counter() - last_beat
+            if stall_beat is None:
+                if gap > self.threshold:
+                    stall_beat, stack = last_beat, self._capture_stack()
+            elif last_beat != stall_beat:
+                # 心跳恢复：卡顿时长为两次心跳的间隔
+                seconds = last_beat - stall_beat
+                started_at = time.time() - (time.perf_counter() - stall_beat)
+                self.metrics.record_stall(started_at, seconds, stack)
+                stall_beat, stack = None, None
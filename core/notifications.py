@@ -0,0 +1,90 @@
+import time
+
+# 汇总消息中最多列出的任务数
+SUMMARY_LINES = 3
+
+
+class RecordingBackend:
+    """记录而不显示的通知后端，用于无界面测试和基准"""
+
+    def __init__(self):
+        self.shown = []    # [(标题, 内容)]
+
+    def show(self, title, message):
+        self.shown.append((title, message))
+
+
+class NotificationDispatcher:
+    """通知分发：排队、去重、合并、限流，不依赖 Qt
+
+    - push 只入队：同一 key 的通知在发出前只保留最新一条。
+    - 第一条通知入队后等待 window 秒，期间到来的通知合并为一条汇总消息发出。
+    - 令牌桶限流：最多连续发出 burst 条，之后每 interval 秒恢复一条；
+      没有令牌时通知继续排队，下一次发出时一并汇总。
+    - backend 只需实现 show(title, message)，例如托盘或 RecordingBackend。
+
+    调用方在 push 之后按 next_delay() 安排一次 flush()（界面中为单次 QTimer）。
+    时间统一用 time.monotonic 秒，可以传入 clock 替换。
+    """
+
+    def __init__(self, backend, window=1.0, interval=10.0, burst=3, clock=time.monotonic):
+        self.backend = backend
+        self.window = window
+        self.interval = interval
+        self.burst = burst
+        self.clock = clock
+        self._pending = {}         # key -> (标题, 内容)，保持入队顺序
+        self._first_pending = None # 当前这批第一条入队的时间
+        self._tokens = burst
+        self._refilled_at = clock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, key, title, message):
+        if not self._pending:
+            self._first_pending = self.clock()
+        self._pending.pop(key, None)
+        self._pending[key] = (title, message)
+
+    def discard(self, key):
+        """撤销尚未发出的通知（如任务已删除）"""
+        self._pending.pop(key, None)
+
+    def _refill(self, now):
+        if self._tokens >= self.burst:
+            self._refilled_at = now
+            return
+        gained = int((now - self._refilled_at) / self.interval)
+        if gained:
+            self._tokens = min(self.burst, self._tokens + gained)
+            self._refilled_at += gained * self.interval
+
+    def next_delay(self):
+        """距离下一次可以发出的秒数；没有待发通知时返回 None"""
+        if not self._pending:
+            return None
+        now = self.clock()
+        self._refill(now)
+        delay = self._first_pending + self.window - now
+        if self._tokens <= 0:
+            delay = max(delay, self._refilled_at + self.interval - now)
+        return max(delay, 0)
+
+    def flush(self):
+        """时间已到且有令牌时，把排队的通知合并为一条发出；返回是否发出"""
+        if self.next_delay() != 0:
+            return False
+
+        pending, self._pending = list(self._pending.values()), {}
+        self._tokens -= 1
+        if len(pending) == 1:
+            title, message = pending[0]
+        else:
+            title = f"{pending[0][0]}（{len(pending)} 条）"
+            lines = [message for _, message in pending[:SUMMARY_LINES]]
+            if len(pending) > SUMMARY_LINES:
+                lines.append(f"以及另外 {len(pending) - SUMMARY_LINES} 条")
+            message = "\n".join(lines)
+        self.backend.show(title, message)
+        return True
@@ -0,0 +1,103 @@
+import calendar
+import datetime
+import re
+from functools import lru_cache
+
+REPEAT_OPTIONS = ["不重复", "每天", "工作日", "每周", "每2周", "每月"]
+NO_REPEAT = "不重复"
+
+_RULE_RE = re.compile(r"^每(\d*)(天|周|月)$")
+_DAY = datetime.timedelta(days=1)
+
+
+@lru_cache(maxsize=None)
+def parse_rule(repeat):
+    """重复规则 -> (类型, 间隔)
+
+    支持：不重复 / 每天 / 每N天 / 每周 / 每N周 / 每月 / 每N月 / 工作日。
+    类型为 None（不重复）、"days"、"months" 或 "workdays"；无法识别的规则按不重复处理。
+    """
+    if repeat == "工作日":
+        return "workdays", 1
+
+    match = _RULE_RE.match(repeat or "")
+    if not match:
+        return None, 0
+
+    n = int(match.group(1) or 1)
+    if n <= 0:
+        return None, 0
+    unit = match.group(2)
+    if unit == "天":
+        return "days", n
+    if unit == "周":
+        return "days", 7 * n
+    return "months", n
+
+
+def is_repeating(repeat):
+    return parse_rule(repeat)[0] is not None
+
+
+def _add_months(start, months):
+    """按月推移，目标月份没有这一天时取当月最后一天"""
+    index = start.year * 12 + start.month - 1 + months
+    year, month = divmod(index, 12)
+    month += 1
+    day = min(start.day, calendar.monthrange(year, month)[1])
+    return start.replace(year=year, month=month, day=day)
+
+
+def _weekdays_between(first, last):
+    """闭区间 [first, last] 内的工作日天数"""
+    if last < first:
+        return 0
+    days = (last - first).days + 1
+    weeks, rest = divmod(days, 7)
+    count = weeks * 5
+    weekday = first.weekday()
+    for i in range(rest):
+        if (weekday + i) % 7 < 5:
+            count += 1
+    return count
+
+
+def next_occurrence(start, repeat, after):
+    """计算 start 按规则重复后，第一个晚于 after 的时间，O(1)
+
+    返回 (下次时间, 错过次数)。错过次数为 <= after 的发生次数（含 start 本身），
+    start 晚于 after 时为 0；不重复的任务返回 (None, 错过次数)。
+    时间均为本地无时区 datetime，按墙上时间推移，不受夏令时影响。
+    """
+    if start > after:
+        return start, 0
+
+    kind, n = parse_rule(repeat)
+    if kind is None:
+        return None, 1
+
+    if kind == "days":
+        period = datetime.timedelta(days=n)
+        k = (after - start) // period + 1
+        return start + k * period, k
+
+    if kind == "months":
+        months = (after.year - start.year) * 12 + (after.month - start.month)
+        k = max(months // n, 1)
+        candidate = _add_months(start, k * n)
+        if candidate <= after:
+            k += 1
+            candidate = _add_months(start, k * n)
+        return candidate, k
+
+    # 工作日：start 当天算一次，之后每个工作日的同一时刻各一次
+    time_of_day = start.time()
+    last_day = after.date()
+    if datetime.datetime.combine(last_day, time_of_day) > after:
+        last_day -= _DAY
+    missed = 1 + _weekdays_between(start.date() + _DAY, last_day)
+
+    next_day = last_day + _DAY
+    if next_day.weekday() >= 5:
+        next_day += datetime.timedelta(days=7 - next_day.weekday())
+    return datetime.datetime.combine(next_day, time_of_day), missed
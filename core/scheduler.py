@@ -0,0 +1,80 @@
+import heapq
+import itertools
+
+
+class ReminderScheduler:
+    """提醒调度器：按下次提醒时间排序的小顶堆
+
+    修改或取消任务时不在堆中查找删除，而是让旧条目失效（惰性删除），
+    因此 schedule / cancel / pop_due 都是 O(log n)。时间统一用 epoch 秒。
+    """
+
+    def __init__(self):
+        self._heap = []          # [(fire_at, seq, task_id)]
+        self._entries = {}       # task_id -> (fire_at, seq)，堆中唯一有效的条目
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rebuild(self, deadlines):
+        """用 (task_id, fire_at) 序列整体重建，O(n)"""
+        self._heap = []
+        self._entries = {}
+        for task_id, fire_at in deadlines:
+            if fire_at is None:
+                continue
+            seq = next(self._counter)
+            self._entries[task_id] = (fire_at, seq)
+            self._heap.append((fire_at, seq, task_id))
+        heapq.heapify(self._heap)
+
+    def schedule(self, task_id, fire_at):
+        """设置（或更新）任务的提醒时间；fire_at 为 None 表示取消"""
+        if fire_at is None:
+            self.cancel(task_id)
+            return
+
+        entry = self._entries.get(task_id)
+        if entry is not None and entry[0] == fire_at:
+            return
+
+        seq = next(self._counter)
+        self._entries[task_id] = (fire_at, seq)
+        heapq.heappush(self._heap, (fire_at, seq, task_id))
+        self._shrink()
+
+    def cancel(self, task_id):
+        if self._entries.pop(task_id, None) is not None:
+            self._shrink()
+
+    def next_deadline(self):
+        """最早的提醒时间，没有待提醒任务时返回 None"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """弹出所有 fire_at <= now 的任务 id（按时间先后）"""
+        due = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            _, _, task_id = heapq.heappop(self._heap)
+            del self._entries[task_id]
+            due.append(task_id)
+
+    def _is_stale(self, item):
+        fire_at, seq, task_id = item
+        return self._entries.get(task_id) != (fire_at, seq)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._is_stale(heap[0]):
+            heapq.heappop(heap)
+
+    def _shrink(self):
+        """失效条目过多时重建堆，避免堆无限增长"""
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(fire_at, seq, task_id) for task_id, (fire_at, seq) in self._entries.items()]
+            heapq.heapify(self._heap)
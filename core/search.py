@@ -0,0 +1,241 @@
+import datetime
+from bisect import bisect_left, insort
+
+FILTER_ALL = "全部"
+FILTER_OPTIONS = [FILTER_ALL, "已过期", "今天", "本周", "未完成", "已完成"]
+
+_CACHE_SIZE = 32
+_BULK_TIME_CHANGES = 64   # 一批中超过该数量的时间变化不逐条插入，下次查询时整体重排
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def day_range(now):
+    """now 所在自然日的 [开始, 结束) epoch 秒（本地时间）"""
+    start = datetime.datetime.combine(now.date(), datetime.time())
+    return start.timestamp(), (start + datetime.timedelta(days=1)).timestamp()
+
+
+def week_range(now):
+    """now 所在自然周（周一开始）的 [开始, 结束) epoch 秒"""
+    start = datetime.datetime.combine(now.date() - datetime.timedelta(days=now.weekday()), datetime.time())
+    return start.timestamp(), (start + datetime.timedelta(weeks=1)).timestamp()
+
+
+class TaskIndex:
+    """任务搜索索引：文字三元组倒排索引 + 按提醒时间排序的有序索引
+
+    作为 TaskManager 的监听者按变更记录增量维护，不依赖 Qt。
+    索引在第一次查询（或 index_pending）时才建立，之前的变更直接忽略，不拖慢启动；
+    其中三元组倒排表构建较慢，由 index_pending 分批补齐，补齐前文字查询退化为扫描。
+
+    - 文字查询按空白拆成多个词（与关系），不区分大小写，中文按字符处理；
+      长度 >= 3 的词先用三元组求交得到候选，再逐个确认子串。
+      短词直接扫描；输入是上一次查询的延续时只在上次结果中过滤。
+    - 时间范围用 bisect 在 [(remind_at, id)] 有序列表上截取；少量修改用 insort
+      增量维护，批量修改只标记，下次按时间查询时整体重排一次。
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._built = False
+        self._text = {}      # id -> 小写文字
+        self._grams = {}     # 三元组 -> {id}
+        self._times = []     # 按 (remind_at, id) 排序
+        self._times_dirty = False
+        self._remind = {}    # id -> remind_at
+        self._done = set()
+        self._cache = {}     # 词 -> frozenset(id)，任何修改后清空
+        self._pending = []   # 尚未加入三元组倒排表的 id
+
+    # ========== 维护 ==========
+    def _ensure_built(self):
+        if self._built:
+            return
+        self._built = True
+        self._text = {task.id: task.text.lower() for task in self.manager}
+        self._remind = {task.id: task.remind_at for task in self.manager}
+        self._times = sorted((remind_at, task_id) for task_id, remind_at in self._remind.items())
+        self._done = {task.id for task in self.manager if task.done}
+        self._pending = list(self._text)
+
+    def index_pending(self, limit=2000):
+        """把最多 limit 个任务加入三元组倒排表，全部完成时返回 True（可在空闲时反复调用）"""
+        self._ensure_built()
+        pending, grams, text = self._pending, self._grams, self._text
+        for task_id in pending[-limit:]:
+            value = text.get(task_id)
+            if value is None:    # 期间已删除
+                continue
+            for gram in _trigrams(value):
+                ids = grams.get(gram)
+                if ids is None:
+                    grams[gram] = {task_id}
+                else:
+                    ids.add(task_id)
+        del pending[-limit:]
+        return not pending
+
+    def add_tasks(self, tasks):
+        """分块加载的任务（不产生变更记录）"""
+        if self._built:
+            for task in tasks:
+                self._add(task)
+            self._cache.clear()
+
+    def on_records(self, records):
+        """TaskManager 监听者"""
+        if not self._built:
+            return
+        if len(records) > _BULK_TIME_CHANGES:
+            self._times_dirty = True
+        for record in records:
+            op, task_id = record["op"], record["id"]
+            if op == "del":
+                self._remove(task_id)
+                continue
+            task = self.manager.get(task_id)
+            if task is None:
+                continue
+            if op == "add":
+                self._add(task)
+            elif op == "done":
+                self._set_done(task)
+            elif op == "set" and record["field"] == "text":
+                self._remove_text(task_id)
+                self._add_text(task)
+            elif op == "set" and record["field"] == "remind_time":
+                self._remove_time(task_id)
+                self._add_time(task)
+        self._cache.clear()
+
+    def _add(self, task):
+        self._add_text(task)
+        self._add_time(task)
+        self._set_done(task)
+
+    def _remove(self, task_id):
+        self._remove_text(task_id)
+        self._remove_time(task_id)
+        self._done.discard(task_id)
+
+    def _add_text(self, task):
+        text = task.text.lower()
+        self._text[task.id] = text
+        for gram in _trigrams(text):
+            ids = self._grams.get(gram)
+            if ids is None:
+                self._grams[gram] = {task.id}
+            else:
+                ids.add(task.id)
+
+    def _remove_text(self, task_id):
+        text = self._text.pop(task_id, None)
+        if text is None:
+            return
+        for gram in _trigrams(text):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def _add_time(self, task):
+        self._remind[task.id] = task.remind_at
+        if not self._times_dirty:
+            insort(self._times, (task.remind_at, task.id))
+
+    def _remove_time(self, task_id):
+        remind_at = self._remind.pop(task_id, None)
+        if remind_at is None or self._times_dirty:
+            return
+        i = bisect_left(self._times, (remind_at, task_id))
+        if i < len(self._times) and self._times[i] == (remind_at, task_id):
+            del self._times[i]
+
+    def _set_done(self, task):
+        if task.done:
+            self._done.add(task.id)
+        else:
+            self._done.discard(task.id)
+
+    # ========== 查询 ==========
+    def search(self, query):
+        """文字查询，返回匹配的 id 集合；空查询返回 None（不过滤）"""
+        terms = query.lower().split()
+        if not terms:
+            return None
+        self._ensure_built()
+
+        result = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            ids = self._term_ids(term, result)
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+    def _term_ids(self, term, within=None):
+        cached = self._cache.get(term)
+        if cached is not None:
+            return cached
+
+        # 候选集：上次查询的延续 > 三元组求交 > 全部
+        candidates = within
+        for previous, ids in self._cache.items():
+            if previous in term and (candidates is None or len(ids) < len(candidates)):
+                candidates = ids
+        if len(term) >= 3 and not self._pending:
+            sets = sorted((self._grams.get(gram, ()) for gram in _trigrams(term)), key=len)
+            if candidates is None or len(sets[0]) < len(candidates):
+                candidates = set(sets[0]).intersection(*sets[1:])
+
+        text = self._text
+        if candidates is None:
+            ids = frozenset(task_id for task_id, value in text.items() if term in value)
+        else:
+            ids = frozenset(task_id for task_id in candidates if term in text[task_id])
+
+        if within is None:
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            self._cache[term] = ids
+        return ids
+
+    def between(self, start, end):
+        """提醒时间在 [start, end) 内的任务 id"""
+        self._ensure_built()
+        if self._times_dirty:
+            self._times = sorted((remind_at, task_id) for task_id, remind_at in self._remind.items())
+            self._times_dirty = False
+        times = self._times
+        lo = bisect_left(times, (start,))
+        hi = bisect_left(times, (end,), lo)
+        return {task_id for _, task_id in times[lo:hi]}
+
+    def filter(self, query="", kind=FILTER_ALL, now=None):
+        """文字查询与范围筛选的交集；都不限制时返回 None"""
+        ids = self.search(query)
+        if kind == FILTER_ALL:
+            return ids
+        self._ensure_built()
+
+        now = now or datetime.datetime.now()
+        if kind == "已过期":
+            matched = self.between(float("-inf"), now.timestamp()) - self._done
+        elif kind == "今天":
+            matched = self.between(*day_range(now))
+        elif kind == "本周":
+            matched = self.between(*week_range(now))
+        elif kind == "未完成":
+            matched = self._remind.keys() - self._done
+        elif kind == "已完成":
+            matched = self._done
+        else:
+            raise ValueError(f"未知的筛选条件: {kind}")
+
+        if ids is None:
+            return set(matched)
+        return ids & matched if len(ids) < len(matched) else matched & ids
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+
+from core.storage import TaskStorage, TASK_FIELDS
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          TEXT PRIMARY KEY,
+    position    INTEGER NOT NULL,
+    text        TEXT NOT NULL,
+    remind_time TEXT NOT NULL,          -- yyyy-MM-dd HH:mm:ss，字典序即时间顺序
+    done        INTEGER NOT NULL DEFAULT 0,
+    repeat      TEXT NOT NULL DEFAULT '不重复'
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_position ON tasks(position);
+-- 版本 1 的查询索引：到期与分组查询由内存中的 ReminderScheduler / TaskGroups 完成，不再需要
+DROP INDEX IF EXISTS idx_tasks_remind_time;
+DROP INDEX IF EXISTS idx_tasks_done_remind_time;
+DROP INDEX IF EXISTS idx_tasks_repeat;
+"""
+
+COLUMNS = "id, text, remind_time, repeat, done"
+
+
+def _row_to_task(row):
+    task_id, text, remind_time, repeat, done = row
+    return {"id": task_id, "text": text, "remind_time": remind_time, "repeat": repeat, "done": bool(done)}
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """一次性迁移：把 tasks.json（及其变更日志）导入 SQLite，返回导入的任务数"""
+    from core.journal import read_tasks
+
+    tasks, _ = read_tasks(os.fspath(json_path))
+    conn = _connect(os.fspath(db_path))
+    try:
+        conn.executescript(SCHEMA)
+        _import_tasks(conn, tasks.values())
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    finally:
+        conn.close()
+    return len(tasks)
+
+
+def _import_tasks(conn, tasks):
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO tasks (id, position, text, remind_time, done, repeat) VALUES (?, ?, ?, ?, ?, ?)",
+            ((task["id"], position, task["text"], task["remind_time"], int(bool(task.get("done"))),
+              task.get("repeat", "不重复")) for position, task in enumerate(tasks))
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+class SqliteStore(TaskStorage):
+    """SQLite 存储后端
+
+    WAL 模式；后台线程把每批变更记录放在一个事务里写入，一批中任何一条失败则整批回滚。
+    数据库只负责持久化：内存中的 TaskManager 是唯一数据源，写入又是异步的，
+    到期提醒与今日分组不查询数据库。首次创建数据库时，若存在旧的 tasks.json 会自动迁移。
+    """
+
+    def __init__(self, db_path, json_path=None):
+        self.db_path = os.fspath(db_path)
+        self.json_path = json_path
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+
+        self._conn = _connect(self.db_path)      # 加载线程读取，之后只在后台线程写入
+        self._next_position = 0
+        super().__init__()
+
+    # ========== 加载 ==========
+    def load(self):
+        return [task for chunk in self.iter_chunks() for task in chunk]
+
+    def iter_chunks(self, first_size=50, chunk_size=2000):
+        try:
+            self._prepare()
+            cursor = self._conn.execute(f"SELECT {COLUMNS}, position FROM tasks ORDER BY position")
+            size = first_size
+            while True:
+                rows = cursor.fetchmany(size)
+                if rows:
+                    self._next_position = rows[-1][-1] + 1
+                yield [_row_to_task(row[:-1]) for row in rows]
+                if len(rows) < size:
+                    return
+                size = chunk_size
+        finally:
+            self._loaded.set()
+
+    def _prepare(self):
+        """首次打开时建表并导入旧的 tasks.json；旧版本的数据库只升级表结构"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self._conn.executescript(SCHEMA)
+            if version == 0 and self.json_path and os.path.exists(self.json_path):
+                from core.journal import read_tasks
+                tasks, _ = read_tasks(os.fspath(self.json_path))
+                _import_tasks(self._conn, tasks.values())
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # ========== 后台线程 ==========
+    def _write(self, records):
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            for record in records:
+                op, task_id = record["op"], record["id"]
+                if op == "add":
+                    task = record["task"]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO tasks (id, position, text, remind_time, done, repeat) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (task_id, self._next_position, task["text"], task["remind_time"],
+                         int(bool(task["done"])), task["repeat"])
+                    )
+                    self._next_position += 1
+                elif op == "set":
+                    field = record["field"]
+                    if field not in TASK_FIELDS:
+                        continue
+                    value = record["value"]
+                    if field == "done":
+                        value = int(bool(value))
+                    conn.execute(f"UPDATE tasks SET {field} = ? WHERE id = ?", (value, task_id))
+                elif op == "done":
+                    conn.execute("UPDATE tasks SET done = ? WHERE id = ?", (int(bool(record["value"])), task_id))
+                elif op == "del":
+                    conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _compact(self):
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _shutdown(self):
+        self._conn.close()
@@ -0,0 +1,132 @@
+import json
+import sys
+import time
+
+
+class _TimedLoader:
+    """包装模块加载器，只统计 exec_module 的耗时，其余属性原样转发"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 模块内部看到的仍是原加载器
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave()
+
+
+class _ImportTimer:
+    """sys.meta_path 查找器：借用后面的查找器找到模块，再包上计时加载器"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """启动耗时分析：分阶段打点 + 每个模块的导入耗时（含/不含子模块）
+
+    时间均相对于 start_time（time.perf_counter），单位毫秒。
+    """
+
+    def __init__(self, start_time=None):
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.phases = []       # [(阶段名, 毫秒)]
+        self.imports = []      # [(模块名, 自身毫秒, 累计毫秒, 嵌套深度)]
+        self._stack = []       # [[模块名, 开始时间, 子模块耗时]]
+        self._finder = None
+
+    # ========== 导入计时 ==========
+    def install_import_hook(self):
+        if self._finder is None:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def remove_import_hook(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def _enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _leave(self):
+        name, start, children = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        self.imports.append((name, (elapsed - children) * 1000, elapsed * 1000, len(self._stack)))
+
+    # ========== 阶段 ==========
+    def mark(self, phase):
+        self.phases.append((phase, (time.perf_counter() - self.start_time) * 1000))
+
+    def elapsed(self, phase):
+        for name, ms in self.phases:
+            if name == phase:
+                return ms
+        return None
+
+    # ========== 报告 ==========
+    def report(self, budget_ms=None, budget_phase=None, top=30):
+        slowest = sorted(self.imports, key=lambda item: item[1], reverse=True)[:top]
+        report = {
+            "phases": [{"phase": name, "ms": round(ms, 1)} for name, ms in self.phases],
+            "imports_total_ms": round(sum(item[1] for item in self.imports), 1),
+            "imports": [{"module": name, "self_ms": round(self_ms, 2), "cumulative_ms": round(total_ms, 2)}
+                        for name, self_ms, total_ms, _ in slowest],
+        }
+        if budget_ms is not None:
+            measured = self.elapsed(budget_phase)
+            report["budget"] = {
+                "phase": budget_phase,
+                "budget_ms": budget_ms,
+                "measured_ms": None if measured is None else round(measured, 1),
+                "ok": measured is not None and measured <= budget_ms
+            }
+        return report
+
+    def write(self, path, budget_ms=None, budget_phase=None):
+        """写入 JSON 报告并打印摘要，返回是否在预算内（未设预算时为 True）"""
+        report = self.report(budget_ms, budget_phase)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print("启动阶段耗时:")
+        for item in report["phases"]:
+            print(f"  {item['ms']:8.1f} ms  {item['phase']}")
+        print(f"模块导入合计 {report['imports_total_ms']:.1f} ms，最慢的模块（不含子模块）:")
+        for item in report["imports"][:10]:
+            print(f"  {item['self_ms']:8.1f} ms  {item['module']}")
+
+        print(f"报告已写入: {path}")
+
+        budget = report.get("budget")
+        if budget is None:
+            return True
+        state = "未超出" if budget["ok"] else "超出"
+        print(f"{budget['phase']}: {budget['measured_ms']} ms，预算 {budget['budget_ms']} ms，{state}预算")
+        return budget["ok"]
@@ -0,0 +1,194 @@
+import datetime
+import json
+import os
+import threading
+import zipfile
+
+import numpy as np
+
+from core.history import EventLog
+
+CACHE_VERSION = 1
+# 按天汇总的列（均为 int64，与 days 一一对应）
+DAY_COLUMNS = ("focus_seconds", "sessions", "pomodoros", "completed")
+
+
+def to_days(times):
+    """'yyyy-MM-dd HH:mm:ss' 字符串序列 -> (本地日期序号数组（自 1970-01-01 起的天数）, 有效掩码)"""
+    dates = np.asarray(times, dtype="U10")
+    try:
+        days = dates.astype("datetime64[D]")
+    except ValueError:
+        # 个别格式错误的记录：逐条转换，无法识别的记为 NaT
+        days = np.array([_parse_day(date) for date in dates], dtype="datetime64[D]")
+    valid = ~np.isnat(days)
+    return days.astype(np.int64), valid
+
+
+def _parse_day(text):
+    try:
+        return np.datetime64(text, "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+def day_number(date):
+    return (date - datetime.date(1970, 1, 1)).days
+
+
+def _seconds(session):
+    try:
+        return max(int(session.get("seconds", 0)), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _group_sum(keys, columns):
+    """按 keys 分组求和：返回 (排好序的唯一 key, [每列的组内和])"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    sums = [np.bincount(inverse, weights=column, minlength=len(unique)).astype(np.int64) for column in columns]
+    return unique, sums
+
+
+class StatsManager:
+    """专注与完成统计
+
+    事件来源为两份只追加的记录：focus.jsonl（专注，见 core/focus_timer.py）和
+    completions.jsonl（任务完成，{"task": id, "time": ...}）。新事件读成列式 NumPy 数组，
+    按天（专注秒数、专注次数、完整番茄数、完成任务数）和按任务（专注秒数）向量化汇总，
+    与缓存 stats.npz 中已有的汇总合并。缓存记录两份记录已读到的字节位置，
+    之后只读新增部分，打开统计的耗时与天数相关，与事件总数无关。
+    记录被截断或替换（比读到的位置还短）时从头重建。
+    refresh 有文件 I/O，应在后台线程中调用；读取汇总的方法只访问内存。
+    """
+
+    def __init__(self, focus_path, completion_path, cache_path):
+        self.focus_log = EventLog(focus_path)
+        self.completion_log = EventLog(completion_path)
+        self.cache_path = os.fspath(cache_path)
+        self._lock = threading.Lock()
+        self._reset()
+        self._cache_loaded = False
+
+    def _reset(self):
+        self.offsets = {"focus": 0, "completions": 0}
+        self.days = np.empty(0, dtype=np.int64)
+        self.columns = {name: np.empty(0, dtype=np.int64) for name in DAY_COLUMNS}
+        self.task_ids = np.empty(0, dtype="U32")
+        self.task_seconds = np.empty(0, dtype=np.int64)
+
+    # ========== 缓存 ==========
+    def _load_cache(self):
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != CACHE_VERSION:
+                    return
+                self.offsets = meta["offsets"]
+                self.days = data["days"]
+                self.columns = {name: data[name] for name in DAY_COLUMNS}
+                self.task_ids = data["task_ids"]
+                self.task_seconds = data["task_seconds"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            print("读取统计缓存失败:", e)
+            self._reset()
+
+    def _save_cache(self):
+        meta = {"version": CACHE_VERSION, "offsets": self.offsets}
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), days=self.days, task_ids=self.task_ids,
+                         task_seconds=self.task_seconds, **self.columns)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print("保存统计缓存失败:", e)
+
+    # ========== 增量汇总 ==========
+    def refresh(self):
+        """读入上次之后新增的事件并更新汇总，返回新增事件数"""
+        with self._lock:
+            if not self._cache_loaded:
+                self._cache_loaded = True
+                self._load_cache()
+            if (self.focus_log.size() < self.offsets["focus"]
+                    or self.completion_log.size() < self.offsets["completions"]):
+                self._reset()
+
+            sessions, focus_end = self.focus_log.read_from(self.offsets["focus"])
+            completions, completion_end = self.completion_log.read_from(self.offsets["completions"])
+            self._merge(sessions, completions)
+            changed = focus_end != self.offsets["focus"] or completion_end != self.offsets["completions"]
+            self.offsets = {"focus": focus_end, "completions": completion_end}
+            if changed:
+                self._save_cache()
+            return len(sessions) + len(completions)
+
+    def _merge(self, sessions, completions):
+        if not sessions and not completions:
+            return
+        # 新事件的列，日期无法识别的事件丢弃
+        session_days, valid = to_days([str(session.get("start", "")) for session in sessions])
+        task_ids = np.array([str(session.get("task", "")) for session in sessions], dtype=str)
+        seconds = np.fromiter((_seconds(session) for session in sessions), np.int64, len(sessions))
+        full = np.fromiter((bool(session.get("completed")) for session in sessions), np.int64, len(sessions))
+        valid &= task_ids != ""
+        session_days, task_ids, seconds, full = session_days[valid], task_ids[valid], seconds[valid], full[valid]
+
+        completion_days, valid = to_days([str(event.get("time", "")) for event in completions])
+        completion_days = completion_days[valid]
+
+        # 按天：已有汇总 + 专注事件 + 完成事件，一次分组求和
+        zeros = np.zeros(len(completion_days), dtype=np.int64)
+        ones = np.ones(len(completion_days), dtype=np.int64)
+        keys = np.concatenate([self.days, session_days, completion_days])
+        columns = [
+            np.concatenate([self.columns["focus_seconds"], seconds, zeros]),
+            np.concatenate([self.columns["sessions"], np.ones(len(seconds), dtype=np.int64), zeros]),
+            np.concatenate([self.columns["pomodoros"], full, zeros]),
+            np.concatenate([self.columns["completed"], np.zeros(len(seconds), dtype=np.int64), ones]),
+        ]
+        self.days, sums = _group_sum(keys, columns)
+        self.columns = dict(zip(DAY_COLUMNS, sums))
+
+        # 按任务
+        if len(task_ids):
+            self.task_ids, (self.task_seconds,) = _group_sum(
+                np.concatenate([self.task_ids, task_ids]), [np.concatenate([self.task_seconds, seconds])])
+
+    # ========== 查询 ==========
+    def daily(self, first, last):
+        """first..last（含）每天的汇总：{列名: 长度为天数的数组}，没有记录的天为 0"""
+        first, last = day_number(first), day_number(last)
+        count = max(last - first + 1, 0)
+        result = {name: np.zeros(count, dtype=np.int64) for name in DAY_COLUMNS}
+        lo, hi = np.searchsorted(self.days, [first, last + 1])
+        positions = self.days[lo:hi] - first
+        for name in DAY_COLUMNS:
+            result[name][positions] = self.columns[name][lo:hi]
+        return result
+
+    def totals(self):
+        return {name: int(self.columns[name].sum()) for name in DAY_COLUMNS}
+
+    def ranking(self, limit=10):
+        """专注时间最多的任务：[(task_id, 秒数)]"""
+        order = np.argsort(-self.task_seconds, kind="stable")[:limit]
+        return [(str(self.task_ids[i]), int(self.task_seconds[i])) for i in order]
+
+    def summary(self, today=None, days=7, limit=10):
+        """统计窗口所需的数据：今天、最近 days 天（逐日）、累计、任务排名"""
+        today = today or datetime.date.today()
+        first = today - datetime.timedelta(days=days - 1)
+        daily = self.daily(first, today)
+        return {
+            "today": {name: int(daily[name][-1]) for name in DAY_COLUMNS},
+            "week": [(first + datetime.timedelta(days=i), {name: int(daily[name][i]) for name in DAY_COLUMNS})
+                     for i in range(days)],
+            "total": self.totals(),
+            "ranking": self.ranking(limit),
+        }
@@ -0,0 +1,272 @@
+import json
+import os
+import tempfile
+import threading
+import uuid
+
+from core.metrics import metrics
+
+TASK_FIELDS = ("text", "remind_time", "repeat", "done")
+
+
+def new_task_id():
+    return uuid.uuid4().hex
+
+
+def atomic_write_text(path, text):
+    """原子写入：先写同目录临时文件并落盘，再 rename 覆盖目标文件"""
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def iter_json_array(f, read_size=256 * 1024):
+    """流式解析 JSON 数组文件，逐个产出元素，不需要一次读入整个文件"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # 跳过空白、逗号与数组起止符
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(read_size), 0
+            eof = not buffer
+
+        if pos >= len(buffer):
+            return
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("数据文件不是 JSON 数组")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            if eof:
+                raise
+            # 元素跨越了读取边界，补充数据后重试
+            more = f.read(read_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+        yield item
+        pos = end
+
+
+def create_storage(backend, data_file, db_file=None, compact_threshold=256 * 1024):
+    """按配置创建存储后端："journal"（tasks.json + 变更日志）、"binary"（tasks.bin + 变更日志）或 "sqlite" """
+    if backend == "binary":
+        from core.binary_snapshot import BinaryStore
+        return BinaryStore(os.path.splitext(os.fspath(data_file))[0] + ".bin", json_path=data_file,
+                           compact_threshold=compact_threshold)
+    if backend == "sqlite":
+        from core.sqlite_store import SqliteStore
+        return SqliteStore(db_file, json_path=data_file)
+    if backend == "journal":
+        from core.journal import JournalStore
+        return JournalStore(data_file, compact_threshold=compact_threshold)
+    raise ValueError(f"未知的存储后端: {backend}")
+
+
+class TaskStorage:
+    """任务存储接口
+
+    界面线程通过 record 登记变更记录（add / set / done / del），同一任务同一字段
+    的多次修改只保留最后一次；commit 把这批记录交给后台线程，由子类的 _write
+    写盘，界面线程不做任何磁盘 I/O。子类需要实现 load、_write，可选实现 _compact。
+
+    写盘失败的批次按原顺序保留，下一次 commit 时排在新记录之前重试（没有新记录也会重试），
+    全部写入之前 flush / wait 返回 False。失败与恢复通过 on_error 通知调用方。
+    """
+
+    def __init__(self):
+        self._pending = []         # 界面线程累积、尚未提交的记录
+        self._set_index = {}       # (id, field) -> _pending 中的位置，用于合并同字段修改
+
+        self._cond = threading.Condition()
+        self._queue = []           # 已提交、等待写盘的记录批次，None 表示压缩请求
+        self._failed = []          # 写盘失败、等待重试的批次
+        self._busy = False
+        self._closed = False
+        self._batches_written = 0  # 后台线程已写入的批次数（与 commit 次数一一对应）
+        self._loaded = threading.Event()   # 加载完成前后台线程不写盘，避免与加载线程竞争
+        self.error = None          # 最近一次写盘失败的异常，写入成功后清空
+        self.on_error = None       # on_error(异常)：写盘失败时在后台线程调用；之后写入成功时以 None 调用
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def load(self):
+        """返回按顺序排列的任务字典列表（含 id）"""
+        raise NotImplementedError
+
+    def iter_chunks(self, first_size=50, chunk_size=2000):
+        """分块产出任务字典，首块较小以便尽快显示首屏；可在后台线程中调用"""
+        items = self.load()
+        yield items[:first_size]
+        for start in range(first_size, len(items), chunk_size):
+            yield items[start:start + chunk_size]
+
+    def iter_tasks(self, first_size=50, chunk_size=2000):
+        """与 iter_chunks 相同，但直接产出 Task 对象；后端可以覆盖以跳过字典这一步"""
+        from core.tasks import Task
+
+        for chunk in self.iter_chunks(first_size, chunk_size):
+            yield [Task.from_dict(item) for item in chunk]
+
+    def watch_path(self):
+        """可能被外部修改、需要监视的快照文件；不支持合并外部修改的后端返回 None"""
+        return None
+
+    # ========== 写入 ==========
+    def record(self, records):
+        """界面线程调用：登记变更记录"""
+        deleted = set()
+        for record in records:
+            op, task_id = record["op"], record["id"]
+            if op == "set":
+                key = (task_id, record["field"])
+            elif op == "done":
+                key = (task_id, "done")
+            else:
+                key = None
+                if op == "del":
+                    deleted.add(task_id)
+
+            if key is not None and key in self._set_index:
+                self._pending[self._set_index[key]] = record
+                continue
+            if key is not None:
+                self._set_index[key] = len(self._pending)
+            self._pending.append(record)
+
+        if deleted:
+            self._drop_pending(deleted)
+
+    def commit(self):
+        """把已登记的记录交给后台线程写盘；有写盘失败的批次时即使没有新记录也会重试"""
+        batch, self._pending, self._set_index = self._pending, [], {}
+        with self._cond:
+            if not batch and not self._failed:
+                return
+            self._queue.append(batch)
+            self._cond.notify_all()
+
+    def compact(self):
+        """请求后台线程立即压缩"""
+        with self._cond:
+            self._queue.append(None)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """提交并等待所有记录写盘完成"""
+        self.commit()
+        return self.wait(timeout)
+
+    def wait(self, timeout=None):
+        """等待已提交的记录写盘完成，不提交新记录（可在任意线程调用）；超时或有写盘失败的记录时返回 False"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout) and not self._failed
+
+    def close(self, timeout=None):
+        self._loaded.set()
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _drop_pending(self, task_ids):
+        """任务被删除时，丢弃这些任务尚未提交的修改（批量删除只扫描一遍）"""
+        self._pending = [record for record in self._pending
+                         if record["id"] not in task_ids or record["op"] in ("add", "del")]
+        self._set_index = {}
+        for i, record in enumerate(self._pending):
+            if record["op"] == "set":
+                self._set_index[(record["id"], record["field"])] = i
+            elif record["op"] == "done":
+                self._set_index[(record["id"], "done")] = i
+
+    # ========== 后台线程 ==========
+    def _write(self, records):
+        raise NotImplementedError
+
+    def _compact(self):
+        pass
+
+    def _needs_compact(self):
+        return False
+
+    def _run(self):
+        self._loaded.wait()
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    if self._failed:
+                        print("保存任务失败，未写入的修改:", sum(len(batch) for batch in self._failed))
+                    self._shutdown()
+                    return
+                # 失败的批次排在前面，保持记录顺序
+                batches, self._queue, self._failed = self._failed + self._queue, [], []
+                self._busy = True
+
+            failed = []
+            try:
+                records = [record for batch in batches if batch for record in batch]
+                try:
+                    if records:
+                        with metrics.timer("storage_write"):
+                            self._write(records)
+                        metrics.incr("storage_records", len(records))
+                except Exception:
+                    failed = [batch for batch in batches if batch]
+                    raise
+                self._batches_written += sum(1 for batch in batches if batch)
+                if None in batches or self._needs_compact():
+                    with metrics.timer("storage_compact"):
+                        self._compact()
+            except Exception as e:
+                metrics.incr("storage_errors")
+                self._report(e)
+            else:
+                if self.error is not None:
+                    self._report(None)
+            finally:
+                with self._cond:
+                    self._failed = failed
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _report(self, error):
+        self.error = error
+        if self.on_error is not None:
+            self.on_error(error)
+        elif error is not None:
+            print("保存任务失败:", error)
+
+    def _shutdown(self):
+        """后台线程退出前调用，用于释放资源"""
+        pass
@@ -0,0 +1,323 @@
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from core.history import EventLog
+from core.storage import TASK_FIELDS, atomic_write_text
+from core.tasks import parse_time
+
+# 同步的字段：任务字段加删除标记，每个字段是一个独立的“后写者胜”寄存器
+SYNC_FIELDS = TASK_FIELDS + ("deleted",)
+# 同步字段名 -> Task 属性
+_ATTRS = {"text": "text", "remind_time": "remind_at", "repeat": "repeat", "done": "done"}
+# 版本日志的行数超过 版本数 * 2 + 该值 时整体重写一次
+_VERSIONS_SLACK = 1024
+
+
+def newer(stamp, other):
+    """版本比较：(Lamport 时钟, 设备 id) 按字典序，设备 id 打破平局，各设备得到相同的结果"""
+    return other is None or tuple(stamp) > tuple(other)
+
+
+def record_deltas(records):
+    """TaskManager 变更记录 -> [(id, 字段, 值)]"""
+    deltas = []
+    for record in records:
+        op, task_id = record["op"], record["id"]
+        if op == "add":
+            deltas.extend((task_id, field, record["task"][field]) for field in TASK_FIELDS)
+            deltas.append((task_id, "deleted", False))
+        elif op == "set" and record["field"] in SYNC_FIELDS:
+            deltas.append((task_id, record["field"], record["value"]))
+        elif op == "done":
+            deltas.append((task_id, "done", bool(record["value"])))
+        elif op == "del" and not record.get("archived"):
+            # 移入归档只是离开本设备的工作集，其他设备照常保留，各自按自己的设置归档
+            deltas.append((task_id, "deleted", True))
+    return deltas
+
+
+class SyncEngine:
+    """经由共享目录（网盘同步的文件夹）的多设备增量同步，不依赖 Qt
+
+    共享目录中每台设备只追加写自己的 <设备 id>.jsonl，每行一个字段级增量：
+        {"id": 任务 id, "f": 字段, "v": 值, "c": Lamport 时钟, "d": 设备 id}
+    每个 (任务, 字段) 是一个后写者胜（LWW）寄存器，版本 (c, d) 大者胜，与读取顺序无关，
+    各设备读完相同的增量后得到相同的结果；删除是 deleted 字段上的墓碑。
+
+    一轮同步（sync_round，在后台线程中调用）：给本地尚未发出的变更打上时钟并追加到
+    自己的文件，再从上次读到的位置读取其他设备文件的新增行，只把胜出的字段交给界面应用。
+    读写量与变更数成正比，与任务总数无关。
+
+    本地状态保存在数据目录下，每隔若干轮和关闭时写一次检查点：设备 id、时钟、各文件读到的位置
+    写入 sync_state.json；字段版本追加写入同名的 .journal，每次只追加上次检查点之后变化的版本，
+    行数远多于版本数时才整体重写一次，检查点的读写量同样与任务总数无关。
+    检查点之后读过的增量下次启动时重读，回放是幂等的。
+    上一轮胜出的字段交给界面后，要等界面应用并保存（applied）才会写入检查点，
+    中途退出时这些增量下次还会再读到。状态在第一轮同步时才读取，构造不做磁盘 I/O。
+    """
+
+    def __init__(self, sync_dir, state_path, checkpoint_rounds=20):
+        self.sync_dir = os.fspath(sync_dir)
+        self.state_path = os.fspath(state_path)
+        self.checkpoint_rounds = checkpoint_rounds
+        self.versions_log = EventLog(os.path.splitext(self.state_path)[0] + ".journal")
+
+        self._lock = threading.Lock()      # 保护 _pending / _applying（界面线程与后台线程）
+        self._round_lock = threading.Lock()
+        self._pending = []                 # 界面线程登记、尚未发出的 (id, 字段, 值)
+        self._applying = False
+
+        self.device = None
+        self.clock = 0
+        self.offsets = {}                  # 设备 id -> 该设备文件已读到的位置（含自己的文件）
+        self.versions = {}                 # 任务 id -> {字段: [c, d]}
+        self._changed = {}                 # 上次检查点之后变化的版本 (id, 字段) -> [c, d]
+        self._version_count = 0            # versions 中的字段版本数
+        self._version_lines = 0            # 版本日志的行数
+        self._rewrite_versions = False     # 下次检查点整体重写版本日志
+        self.log = None
+        self._rounds = 0
+        self._dirty = False
+        self._unapplied = False            # 上一轮的结果界面是否还没有应用
+        self._published = False
+
+    # ========== 本地状态 ==========
+    def _load_state(self):
+        self._read_state()
+        self.log = EventLog(os.path.join(self.sync_dir, f"{self.device}.jsonl"))
+        # 检查点之后自己发出的增量：恢复时钟与版本
+        offset = self.offsets.get(self.device, 0)
+        deltas, end = self.log.read_from(offset)
+        for delta in deltas:
+            self._merge(delta, {})
+        if end != offset:
+            self.offsets[self.device] = end
+            self._dirty = True
+
+    def _read_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.device = state["device"]
+            self.clock = state["clock"]
+            self.offsets = state["offsets"]
+            # 旧版检查点把全部版本写在状态文件里，读入后改存到版本日志
+            self.versions = state.get("versions") or {}
+            self._rewrite_versions = "versions" in state
+            self._read_versions()
+        except FileNotFoundError:
+            # 没有状态时版本日志（如果有）也作废
+            self.device = uuid.uuid4().hex[:12]
+            self._rewrite_versions = True
+            self._dirty = True
+        except (OSError, ValueError, KeyError) as e:
+            print("读取同步状态失败:", e)
+            self.device = uuid.uuid4().hex[:12]
+            self.clock, self.offsets, self.versions = 0, {}, {}
+            self._rewrite_versions = True
+            self._dirty = True
+        self._version_count = sum(len(fields) for fields in self.versions.values())
+
+    def _read_versions(self):
+        """回放版本日志（后写的行覆盖先写的）；日志可能比状态文件新，回放重读的增量是幂等的"""
+        entries, _ = self.versions_log.read_from(0)
+        for entry in entries:
+            try:
+                stamp = [int(entry["c"]), str(entry["d"])]
+                self.versions.setdefault(entry["id"], {})[entry["f"]] = stamp
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.clock = max(self.clock, stamp[0])
+        self._version_lines = len(entries)
+
+    def applied(self):
+        """界面已应用并保存上一轮的结果"""
+        self._unapplied = False
+
+    def _checkpoint(self):
+        """写入本地状态：先追加变化的版本，再原子替换状态文件
+
+        中途崩溃时版本日志至多比状态文件新，重读的增量不会再胜出，不会丢失版本。
+        """
+        if not self._dirty or self._unapplied or self.device is None:
+            return
+        self._write_versions()
+        state = {"device": self.device, "clock": self.clock, "offsets": self.offsets}
+        atomic_write_text(self.state_path, json.dumps(state, ensure_ascii=False, separators=(",", ":")))
+        self._dirty = False
+        self._rounds = 0
+
+    def _write_versions(self):
+        lines_after = self._version_lines + len(self._changed)
+        if self._rewrite_versions or lines_after > 2 * self._version_count + _VERSIONS_SLACK:
+            lines = [{"id": task_id, "f": field, "c": stamp[0], "d": stamp[1]}
+                     for task_id, fields in self.versions.items() for field, stamp in fields.items()]
+            atomic_write_text(self.versions_log.path, "".join(
+                json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n" for line in lines))
+            self._version_lines = len(lines)
+            self._rewrite_versions = False
+        elif self._changed:
+            self.versions_log.append([{"id": task_id, "f": field, "c": stamp[0], "d": stamp[1]}
+                                      for (task_id, field), stamp in self._changed.items()])
+            self._version_lines += len(self._changed)
+        self._changed = {}
+
+    def is_new(self):
+        """本设备还没有发出过任何增量（首次加入同步，需要 publish 现有任务）"""
+        return not self._published and self.device is not None and self.device not in self.offsets
+
+    # ========== 本地变更（界面线程） ==========
+    def on_records(self, records):
+        """TaskManager 的监听者：登记本地变更；应用远端变更时产生的记录不再发出"""
+        with self._lock:
+            if not self._applying:
+                self._pending.extend(record_deltas(records))
+
+    def publish(self, tasks):
+        """首次加入同步时，把其他设备还没有的现有任务登记为本地变更"""
+        self._published = True
+        self.on_records([{"op": "add", "id": task.id, "task": task.to_dict()}
+                         for task in tasks if task.id not in self.versions])
+
+    def pending_fields(self):
+        """尚未发出的本地变更 {id: {字段}}；应用远端结果时这些字段以本地为准"""
+        with self._lock:
+            fields = {}
+            for task_id, field, _ in self._pending:
+                fields.setdefault(task_id, set()).add(field)
+            return fields
+
+    @contextmanager
+    def applying(self):
+        with self._lock:
+            self._applying = True
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._applying = False
+
+    # ========== 一轮同步（后台线程） ==========
+    def sync_round(self):
+        """发出本地变更并读入其他设备的新增量，返回胜出的远端字段 {id: {字段: 值}}
+
+        调用前应确保上一轮应用后的任务已经写盘（检查点会认为它们已合并）。
+        """
+        with self._round_lock:
+            if self.device is None:
+                self._load_state()
+            self._rounds += 1
+            if self._rounds >= self.checkpoint_rounds:
+                self._checkpoint()
+            self._send(self._take_pending())
+            winners = self._receive()
+            self._unapplied = bool(winners)
+            return winners
+
+    def flush(self):
+        """关闭前：只发出本地变更（不再读入），并写检查点"""
+        with self._round_lock:
+            if self.device is None:
+                self._load_state()
+            self._send(self._take_pending())
+            self._checkpoint()
+
+    def _take_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def _send(self, deltas):
+        if not deltas:
+            return
+        lines = []
+        for task_id, field, value in deltas:
+            self.clock += 1
+            self._set_version(task_id, field, [self.clock, self.device])
+            lines.append({"id": task_id, "f": field, "v": value, "c": self.clock, "d": self.device})
+        self.log.append(lines)
+        self.offsets[self.device] = self.log.size()
+        self._dirty = True
+
+    def _receive(self):
+        winners = {}
+        try:
+            names = os.listdir(self.sync_dir)
+        except FileNotFoundError:
+            return winners
+        for name in sorted(names):
+            device, ext = os.path.splitext(name)
+            if ext != ".jsonl" or device == self.device:
+                continue
+            log = EventLog(os.path.join(self.sync_dir, name))
+            offset = self.offsets.get(device, 0)
+            if log.size() < offset:
+                offset = 0      # 文件被替换：从头重读，回放是幂等的
+            deltas, end = log.read_from(offset)
+            if end == offset:
+                continue
+            for delta in deltas:
+                self._merge(delta, winners)
+            self.offsets[device] = end
+            self._dirty = True
+        return winners
+
+    def _merge(self, delta, winners):
+        try:
+            task_id, field, value, stamp = delta["id"], delta["f"], delta["v"], [int(delta["c"]), str(delta["d"])]
+        except (KeyError, TypeError, ValueError):
+            return
+        if field not in SYNC_FIELDS:
+            return
+        self.clock = max(self.clock, stamp[0])
+        if newer(stamp, self.versions.get(task_id, {}).get(field)):
+            self._set_version(task_id, field, stamp)
+            winners.setdefault(task_id, {})[field] = value
+
+    def _set_version(self, task_id, field, stamp):
+        fields = self.versions.setdefault(task_id, {})
+        if field not in fields:
+            self._version_count += 1
+        fields[field] = stamp
+        self._changed[task_id, field] = stamp
+
+
+def resolve(manager, winners, pending):
+    """胜出的远端字段 -> (新增任务字典, [(id, Task 属性字典)], 删除的 id)，格式同 core/merge.merge_external
+
+    pending 为尚未发出的本地变更（见 SyncEngine.pending_fields），这些字段保留本地值。
+    本地没有的任务只有在远端给出了全部字段时才新增。
+    """
+    added, changes, removed = [], [], []
+    for task_id, fields in winners.items():
+        local = pending.get(task_id, ())
+        fields = {field: value for field, value in fields.items() if field not in local}
+        task = manager.get(task_id)
+        if fields.get("deleted"):
+            if task is not None and "deleted" not in local:
+                removed.append(task_id)
+            continue
+        if task is None:
+            if all(field in fields for field in TASK_FIELDS) and parse_time(fields["remind_time"]) is not None:
+                added.append({"id": task_id, **{field: fields[field] for field in TASK_FIELDS}})
+            continue
+
+        attrs = {}
+        for field, attr in _ATTRS.items():
+            if field not in fields:
+                continue
+            value = fields[field]
+            if field == "remind_time":
+                value = parse_time(value)
+                if value is None:
+                    continue
+            elif field == "done":
+                value = bool(value)
+            if getattr(task, attr) != value:
+                attrs[attr] = value
+        if attrs:
+            changes.append((task_id, attrs))
+    return added, changes, removed
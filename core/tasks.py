@@ -0,0 +1,204 @@
+import sys
+import time
+
+from core.recurrence import NO_REPEAT
+from core.storage import new_task_id
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_time(text):
+    """'yyyy-MM-dd HH:mm:ss' -> epoch 秒（本地时间），格式错误返回 None"""
+    try:
+        return int(time.mktime((int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                                int(text[11:13]), int(text[14:16]), int(text[17:19]), 0, 0, -1)))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def format_time(timestamp):
+    return time.strftime(TIME_FORMAT, time.localtime(timestamp))
+
+
+class Task:
+    """任务记录：使用 __slots__，时间为 epoch 秒，重复规则字符串驻留共享"""
+
+    __slots__ = ("id", "text", "remind_at", "repeat", "done", "notified", "focus_time_spent")
+
+    def __init__(self, text, remind_at, repeat=NO_REPEAT, done=False, task_id=None):
+        self.id = task_id or new_task_id()
+        self.text = text
+        self.remind_at = int(remind_at)
+        self.repeat = sys.intern(repeat)
+        self.done = bool(done)
+        self.notified = False  # 不重复任务本次运行中是否已提醒，不持久化
+        self.focus_time_spent = 0  # 专注时间累计（分钟），由专注记录（core/focus_timer.py）累加，不写入任务数据
+
+    @classmethod
+    def from_dict(cls, data):
+        remind_at = parse_time(data.get("remind_time"))
+        if remind_at is None:
+            remind_at = int(time.time())
+        return cls(data["text"], remind_at, data.get("repeat", NO_REPEAT), data.get("done", False), data.get("id"))
+
+    def to_dict(self):
+        """存储格式（不含 id）"""
+        return {
+            "text": self.text,
+            "remind_time": format_time(self.remind_at),
+            "repeat": self.repeat,
+            "done": self.done
+        }
+
+    def deadline(self):
+        """下次提醒时间，已完成或已提醒过的任务返回 None"""
+        if self.done or self.notified:
+            return None
+        return self.remind_at
+
+    def __repr__(self):
+        return f"Task({self.text!r}, {format_time(self.remind_at)!r}, {self.repeat!r}, done={self.done})"
+
+
+class TaskManager:
+    """任务管理：任务数据的唯一来源，不依赖 Qt
+
+    所有修改都会以变更记录（与存储层相同的 add / set / done / del 格式）
+    通知监听者，存储、提醒调度、界面都只是它的观察者。
+    """
+
+    def __init__(self):
+        self._tasks = []
+        self._by_id = {}
+        self._rows = {}        # id -> 行号，删除时整体重建
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks)
+
+    def add_listener(self, listener):
+        """listener(records)：任务变化后调用"""
+        self._listeners.append(listener)
+
+    def _emit(self, records):
+        if records:
+            for listener in self._listeners:
+                listener(records)
+
+    # ========== 查询 ==========
+    def at(self, row):
+        return self._tasks[row]
+
+    def get(self, task_id):
+        return self._by_id.get(task_id)
+
+    def row_of(self, task_id):
+        return self._rows.get(task_id, -1)
+
+    # ========== 修改 ==========
+    def load(self, items):
+        """从存储读出的字典整体加载，不产生变更记录"""
+        self._tasks = [Task.from_dict(item) for item in items]
+        self._reindex()
+
+    def _reindex(self):
+        self._by_id = {task.id: task for task in self._tasks}
+        self._rows = {task.id: row for row, task in enumerate(self._tasks)}
+
+    def extend(self, tasks):
+        """追加已构造好的任务（分块加载时使用），不产生变更记录"""
+        row = len(self._tasks)
+        self._tasks.extend(tasks)
+        for task in tasks:
+            self._by_id[task.id] = task
+            self._rows[task.id] = row
+            row += 1
+
+    def add(self, text, remind_at, repeat=NO_REPEAT, done=False):
+        task = Task(text, remind_at, repeat, done)
+        self._rows[task.id] = len(self._tasks)
+        self._tasks.append(task)
+        self._by_id[task.id] = task
+        self._emit([{"op": "add", "id": task.id, "task": task.to_dict()}])
+        return task
+
+    def add_tasks(self, tasks):
+        """追加已有 id 的任务（如从归档恢复），产生 add 记录；id 已存在的跳过，返回实际追加的任务"""
+        added = [task for task in tasks if task.id not in self._by_id]
+        self.extend(added)
+        self._emit([{"op": "add", "id": task.id, "task": task.to_dict()} for task in added])
+        return added
+
+    def update(self, task_id, **fields):
+        """修改任务字段，返回实际发生变化的字段名列表"""
+        records = []
+        changed = self._apply(self._by_id[task_id], fields, records)
+        self._emit(records)
+        return changed
+
+    def update_many(self, changes, remote=False):
+        """批量修改：changes 为 (task_id, 字段字典) 序列，只通知一次监听者
+
+        remote 为 True 表示修改来自其他设备或外部编辑的数据文件：记录带上 "remote" 标记，
+        完成统计不把其中的完成当作本机的完成（见 core/history.completion_events）。
+        返回发生变化的任务 id 列表。
+        """
+        records = []
+        changed_ids = []
+        for task_id, fields in changes:
+            task = self._by_id.get(task_id)
+            if task is not None and self._apply(task, fields, records):
+                changed_ids.append(task_id)
+        if remote:
+            for record in records:
+                record["remote"] = True
+        self._emit(records)
+        return changed_ids
+
+    @staticmethod
+    def _apply(task, fields, records):
+        changed = []
+        for field, value in fields.items():
+            if field == "repeat":
+                value = sys.intern(value)
+            elif field == "remind_at":
+                value = int(value)
+            elif field == "done":
+                value = bool(value)
+            if getattr(task, field) == value:
+                continue
+
+            setattr(task, field, value)
+            changed.append(field)
+            if field == "done":
+                records.append({"op": "done", "id": task.id, "value": value})
+            elif field == "remind_at":
+                records.append({"op": "set", "id": task.id, "field": "remind_time", "value": format_time(value)})
+            else:
+                records.append({"op": "set", "id": task.id, "field": field, "value": value})
+
+        if "remind_at" in changed or "done" in changed:
+            task.notified = False
+        return changed
+
+    def set_notified(self, task_id, notified=True):
+        self._by_id[task_id].notified = notified
+
+    def remove_rows(self, rows, archived=False):
+        """按行号删除，返回被删除的任务
+
+        archived 为 True 表示移入归档：del 记录带上 "archived" 标记，
+        存储照常删除，同步不把它当作删除发给其他设备（见 core/sync.py）。
+        """
+        rows = set(rows)
+        removed = [self._tasks[row] for row in sorted(rows)]
+        self._tasks = [task for row, task in enumerate(self._tasks) if row not in rows]
+        self._reindex()
+        if archived:
+            self._emit([{"op": "del", "id": task.id, "archived": True} for task in removed])
+        else:
+            self._emit([{"op": "del", "id": task.id} for task in removed])
+        return removed
@@ -1,11 +1,80 @@
 import sys
+import time
 
-from PyQt6.QtWidgets import QApplication
+START_TIME = time.perf_counter()
 
-from views.MainWindow import MainWindow
+PROFILE_FLAG = "--profile-startup"
+
+
+def profile_output():
+    """--profile-startup [报告路径]，默认写到 startup_profile.json"""
+    i = sys.argv.index(PROFILE_FLAG)
+    if i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith("-"):
+        return sys.argv[i + 1]
+    return "startup_profile.json"
+
+
+def main():
+    profiler = None
+    if PROFILE_FLAG in sys.argv:
+        from core.startup_profile import StartupProfiler
+        profiler = StartupProfiler(START_TIME)
+        profiler.install_import_hook()
+    mark = profiler.mark if profiler is not None else lambda phase: None
+
+    # 已有实例在运行（同一份数据）时只让它显示窗口，不再启动第二个进程
+    from config import DATA_FILE
+    from core import ipc
+
+    name = ipc.server_name(DATA_FILE)
+    try:
+        if ipc.request(name, {"cmd": "show"}) is not None:
+            print("已有实例在运行，已切换到该窗口")
+            return 0
+    except OSError as e:
+        print("连接已运行的实例失败:", e)
+        return 1
+
+    from PyQt6.QtWidgets import QApplication
+
+    from config import STARTUP_BUDGET_MS
+    from views.MainWindow import MainWindow
+    mark("导入完成")
 
-if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    mark("创建 QApplication")
+    window = MainWindow(start_time=START_TIME)
+    window.firstPainted.connect(lambda ms: print(f"首屏渲染耗时: {ms:.0f} ms"))
+    mark("创建窗口")
+    if not window.start_instance_server(name):
+        # 与另一个同时启动的实例竞争时，对方已先开始监听
+        ipc.request(name, {"cmd": "show"})
+        return 0
+
+    if profiler is not None:
+        window.firstFrame.connect(lambda: profiler.mark("首帧"))
+        window.firstPainted.connect(lambda: profiler.mark("首屏任务绘制"))
+        window.startupFinished.connect(lambda: profiler.mark("托盘与提醒定时器就绪"))
+
+        pending = {"loading", "startup"}
+
+        def phase_done(name):
+            pending.discard(name)
+            if pending:
+                return
+            profiler.remove_import_hook()
+            ok = profiler.write(profile_output(), STARTUP_BUDGET_MS, "首帧")
+            window.save_tasks()
+            window.store.close()
+            app.exit(0 if ok else 1)
+
+        window.loadingFinished.connect(lambda: (profiler.mark("任务加载完成"), phase_done("loading")))
+        window.startupFinished.connect(lambda: phase_done("startup"))
+
     window.show()
-    sys.exit(app.exec())
+    mark("窗口显示")
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
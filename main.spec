@@ -1,4 +1,46 @@
 # -*- mode: python ; coding: utf-8 -*-
+# 打包配置：pyinstaller main.spec [-- --profile fast]（package.py --profile 会传入）
+#   default  单文件 EXE + UPX，每次启动都要解包到临时目录并解压 UPX
+#   fast     单目录，字节码优化，排除用不到的 Qt 模块、插件和翻译，不做 UPX 压缩（快速冷启动）
+import argparse
+import os
+import re
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--profile', choices=['default', 'fast'], default='default')
+profile = parser.parse_known_args()[0].profile
+fast = profile == 'fast'
+
+# 程序只用到 QtCore / QtGui / QtWidgets / QtSvg / QtXml / QtNetwork（单实例），
+# qfluentwidgets 的多媒体组件和 qframelesswindow 的 WebEngine 窗口未使用
+FAST_EXCLUDES = [
+    'PyQt6.QtQml', 'PyQt6.QtQuick', 'PyQt6.QtQuickWidgets', 'PyQt6.QtQuick3D',
+    'PyQt6.QtMultimedia', 'PyQt6.QtMultimediaWidgets', 'PyQt6.QtWebEngineCore',
+    'PyQt6.QtWebEngineWidgets', 'PyQt6.QtWebChannel', 'PyQt6.QtWebSockets',
+    'PyQt6.QtPdf', 'PyQt6.QtPdfWidgets', 'PyQt6.QtOpenGL', 'PyQt6.QtOpenGLWidgets',
+    'PyQt6.QtSql', 'PyQt6.QtTest', 'PyQt6.QtDesigner', 'PyQt6.QtHelp', 'PyQt6.QtBluetooth',
+    'PyQt6.QtNfc', 'PyQt6.QtPositioning', 'PyQt6.QtSensors', 'PyQt6.QtSerialPort',
+    'PyQt6.QtSpatialAudio', 'PyQt6.QtTextToSpeech', 'PyQt6.QtRemoteObjects', 'PyQt6.QtDBus',
+    'PyQt6.QtPrintSupport', 'PyQt6.QtSvgWidgets', 'PyQt6.QtStateMachine', 'PyQt6.QtCharts',
+    'qfluentwidgets.multimedia', 'qframelesswindow.webengine',
+    'tkinter', 'unittest', 'yaml', 'pydoc', 'doctest', 'pdb', 'lib2to3', 'xmlrpc', 'pytest',
+]
+# 排除的 Qt 库、插件和翻译（按打包后的相对路径匹配，兼容 Windows / Linux 的文件名）
+FAST_EXCLUDED_FILES = re.compile(
+    r'(^|[\\/])(lib)?Qt6(Qml|Quick|Pdf|Multimedia|WebEngine|WebChannel|WebSockets|OpenGL|Sql|Test'
+    r'|Designer|Help|VirtualKeyboard|Charts|DataVisualization|3D|Positioning|Sensors|Bluetooth|Nfc)'
+    r'|[\\/]Qt6[\\/]translations[\\/]'
+    r'|[\\/]Qt6[\\/]qml[\\/]'
+    r'|[\\/]plugins[\\/](tls|networkinformation|generic|sqldrivers|multimedia|position|sensors'
+    r'|virtualkeyboard|qmltooling|designer|printsupport)[\\/]'
+    r'|[\\/]plugins[\\/]imageformats[\\/](?!(lib)?q(svg|ico))'
+    r'|[\\/]plugins[\\/]platforminputcontexts[\\/](lib)?qtvirtualkeyboard',
+    re.IGNORECASE,
+)
+
+
+def strip_unused(toc):
+    return [entry for entry in toc if not FAST_EXCLUDED_FILES.search(entry[0])]
 
 
 a = Analysis(
@@ -14,24 +56,20 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=FAST_EXCLUDES if fast else [],
     noarchive=False,
-    optimize=0,
+    optimize=2 if fast else 0,
 )
+if fast:
+    a.binaries = strip_unused(a.binaries)
+    a.datas = strip_unused(a.datas)
 pyz = PYZ(a.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
+exe_options = dict(
     name='Fluent Todo List',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
@@ -39,5 +77,36 @@ exe = EXE(
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-    icon='src\\img\\todo.ico',
+    icon=os.path.join('src', 'img', 'todo.ico'),
 )
+
+if fast:
+    # 单目录：启动时直接加载旁边的库，不解包；Qt 库体积大，UPX 解压反而拖慢启动
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        upx=False,
+        **exe_options,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='Fluent Todo List',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        upx=True,
+        upx_exclude=[],
+        **exe_options,
+    )
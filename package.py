@@ -2,16 +2,33 @@
 # -*- coding: utf-8 -*-
 """
 PyInstaller 打包脚本
-用于将 TodoList 项目打包成单个 exe 文件
+default 配置打包成单个 exe 文件；fast 配置打包成单目录（字节码优化、排除用不到的 Qt 模块与插件、
+不做 UPX 压缩），冷启动快得多，配置见 main.spec。
+
+用法：
+    python package.py                       # default 配置
+    python package.py --profile fast
+    python package.py --compare --runs 5    # 分别打包两种配置，比较启动耗时与体积，结果写成 JSON
 """
 
+import argparse
+import datetime
+import json
 import os
+import platform
+import statistics
 import sys
 import subprocess
 import shutil
+import tempfile
+import time
 
 from config import PYINSTALLER_PATH, ROOT_PATH
 
+PROFILES = ['default', 'fast']
+APP_NAME = 'Fluent Todo List'
+RUN_TIMEOUT = 120      # 单次启动测量的超时（秒）
+
 
 def clean_previous_build():
     """清理之前的构建文件"""
@@ -56,14 +73,26 @@ def check_resources():
     return True
 
 
-def build_executable():
+def executable_path(profile, distpath='dist'):
+    """打包结果中的可执行文件：default 为单文件，fast 在同名目录下"""
+    name = APP_NAME + ('.exe' if sys.platform == 'win32' else '')
+    if profile == 'fast':
+        return os.path.join(distpath, APP_NAME, name)
+    return os.path.join(distpath, name)
+
+
+def build_executable(profile='default', distpath='dist', workpath='build'):
     """使用 PyInstaller 构建可执行文件"""
-    print("开始构建可执行文件...")
+    print(f"开始构建可执行文件（{profile} 配置）...")
 
-    # PyInstaller 命令参数
+    # PyInstaller 命令参数，-- 之后的参数交给 main.spec
     cmd = [
         str(PYINSTALLER_PATH),
-        f'{ROOT_PATH}{os.sep}main.spec'
+        '--noconfirm',
+        '--distpath', distpath,
+        '--workpath', workpath,
+        f'{ROOT_PATH}{os.sep}main.spec',
+        '--', '--profile', profile
     ]
 
     try:
@@ -116,7 +145,7 @@ def build_executable():
 
         if process.returncode == 0:
             print("打包成功完成!")
-            print(f"可执行文件位置: {os.path.join('dist', 'Fluent Todo List.exe')}")
+            print(f"可执行文件位置: {executable_path(profile, distpath)}")
             return True
         else:
             print("打包失败!")
@@ -147,8 +176,106 @@ def create_tasks_json():
         print("tasks.json 创建完成")
 
 
+# ========== 配置对比 ==========
+def bundle_size(profile, distpath):
+    """打包结果的总字节数与文件数（单文件为 exe 本身，单目录为整个目录）"""
+    exe = executable_path(profile, distpath)
+    if profile != 'fast':
+        return os.path.getsize(exe), 1
+    total = count = 0
+    for root, _, files in os.walk(os.path.dirname(exe)):
+        for name in files:
+            path = os.path.join(root, name)
+            if not os.path.islink(path):    # Linux 上的 Qt 库以符号链接引用，不重复计算
+                total += os.path.getsize(path)
+                count += 1
+    return total, count
+
+
+def measure_startup(exe, runs):
+    """启动 runs 次（--profile-startup：任务加载完成后自动退出），
+    记录进程从启动到退出的墙钟时间（含单文件的解包）和程序内测得的首帧耗时"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    wall_ms, first_frame_ms = [], []
+    with tempfile.TemporaryDirectory(prefix="todo-package-") as tmp:
+        for i in range(runs):
+            report_path = os.path.join(tmp, f"run-{i}.json")
+            start = time.perf_counter()
+            process = subprocess.run([os.path.abspath(exe), '--profile-startup', report_path], cwd=tmp, env=env,
+                                     capture_output=True, text=True, timeout=RUN_TIMEOUT)
+            elapsed = (time.perf_counter() - start) * 1000
+            # 退出码 1 只表示超出启动预算，报告仍然有效
+            if not os.path.exists(report_path):
+                raise RuntimeError(f"启动失败（退出码 {process.returncode}）: {process.stderr.strip()[-2000:]}")
+            with open(report_path, "r", encoding="utf-8") as f:
+                phases = {item["phase"]: item["ms"] for item in json.load(f)["phases"]}
+            wall_ms.append(round(elapsed, 1))
+            first_frame_ms.append(phases.get("首帧"))
+    return wall_ms, first_frame_ms
+
+
+def compare_profiles(runs, output):
+    """分别打包各配置（输出到 dist/<配置>、build/<配置>），比较启动耗时与体积，结果写成 JSON"""
+    results = []
+    for profile in PROFILES:
+        distpath, workpath = os.path.join('dist', profile), os.path.join('build', profile)
+        if not build_executable(profile, distpath, workpath):
+            results.append({"profile": profile, "error": "打包失败"})
+            continue
+        size, files = bundle_size(profile, distpath)
+        print(f"正在测量 {profile} 配置的启动耗时（{runs} 次）...", flush=True)
+        try:
+            wall_ms, first_frame_ms = measure_startup(executable_path(profile, distpath), runs)
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"测量失败 ({profile}):", e)
+            results.append({"profile": profile, "size_bytes": size, "files": files, "error": str(e)})
+            continue
+        frames = [ms for ms in first_frame_ms if ms is not None]
+        results.append({
+            "profile": profile,
+            "size_bytes": size,
+            "files": files,
+            "cold_start_ms": wall_ms[0],
+            "median_start_ms": statistics.median(wall_ms),
+            "median_first_frame_ms": statistics.median(frames) if frames else None,
+            "start_ms": wall_ms,
+            "first_frame_ms": first_frame_ms,
+        })
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "upx": shutil.which('upx') is not None,
+        "runs": runs,
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print("\n配置        体积(MB)  文件数  首次启动(ms)  启动中位数(ms)  首帧中位数(ms)")
+    for result in results:
+        if "error" in result:
+            print(f"{result['profile']:<10}  失败: {result['error'][:60]}")
+            continue
+        first_frame = result['median_first_frame_ms']
+        print(f"{result['profile']:<10}  {result['size_bytes'] / 1024 / 1024:8.1f}  {result['files']:6d}  "
+              f"{result['cold_start_ms']:12.0f}  {result['median_start_ms']:14.0f}  "
+              f"{'-' if first_frame is None else f'{first_frame:.0f}':>14}")
+    print("启动耗时为进程启动到加载完成后退出的墙钟时间（含单文件解包），首帧为程序内测得的耗时")
+    print(f"结果已写入: {os.path.abspath(output)}")
+    return all("error" not in result for result in results)
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="TodoList 打包工具")
+    parser.add_argument("--profile", choices=PROFILES, default="default", help="打包配置（见 main.spec）")
+    parser.add_argument("--compare", action="store_true", help="打包全部配置并比较启动耗时与体积")
+    parser.add_argument("--runs", type=int, default=5, help="--compare 时每种配置的启动次数")
+    parser.add_argument("-o", "--output", default="package_report.json", help="--compare 的结果 JSON 文件")
+    args = parser.parse_args()
+
     print("TodoList 打包工具")
     print("=" * 30)
 
@@ -171,10 +298,13 @@ def main():
     # 清理之前的构建
     clean_previous_build()
 
+    if args.compare:
+        return compare_profiles(max(args.runs, 1), args.output)
+
     # 执行打包
-    if build_executable():
+    if build_executable(args.profile):
         print("\n打包完成!")
-        print(f"可执行文件位置: {os.path.abspath(os.path.join('dist', 'Fluent Todo List.exe'))}")
+        print(f"可执行文件位置: {os.path.abspath(executable_path(args.profile))}")
         return True
     else:
         print("\n打包失败!")
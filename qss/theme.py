@@ -0,0 +1,136 @@
+from string import Template
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QColor, QFont
+from PyQt6.QtWidgets import QApplication
+from qfluentwidgets import Theme, qconfig, setTheme, setCustomStyleSheet
+from qfluentwidgets.common.font import getFont
+
+# 各主题的颜色 (r, g, b, a)
+PALETTES = {
+    Theme.LIGHT: {
+        "text": (0, 0, 0, 255),
+        "muted": (128, 128, 128, 255),
+        "overdue": (196, 43, 28, 255),
+        "editor_background": (249, 249, 249, 255),
+    },
+    Theme.DARK: {
+        "text": (255, 255, 255, 255),
+        "muted": (150, 150, 150, 255),
+        "overdue": (255, 153, 164, 255),
+        "editor_background": (43, 43, 43, 255),
+    },
+}
+
+# 应用级样式表：只在启动和切换主题时设置一次
+APP_STYLE_SHEET = Template("""
+TodoItemWidget {
+    background: $editor_background;
+}
+DebugOverlay {
+    background: rgba(0, 0, 0, 160);
+    color: white;
+    padding: 6px;
+    border-radius: 4px;
+}
+""")
+
+# 编辑器文字框的状态样式：按动态属性 done / overdue 匹配，
+# 通过 qfluentwidgets 的自定义样式表附加在控件自身的样式表之后（否则会被它覆盖）
+EDITOR_STYLE_SHEET = Template("""
+LineEdit[overdue="true"] { color: $overdue; }
+LineEdit[done="true"] { color: $muted; }
+""")
+
+
+def _rgba(color):
+    return "rgba({}, {}, {}, {})".format(*color)
+
+
+def _compile(template, theme):
+    return template.substitute({name: _rgba(color) for name, color in PALETTES[theme].items()})
+
+
+class ThemeEngine(QObject):
+    """主题：预编译的样式表、共享的字体和颜色对象，切换主题时统一刷新一次
+
+    - 样式表按主题预先编译并缓存，应用级样式表只设置一次；
+    - 状态（完成、逾期）用动态属性表示，切换状态只需 set_state，不再逐个 setStyleSheet；
+    - 委托绘制使用这里的 QColor / QFont 对象，切换主题时原地更新，之后由 changed 的接收方重绘一次。
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.text_font = getFont(14)
+        self.done_font = getFont(14)
+        self.done_font.setStrikeOut(True)
+        self.info_font = getFont(12)
+        self.header_font = getFont(14, QFont.Weight.DemiBold)
+        self.colors = {name: QColor() for name in PALETTES[Theme.LIGHT]}
+
+        self._app_sheets = {theme: _compile(APP_STYLE_SHEET, theme) for theme in PALETTES}
+        self._editor_sheets = {theme: _compile(EDITOR_STYLE_SHEET, theme) for theme in PALETTES}
+        self._theme = None
+        self._update()
+        qconfig.themeChanged.connect(self._update)
+
+    @property
+    def text_color(self):
+        return self.colors["text"]
+
+    @property
+    def muted_color(self):
+        return self.colors["muted"]
+
+    @property
+    def overdue_color(self):
+        return self.colors["overdue"]
+
+    def set_theme(self, name):
+        """'light' / 'dark' / 'auto'（跟随系统）"""
+        theme = Theme[name.upper()] if isinstance(name, str) else name
+        if theme != qconfig.get(qconfig.themeMode):
+            setTheme(theme, lazy=True)
+
+    def toggle(self):
+        self.set_theme(Theme.LIGHT if qconfig.theme == Theme.DARK else Theme.DARK)
+
+    def style_editor(self, line_edit):
+        setCustomStyleSheet(line_edit, self._editor_sheets[Theme.LIGHT], self._editor_sheets[Theme.DARK])
+
+    @staticmethod
+    def set_state(widget, **states):
+        """设置状态属性（如 done=True），有变化时只重新计算这一个控件的样式"""
+        changed = False
+        for name, value in states.items():
+            if widget.property(name) != value:
+                widget.setProperty(name, value)
+                changed = True
+        if changed:
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+
+    def _update(self):
+        theme = qconfig.theme
+        if theme == self._theme:
+            return
+        self._theme = theme
+        for name, color in PALETTES[theme].items():
+            self.colors[name].setRgb(*color)
+        app = QApplication.instance()
+        if app is not None and app.styleSheet() != self._app_sheets[theme]:
+            app.setStyleSheet(self._app_sheets[theme])
+        self.changed.emit()
+
+
+_engine = None
+
+
+def theme_engine():
+    """全局主题引擎（需要先创建 QApplication）"""
+    global _engine
+    if _engine is None:
+        _engine = ThemeEngine(QApplication.instance())
+    return _engine
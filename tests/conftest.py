@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# 测试直接导入仓库根目录下的 core / views 包
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def task_dict(task_id, text="任务", remind_time="2024-01-01 09:00:00", repeat="不重复", done=False):
+    """与 tasks.json 格式相同的任务字典"""
+    return {"id": task_id, "text": text, "remind_time": remind_time, "repeat": repeat, "done": done}
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """无界面的 QApplication，只有视图相关的测试需要；整个会话共用一个，避免被回收后 qfluentwidgets 的全局对象失效"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,120 @@
+import gzip
+import time
+
+import core.archive
+from conftest import task_dict
+from core.archive import TaskArchive
+from core.history import CompletionTimes, EventLog
+from core.tasks import parse_time
+
+
+def archived(task_id, text="任务", archived_at="2024-03-01 12:00:00"):
+    return dict(task_dict(task_id, text, done=True), archived_at=archived_at)
+
+
+def test_archive_restore_and_reopen(tmp_path):
+    archive = TaskArchive(tmp_path / "archive")
+    assert archive.entries() == []
+    at = parse_time("2024-03-01 12:00:00")
+    assert archive.append([task_dict("a", done=True), task_dict("b", done=True)], archived_at=at) == 2
+    archive.restore(["a"])
+    archive.append([task_dict("c", "第三条", done=True)], archived_at=at)
+    assert archive.entries() == [archived("b"), archived("c", "第三条")]
+
+    # 新实例（下次启动）回放分段得到相同结果
+    assert TaskArchive(tmp_path / "archive").entries() == [archived("b"), archived("c", "第三条")]
+
+
+def test_rearchive_keeps_latest(tmp_path):
+    archive = TaskArchive(tmp_path / "archive")
+    archive.append([task_dict("a", "旧", done=True)], archived_at=parse_time("2024-01-01 00:00:00"))
+    archive.append([task_dict("b", done=True)], archived_at=parse_time("2024-01-01 00:00:00"))
+    archive.append([task_dict("a", "新", done=True)], archived_at=parse_time("2024-03-01 12:00:00"))
+    assert [entry["id"] for entry in archive.entries()] == ["b", "a"]
+    assert archive.entries()[1] == archived("a", "新")
+
+
+def test_search(tmp_path):
+    archive = TaskArchive(tmp_path / "archive")
+    archive.append([task_dict(str(i), f"周报 第{i}周 Report", done=True) for i in range(5)]
+                   + [task_dict("x", "买菜", done=True)])
+    assert [entry["id"] for entry in archive.search("周报 report")] == ["4", "3", "2", "1", "0"]
+    assert [entry["id"] for entry in archive.search("周报", limit=2)] == ["4", "3"]
+    assert [entry["id"] for entry in archive.search("第3周")] == ["3"]
+    assert len(archive.search("")) == 6
+    assert archive.search("不存在") == []
+    # 返回副本，修改结果不影响归档
+    archive.search("买菜")[0]["text"] = "改过"
+    assert archive.search("买菜")[0]["text"] == "买菜"
+
+
+def test_segments_roll_over(tmp_path):
+    archive = TaskArchive(tmp_path / "archive", segment_bytes=200)
+    for i in range(20):
+        archive.append([task_dict(str(i), f"任务 {i}" * 10, done=True)])
+    assert len(archive.segments()) > 1
+    assert [entry["id"] for entry in TaskArchive(tmp_path / "archive").entries()] == [str(i) for i in range(20)]
+
+
+def test_search_decodes_only_new_members(tmp_path, monkeypatch):
+    """搜索结果缓存：之后的查询只读新追加的 gzip 成员，不重新解码历史分段"""
+    archive = TaskArchive(tmp_path / "archive", segment_bytes=300)
+    for i in range(10):
+        archive.append([task_dict(str(i), f"任务 {i}" * 5, done=True)])
+    archive.search("任务")
+    old_segments = set(archive.segments())
+
+    reads = []
+    read_segment = core.archive._read_segment
+    monkeypatch.setattr(core.archive, "_read_segment",
+                        lambda path, offset=0: reads.append((path, offset)) or read_segment(path, offset))
+    assert len(archive.search("任务")) == 10
+    assert reads == []
+
+    # 另一个实例（另一个进程）追加和恢复，本实例只读新增部分
+    other = TaskArchive(tmp_path / "archive", segment_bytes=300)
+    other.append([task_dict("new", "新任务", done=True)])
+    other.restore(["0"])
+    assert [entry["id"] for entry in archive.search("任务")][:2] == ["new", "9"]
+    assert "0" not in [entry["id"] for entry in archive.search("")]
+    assert reads and all(offset > 0 or path not in old_segments for path, offset in reads)
+
+
+def test_replaced_segment_is_replayed(tmp_path):
+    archive = TaskArchive(tmp_path / "archive")
+    archive.append([task_dict("a", done=True)])
+    assert len(archive.entries()) == 1
+    path = archive.segments()[0]
+    with open(path, "wb") as f:
+        f.write(gzip.compress(b'{"op": "archive", "id": "b", "task": {"text": "b"}, "archived_at": "x"}\n'))
+    assert [entry["id"] for entry in archive.entries()] == ["b"]
+
+
+def test_torn_tail_is_read_once_complete(tmp_path):
+    archive = TaskArchive(tmp_path / "archive")
+    archive.append([task_dict("a", done=True)])
+    path = archive.segments()[0]
+    member = gzip.compress(b'{"op": "archive", "id": "b", "task": {"text": "b"}, "archived_at": "x"}\n')
+    with open(path, "ab") as f:
+        f.write(member[:10])       # 另一个进程写到一半
+    assert [entry["id"] for entry in archive.entries()] == ["a"]
+    with open(path, "ab") as f:
+        f.write(member[10:])
+    assert [entry["id"] for entry in archive.entries()] == ["a", "b"]
+
+
+def test_completion_times(tmp_path):
+    log = EventLog(tmp_path / "completions.jsonl")
+    times = CompletionTimes(log)
+    log.append([{"task": "a", "time": "2024-01-01 09:00:00"}, {"task": "a", "time": "2024-02-01 09:00:00"},
+                {"task": "b", "time": "坏的时间"}])
+    times.refresh()
+    assert times.get("a") == parse_time("2024-02-01 09:00:00")
+    assert times.get("b") is None
+
+    now = time.time()
+    times.note("b", now)
+    log.append([{"task": "b", "time": "2024-01-01 09:00:00"}])
+    times.refresh()
+    # 取最近的一次
+    assert times.get("b") == now
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from conftest import task_dict
+from core.binary_snapshot import (BinarySnapshot, BinaryStore, LazyTask, binary_to_json, encode_snapshot,
+                                  json_to_binary, write_snapshot)
+
+TASKS = [
+    task_dict("0123456789abcdef0123456789abcdef", "普通任务"),
+    task_dict("legacy-id", "非十六进制 id", "2024-06-30 23:59:59", "每天", True),
+    task_dict("ABCDEF0123456789ABCDEF0123456789", "大写十六进制 id 原样保留"),
+    task_dict("b" * 32, "表情 😀", "2024-02-29 00:00:00", "工作日"),
+    task_dict("c" * 32, "", "2024-13-45 99:99:99", "每2周"),    # 无法与 epoch 互转的时间原样保存
+    task_dict("d" * 32, "长文字 " * 1000, "1999-12-31 23:59:59", "每月", True),
+]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "tasks.bin"
+    write_snapshot(path, TASKS)
+    snapshot = BinarySnapshot(path)
+    try:
+        assert len(snapshot) == len(TASKS)
+        assert list(snapshot.tasks()) == TASKS
+        records = list(snapshot.records())
+        assert [record[1] for record in records] == [task["id"] for task in TASKS]
+        assert [record[3] for record in records] == [task["repeat"] for task in TASKS]
+        assert [record[4] for record in records] == [task["done"] for task in TASKS]
+        assert snapshot.text(3) == TASKS[3]["text"]
+    finally:
+        snapshot.close()
+
+
+def test_lone_surrogate_round_trip(tmp_path):
+    """文字中的孤立代理（tasks.json 中的 \\ud800 转义）也能无损保存"""
+    path = tmp_path / "tasks.bin"
+    tasks = [task_dict("a" * 32, "孤立代理 \ud800")]
+    write_snapshot(path, tasks)
+    snapshot = BinarySnapshot(path)
+    assert list(snapshot.tasks()) == tasks
+    snapshot.close()
+
+
+def test_empty_snapshot(tmp_path):
+    path = tmp_path / "tasks.bin"
+    write_snapshot(path, [])
+    snapshot = BinarySnapshot(path)
+    assert list(snapshot.tasks()) == []
+    snapshot.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "tasks.bin"
+    path.write_bytes(b"not a snapshot" * 10)
+    with pytest.raises(ValueError):
+        BinarySnapshot(path)
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        BinarySnapshot(path)
+
+
+def test_encoding_is_deterministic():
+    assert encode_snapshot(TASKS) == encode_snapshot([dict(task) for task in TASKS])
+
+
+def test_lazy_text_survives_close(tmp_path):
+    path = tmp_path / "tasks.bin"
+    write_snapshot(path, TASKS)
+    snapshot = BinarySnapshot(path)
+    lazy = [snapshot.lazy_task(index, task_id, remind_at, repeat, done)
+            for index, task_id, remind_at, repeat, done in snapshot.records()]
+    assert isinstance(lazy[0], LazyTask)
+    assert lazy[0].text == TASKS[0]["text"]
+    snapshot.close()
+    assert [task.text for task in lazy] == [task["text"] for task in TASKS]
+    lazy[1].text = "改过"
+    assert lazy[1].text == "改过"
+
+
+def test_json_conversion(tmp_path):
+    json_path, bin_path, back = tmp_path / "tasks.json", tmp_path / "tasks.bin", tmp_path / "back.json"
+    json_path.write_text(json.dumps(TASKS, ensure_ascii=False), encoding="utf-8")
+    assert json_to_binary(json_path, bin_path) == len(TASKS)
+    assert binary_to_json(bin_path, back) == len(TASKS)
+    assert json.loads(back.read_text(encoding="utf-8")) == TASKS
+
+
+def test_store_replay_and_compaction(tmp_path):
+    # 载入为 Task 后时间按 epoch 保存，无法互转的时间不在这里比较
+    tasks = TASKS[:4] + TASKS[5:]
+    json_path, bin_path = tmp_path / "tasks.json", tmp_path / "tasks.bin"
+    json_path.write_text(json.dumps(tasks, ensure_ascii=False), encoding="utf-8")
+
+    store = BinaryStore(bin_path, json_path=json_path)
+    assert store.load() == tasks     # 首次使用时从 tasks.json 转换
+    store.record([{"op": "set", "id": tasks[0]["id"], "field": "text", "value": "改过"},
+                  {"op": "del", "id": tasks[1]["id"]},
+                  {"op": "add", "id": "new", "task": task_dict("new", "新任务")}])
+    store.close()
+
+    expected = [dict(tasks[0], text="改过")] + tasks[2:] + [task_dict("new", "新任务")]
+    store = BinaryStore(bin_path, json_path=json_path)
+    assert store.load() == expected
+    store.compact()
+    store.close()
+    assert (tmp_path / "tasks.bin.journal").stat().st_size == 0
+
+    store = BinaryStore(bin_path, json_path=json_path)
+    chunks = list(store.iter_tasks(first_size=2, chunk_size=2))
+    store.close()
+    assert [task.to_dict() | {"id": task.id} for chunk in chunks for task in chunk] == expected
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+import cli
+from core.journal import JournalStore
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """没有运行中的实例，命令直接读写临时目录中的 tasks.json"""
+    path = tmp_path / "tasks.json"
+    monkeypatch.setattr(cli, "DATA_FILE", path)
+    monkeypatch.setattr(cli, "DB_FILE", tmp_path / "tasks.db")
+    monkeypatch.setattr(cli, "STORAGE_BACKEND", "journal")
+    return path
+
+
+def test_add_and_list_locally(data_file, capsys):
+    assert cli.main(["add", "写周报", "--at", "2024-01-05 17:00", "--repeat", "每周"]) == 0
+    assert "已添加" in capsys.readouterr().out
+    assert cli.main(["list", "--json"]) == 0
+    tasks = json.loads(capsys.readouterr().out)
+    assert [(task["text"], task["remind_time"], task["repeat"]) for task in tasks] == \
+           [("写周报", "2024-01-05 17:00:00", "每周")]
+
+
+def test_failed_write_is_reported(data_file, monkeypatch, capsys):
+    def fail(self, records):
+        raise OSError("磁盘已满")
+
+    monkeypatch.setattr(JournalStore, "_write", fail)
+    assert cli.main(["add", "写不进去"]) == 1
+    captured = capsys.readouterr()
+    assert "已添加" not in captured.out
+    assert "磁盘已满" in captured.err
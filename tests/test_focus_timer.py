@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from core.focus_timer import MIN_SESSION_SECONDS, FocusLog, FocusTimer
+from core.tasks import parse_time
+
+START = parse_time("2024-03-01 09:00:00")
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    clock, wall = FakeClock(1000.0), FakeClock(float(START))
+    timer = FocusTimer(1500, clock=clock, wall=wall)
+    timer.advance = lambda seconds: (setattr(clock, "now", clock.now + seconds),
+                                     setattr(wall, "now", wall.now + seconds))
+    return timer
+
+
+def test_idle_state(timer):
+    assert not timer.is_active() and not timer.is_running()
+    assert timer.remaining() == 1500.0
+    assert timer.next_tick_delay() is None
+    assert timer.finish() is None and timer.stop() is None
+
+
+def test_remaining_follows_deadline(timer):
+    timer.start("a")
+    assert timer.is_running() and timer.remaining() == 1500.0
+    timer.advance(0.3)
+    assert timer.display_seconds() == 1500
+    assert timer.next_tick_delay() == pytest.approx(0.7)
+    # 定时器晚到多少都不累积：剩余时间只由截止时间决定
+    timer.advance(99.7)
+    assert timer.remaining() == 1400.0 and timer.next_tick_delay() == 1.0
+    timer.advance(1399.8)
+    assert timer.display_seconds() == 1 and timer.finish() is None
+    timer.advance(5)
+    assert timer.remaining() == 0.0 and timer.next_tick_delay() == 0.0
+
+
+def test_pause_freezes_remaining(timer):
+    timer.start("a")
+    timer.advance(100)
+    timer.pause()
+    assert timer.is_active() and not timer.is_running()
+    timer.advance(3600)
+    assert timer.remaining() == 1400.0 and timer.next_tick_delay() is None
+    timer.pause()
+    assert timer.remaining() == 1400.0
+    timer.resume()
+    timer.resume()
+    timer.advance(400)
+    assert timer.remaining() == 1000.0 and timer.elapsed() == 500.0
+
+
+def test_finish_returns_full_session(timer):
+    timer.start("a")
+    timer.advance(600)
+    timer.pause()
+    timer.advance(60)
+    timer.resume()
+    timer.advance(900)
+    session = timer.finish()
+    # 开始时间为墙上时间，时长不含暂停
+    assert session == {"task": "a", "start": "2024-03-01 09:00:00", "seconds": 1500, "completed": True}
+    assert not timer.is_active() and timer.finish() is None
+
+
+def test_stop_and_short_sessions(timer):
+    timer.start("a")
+    timer.advance(MIN_SESSION_SECONDS - 1)
+    assert timer.stop() is None
+    timer.start("b")
+    timer.advance(300)
+    assert timer.stop() == {"task": "b", "start": "2024-03-01 09:00:59", "seconds": 300, "completed": False}
+
+
+def test_start_replaces_active_session(timer):
+    timer.start("a")
+    timer.advance(120)
+    previous = timer.start("b", duration=600)
+    assert previous["task"] == "a" and previous["seconds"] == 120
+    assert timer.task_id == "b" and timer.remaining() == 600.0
+
+
+def test_focus_log_round_trip(tmp_path):
+    path = tmp_path / "focus.jsonl"
+    log = FocusLog(path)
+    assert log.load() == {}
+    sessions = [{"task": "a", "start": "2024-03-01 09:00:00", "seconds": 1500, "completed": True},
+                {"task": "b", "start": "2024-03-01 10:00:00", "seconds": 300, "completed": False},
+                {"task": "a", "start": "2024-03-01 11:00:00", "seconds": 600, "completed": False}]
+    assert [log.append_session(session) for session in sessions] == [1500, 300, 2100]
+    assert log.seconds("a") == 2100 and log.seconds("missing") == 0
+    assert log.read() == sessions
+
+    # 中途崩溃留下的半行与无效记录在读取时跳过，之后的追加从新的一行开始
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"task": "", "start": "2024-03-01 12:00:00", "seconds": 60}) + "\n")
+        f.write('{"task": "a", "sta')
+    reopened = FocusLog(path)
+    assert reopened.load() == {"a": 2100, "b": 300}
+    reopened.append_session(sessions[1])
+    assert FocusLog(path).load() == {"a": 2100, "b": 600}
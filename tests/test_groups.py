@@ -0,0 +1,118 @@
+import datetime
+import random
+
+import pytest
+
+from core.groups import DONE, OVERDUE, TODAY, UPCOMING, TaskGroups
+from core.tasks import Task
+
+NOW = datetime.datetime(2024, 3, 13, 12, 0)
+
+
+def make_tasks(count, seed=1, now=NOW):
+    rng = random.Random(seed)
+    base = int(now.timestamp())
+    return [Task(f"任务 {i}", base + rng.randint(-3 * 86400, 3 * 86400), done=rng.random() < 0.2)
+            for i in range(count)]
+
+
+def expected(tasks, now):
+    """按定义逐个分组排序，作为对照"""
+    fresh = TaskGroups(now)
+    groups = [[] for _ in fresh.groups]
+    for task in tasks:
+        groups[fresh.group_of(task)].append((task.remind_at, task.id))
+    return [sorted(keys) for keys in groups]
+
+
+def check(groups, tasks, now):
+    assert groups.groups == expected(tasks, now)
+    assert len(groups) == len(tasks)
+    for group, keys in enumerate(groups.groups):
+        for index, (_, task_id) in enumerate(keys):
+            assert groups.position(task_id) == (group, index)
+
+
+def test_group_of():
+    groups = TaskGroups(NOW)
+    today_start, tomorrow_start = int(groups.today_start), int(groups.tomorrow_start)
+    assert groups.group_of(Task("a", today_start - 1)) == OVERDUE
+    assert groups.group_of(Task("a", today_start)) == TODAY
+    assert groups.group_of(Task("a", tomorrow_start - 1)) == TODAY
+    assert groups.group_of(Task("a", tomorrow_start)) == UPCOMING
+    assert groups.group_of(Task("a", today_start - 1, done=True)) == DONE
+
+
+def test_rebuild_and_extend():
+    tasks = make_tasks(500)
+    groups = TaskGroups(NOW)
+    groups.rebuild(tasks[:100])
+    groups.extend(tasks[100:])
+    groups.extend(tasks[:10])    # 已有的任务不重复加入
+    check(groups, tasks, NOW)
+
+
+def test_locate_matches_add_position():
+    tasks = make_tasks(200)
+    groups = TaskGroups(NOW)
+    groups.rebuild(tasks)
+    rng = random.Random(2)
+    for task in rng.sample(tasks, 50):
+        task.remind_at += rng.randint(-86400, 86400)
+        target = groups.locate(task)
+        assert groups.move(task)[1] == target
+        assert groups.position(task.id) == target
+    check(groups, tasks, NOW)
+
+
+@pytest.mark.parametrize("batch", [1, 10, 300])
+def test_move_many_and_remove_many(batch):
+    """少量时逐个移动、大量时整体合并，结果都与重新分组一致"""
+    rng = random.Random(batch)
+    tasks = make_tasks(1000, seed=batch)
+    groups = TaskGroups(NOW)
+    groups.rebuild(tasks)
+    for _ in range(10):
+        changed = rng.sample(tasks, batch)
+        for task in changed:
+            task.remind_at += rng.randint(-86400, 86400)
+            task.done = rng.random() < 0.2
+        groups.move_many(changed)
+        check(groups, tasks, NOW)
+
+        removed = {task.id for task in rng.sample(tasks, min(batch, len(tasks) // 10))}
+        groups.remove_many(removed | {"missing"})
+        tasks = [task for task in tasks if task.id not in removed]
+        check(groups, tasks, NOW)
+
+
+def test_subset():
+    tasks = make_tasks(400)
+    groups = TaskGroups(NOW)
+    groups.rebuild(tasks)
+    for size in (5, 300):
+        chosen = random.Random(size).sample(tasks, size)
+        subset = groups.subset({task.id for task in chosen})
+        check(subset, chosen, NOW)
+    check(groups, tasks, NOW)
+
+
+@pytest.mark.parametrize("days, hour", [(0, 23), (1, 0), (1, 18), (2, 9), (10, 0)])
+def test_day_moves_forward(days, hour):
+    tasks = make_tasks(1000)
+    groups = TaskGroups(NOW)
+    groups.rebuild(tasks)
+    later = datetime.datetime.combine(NOW.date() + datetime.timedelta(days=days), datetime.time(hour))
+
+    moves = groups.day_moves(later)
+    assert all(count > 0 and target < source for source, count, target in moves)
+    for move in moves:
+        groups.move_block(*move)
+    groups.set_day(later)
+    check(groups, tasks, later)
+
+
+def test_day_moves_backwards_needs_rebuild():
+    groups = TaskGroups(NOW)
+    groups.rebuild(make_tasks(10))
+    assert groups.day_moves(NOW - datetime.timedelta(days=1)) is None
@@ -0,0 +1,70 @@
+import sys
+import threading
+import time
+
+import pytest
+from PyQt6.QtCore import QCoreApplication, QEvent
+
+from core import ipc
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="命名管道不支持超时")
+
+
+def run_request(name, message, **kwargs):
+    """在线程中发送请求，主线程处理服务端事件直到得到结果"""
+    result = {}
+
+    def run():
+        try:
+            result["response"] = ipc.request(name, message, **kwargs)
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+def wait(thread, seconds):
+    deadline = time.monotonic() + seconds
+    while thread.is_alive() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server(qapp):
+    from views.InstanceServer import InstanceServer
+
+    requests = []
+    server = InstanceServer(f"fluent-todo-test-{time.monotonic_ns()}",
+                            lambda request: requests.append(request) or {"ok": True, "count": len(requests)})
+    assert server.listen()
+    yield server, requests
+    server.close()
+    # 连接与服务端在 Qt 事件循环中释放，不留给垃圾回收
+    server.deleteLater()
+    QCoreApplication.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+
+def test_queued_request_waits_past_timeout(server):
+    """加载完成前的请求先得到 pending，客户端改用 pending_timeout，不会按普通超时报失败"""
+    server, requests = server
+    thread, result = run_request(server.name, {"cmd": "import", "tasks": []}, timeout=0.3, pending_timeout=10)
+    wait(thread, 1.0)
+    assert thread.is_alive() and requests == []
+    server.set_ready()
+    wait(thread, 5)
+    assert result == {"response": {"ok": True, "count": 1}}
+
+
+def test_timeout_is_reported(server):
+    server, requests = server
+    thread, result = run_request(server.name, {"cmd": "list"}, timeout=0.3, pending_timeout=0.3)
+    wait(thread, 5)
+    assert isinstance(result["error"], TimeoutError)
+
+
+def test_no_instance(qapp):
+    assert ipc.request(f"fluent-todo-missing-{time.monotonic_ns()}", {"cmd": "ping"}) is None
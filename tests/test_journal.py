@@ -0,0 +1,167 @@
+import json
+import os
+
+import pytest
+
+from conftest import task_dict
+from core.journal import JournalStore, read_snapshot, read_tasks
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "tasks.json"), str(tmp_path / "tasks.journal")
+
+
+def open_store(snapshot, **kwargs):
+    store = JournalStore(snapshot, **kwargs)
+    items = store.load()
+    return store, items
+
+
+def chunked(store):
+    return [item for chunk in store.iter_chunks(first_size=2, chunk_size=3) for item in chunk]
+
+
+def test_replay_after_restart(paths):
+    snapshot, journal = paths
+    store, items = open_store(snapshot)
+    assert items == []
+    store.record([{"op": "add", "id": "a", "task": task_dict("a", "第一条")},
+                  {"op": "add", "id": "b", "task": task_dict("b", "第二条")}])
+    store.commit()
+    store.record([{"op": "set", "id": "a", "field": "text", "value": "改过"},
+                  {"op": "done", "id": "b", "value": True},
+                  {"op": "add", "id": "c", "task": task_dict("c")},
+                  {"op": "del", "id": "c"}])
+    store.close()
+    assert not os.path.exists(snapshot)
+    assert os.path.getsize(journal) > 0
+
+    expected = [task_dict("a", "改过"), task_dict("b", "第二条", done=True)]
+    store, items = open_store(snapshot)
+    store.close()
+    assert items == expected
+    assert chunked(JournalStore(snapshot)) == expected
+
+
+def test_same_field_edits_are_coalesced(paths):
+    snapshot, journal = paths
+    store, _ = open_store(snapshot)
+    store.record([{"op": "add", "id": "a", "task": task_dict("a")}])
+    for i in range(100):
+        store.record([{"op": "set", "id": "a", "field": "text", "value": f"第 {i} 次"}])
+    store.close()
+    with open(journal, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+    assert read_tasks(snapshot)[0]["a"]["text"] == "第 99 次"
+
+
+def test_compaction_writes_snapshot_and_truncates_journal(paths):
+    snapshot, journal = paths
+    store, _ = open_store(snapshot, compact_threshold=1)
+    store.record([{"op": "add", "id": str(i), "task": task_dict(str(i), f"任务 {i}")} for i in range(5)])
+    store.flush()
+    store.record([{"op": "del", "id": "3"}])
+    store.close()
+
+    assert os.path.getsize(journal) == 0
+    with open(snapshot, encoding="utf-8") as f:
+        assert [task["id"] for task in json.load(f)] == ["0", "1", "2", "4"]
+    store, items = open_store(snapshot)
+    store.close()
+    assert [item["id"] for item in items] == ["0", "1", "2", "4"]
+
+
+def test_torn_journal_line_is_ignored(paths):
+    snapshot, journal = paths
+    store, _ = open_store(snapshot)
+    store.record([{"op": "add", "id": "a", "task": task_dict("a")}])
+    store.close()
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "id": "a", "fie')
+    store, items = open_store(snapshot)
+    store.close()
+    assert items == [task_dict("a")]
+
+
+def test_legacy_snapshot_gets_ids(paths):
+    snapshot, _ = paths
+    with open(snapshot, "w", encoding="utf-8") as f:
+        json.dump([{"text": "旧版", "remind_time": "2024-01-01 09:00:00"}], f, ensure_ascii=False)
+    store, items = open_store(snapshot)
+    store.close()
+    task_id = items[0]["id"]
+    assert items == [task_dict(task_id, "旧版")]
+    # 补写的 id 已经压缩进快照，下次加载不变
+    store, items = open_store(snapshot)
+    store.close()
+    assert items[0]["id"] == task_id
+
+
+def test_local_edits_until_compacted(paths):
+    snapshot, _ = paths
+    store, _ = open_store(snapshot)
+    store.record([{"op": "add", "id": "a", "task": task_dict("a")}])
+    store.commit()
+    store.record([{"op": "set", "id": "b", "field": "text", "value": "x"}, {"op": "del", "id": "c"}])
+    assert store.local_edits() == {"a": {"add"}, "b": {"text"}, "c": {"del"}}
+    store.compact()
+    store.flush()
+    assert store.local_edits() == {}
+    store.close()
+
+
+def test_read_snapshot(paths):
+    snapshot, _ = paths
+    assert read_snapshot(snapshot) == (None, None)
+    with open(snapshot, "w", encoding="utf-8") as f:
+        json.dump([task_dict("a"), {"text": "无 id", "remind_time": "2024-01-01 09:00:00"}], f)
+    signature, tasks = read_snapshot(snapshot)
+    assert signature is not None
+    assert tasks[0] == task_dict("a")
+    # 没有 id 的条目留给 merge_external 按内容对应，不在这里生成
+    assert "id" not in tasks[1] and tasks[1]["repeat"] == "不重复" and tasks[1]["done"] is False
+
+
+def test_local_edits_are_pruned_on_commit_after_compaction(paths):
+    snapshot, _ = paths
+    store, _ = open_store(snapshot)
+    for i in range(50):
+        store.record([{"op": "add", "id": str(i), "task": task_dict(str(i))}])
+        store.commit()
+    store.compact()
+    store.wait()
+    store.record([{"op": "set", "id": "0", "field": "text", "value": "改过"}])
+    store.commit()
+    # 不调用 local_edits 也会清理
+    assert set(store._edits) == {("0", "text")}
+    store.close()
+
+
+def test_binary_store_does_not_track_local_edits(tmp_path):
+    from core.binary_snapshot import BinaryStore
+
+    store = BinaryStore(tmp_path / "tasks.bin")
+    store.load()
+    for i in range(50):
+        store.record([{"op": "add", "id": str(i), "task": task_dict(str(i))}])
+        store.commit()
+    assert store._edits == {}
+    store.close()
+
+
+@pytest.mark.parametrize("content", [
+    {"text": "不是数组"},
+    [task_dict("a"), "不是对象"],
+    [task_dict("a"), {"remind_time": "2024-01-01 09:00:00"}],
+    [{"text": "缺少时间"}],
+    [task_dict("a", text=None)],
+    [dict(task_dict("a"), done="yes")],
+    [dict(task_dict("a"), id=3)],
+])
+def test_read_snapshot_rejects_invalid_entries(paths, content):
+    snapshot, _ = paths
+    with open(snapshot, "w", encoding="utf-8") as f:
+        json.dump(content, f)
+    with pytest.raises(ValueError):
+        read_snapshot(snapshot)
@@ -0,0 +1,102 @@
+import datetime
+import json
+import time
+
+import pytest
+from PyQt6.QtCore import QCoreApplication, QEvent
+
+from conftest import task_dict
+from core.tasks import format_time
+
+DAY = 86400
+
+
+def pump(until, seconds=5):
+    deadline = time.monotonic() + seconds
+    while not until() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    assert until()
+
+
+@pytest.fixture
+def window(qapp, tmp_path):
+    from views.MainWindow import MainWindow
+
+    created = []
+
+    def create(tasks, completions=()):
+        data_file = tmp_path / "tasks.json"
+        data_file.write_text(json.dumps(tasks, ensure_ascii=False), encoding="utf-8")
+        (tmp_path / "completions.jsonl").write_text(
+            "".join(json.dumps(event) + "\n" for event in completions), encoding="utf-8")
+        window = MainWindow(data_file=data_file, backend="journal", archive_after_days=30)
+        window.archived = []
+        window.archiveFinished.connect(window.archived.append)
+        created.append(window)
+        pump(lambda: window._tasks_loaded and not window._archiving)
+        return window
+
+    yield create
+    for window in created:
+        window.quit_app()
+        window.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+
+def test_archive_by_completion_time_and_restore(window):
+    old = format_time(time.time() - 100 * DAY)
+    recent = format_time(time.time() - DAY)
+    w = window(
+        [task_dict("open", remind_time=old),
+         task_dict("no-log", remind_time=old, done=True),
+         task_dict("done-recently", remind_time=old, done=True),
+         task_dict("done-long-ago", remind_time=old, done=True)],
+        [{"task": "done-recently", "time": recent}, {"task": "done-long-ago", "time": old}])
+
+    # 提醒时间早但最近才完成的任务留在列表中
+    assert sorted(entry["id"] for entry in w.archive.entries()) == ["done-long-ago", "no-log"]
+    assert sorted(task.id for task in w.tasks) == ["done-recently", "open"]
+
+    # 今天标记完成的旧任务不会立刻归档
+    w.task_model.update_task("open", done=True)
+    w.archive_done_tasks()
+    pump(lambda: not w._archiving)
+    assert w.archived[-1] == 0 and w.tasks.get("open") is not None
+
+    # 恢复：任务回到列表，写盘后从归档中移除，本次运行中不再自动归档
+    w.restore_archived([entry for entry in w.archive.entries() if entry["id"] == "no-log"])
+    assert w.tasks.get("no-log").done
+    pump(lambda: [entry["id"] for entry in w.archive.entries()] == ["done-long-ago"])
+    w.archive_done_tasks()
+    pump(lambda: not w._archiving)
+    assert w.tasks.get("no-log") is not None
+
+
+@pytest.mark.parametrize("action", [
+    lambda w: w.mark_selected(True),
+    lambda w: w.set_selected_repeat("每周"),
+    lambda w: w.reschedule_selected(datetime.timedelta(days=1)),
+    lambda w: w.delete_selected(),
+])
+def test_bulk_action_is_one_model_update_and_one_save(window, action):
+    future = format_time(time.time() + DAY)
+    w = window([task_dict(str(i), remind_time=future) for i in range(100)])
+    w.task_list.selectAll()
+    assert len(w.selected_ids()) == 100
+    w.store.flush()
+    written = w.store._batches_written
+    batches = []
+    w.tasks.add_listener(batches.append)
+    updates = []
+    model = w.task_model
+    for signal in (model.dataChanged, model.layoutChanged, model.modelReset, model.rowsMoved, model.rowsRemoved):
+        signal.connect(lambda *args: updates.append(True))
+
+    action(w)
+    assert len(batches) == 1 and len(batches[0]) == 100
+    assert len(updates) == 1
+    # 批量操作立即提交，只写一批
+    assert not w.save_timer.isActive()
+    assert w.store.wait(5)
+    assert w.store._batches_written == written + 1
@@ -0,0 +1,71 @@
+from conftest import task_dict
+from core.merge import merge_external
+from core.tasks import TaskManager, parse_time
+
+
+def make_manager(*items):
+    manager = TaskManager()
+    manager.load([dict(item) for item in items])
+    return manager
+
+
+def test_external_edits_are_applied():
+    manager = make_manager(task_dict("a", "旧"), task_dict("b"))
+    theirs = [task_dict("a", "新", done=True), task_dict("b", remind_time="2024-02-01 10:00:00")]
+    added, changes, removed = merge_external(manager, theirs, {})
+    assert added == [] and removed == []
+    assert changes == [("a", {"text": "新", "done": True}),
+                       ("b", {"remind_at": parse_time("2024-02-01 10:00:00")})]
+
+
+def test_local_edits_win_per_field():
+    manager = make_manager(task_dict("a", "本地"))
+    theirs = [task_dict("a", "外部", repeat="每天")]
+    added, changes, removed = merge_external(manager, theirs, {"a": {"text"}})
+    assert changes == [("a", {"repeat": "每天"})]
+
+
+def test_added_and_removed():
+    manager = make_manager(task_dict("a"), task_dict("b"), task_dict("local"))
+    theirs = [task_dict("a"), task_dict("new"), task_dict("new")]
+    added, changes, removed = merge_external(manager, theirs, {"local": {"add"}})
+    assert added == [task_dict("new")]
+    assert changes == []
+    # b 只在本地且没有改过：外部删除；local 是本地新增的，保留
+    assert removed == ["b"]
+
+
+def test_local_delete_is_kept():
+    manager = make_manager(task_dict("a"))
+    added, changes, removed = merge_external(manager, [task_dict("a"), task_dict("gone")], {"gone": {"del"}})
+    assert added == [] and changes == [] and removed == []
+
+
+def test_invalid_external_time_is_ignored():
+    manager = make_manager(task_dict("a"))
+    added, changes, removed = merge_external(manager, [task_dict("a", remind_time="坏的时间")], {})
+    assert changes == []
+
+
+def test_entries_without_id_keep_existing_ids():
+    """手工编辑、不带 id 的外部文件：每次读取都对应到同一批本地任务，不产生删除和新增"""
+    manager = make_manager(task_dict("a", "买牛奶"), task_dict("b", "开会", done=True), task_dict("c", "买牛奶"))
+    theirs = [
+        {"text": "买牛奶", "remind_time": "2024-01-01 09:00:00"},
+        {"text": "开会", "remind_time": "2024-01-01 09:00:00", "done": True},
+        {"text": "买牛奶", "remind_time": "2024-01-01 09:00:00", "repeat": "不重复", "done": False},
+    ]
+    added, changes, removed = merge_external(manager, theirs, {})
+    assert (added, changes, removed) == ([], [], [])
+    assert [item["id"] for item in theirs] == ["a", "b", "c"]
+
+
+def test_entries_without_id_fall_back_to_text():
+    manager = make_manager(task_dict("a", "买牛奶"), task_dict("b", "开会"))
+    theirs = [task_dict("b", "开会"),
+              {"text": "买牛奶", "remind_time": "2024-02-01 10:00:00"},
+              {"text": "新写的", "remind_time": "2024-02-01 10:00:00"}]
+    added, changes, removed = merge_external(manager, theirs, {})
+    assert changes == [("a", {"remind_at": parse_time("2024-02-01 10:00:00")})]
+    assert [item["text"] for item in added] == ["新写的"] and added[0]["id"] not in ("a", "b")
+    assert removed == []
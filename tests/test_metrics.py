@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+
+from core.metrics import Metrics, MetricsExporter, StallWatchdog
+
+
+def test_disabled_records_nothing():
+    metrics = Metrics()
+    metrics.incr("a")
+    metrics.gauge("g", 1)
+    metrics.observe("t", 0.5)
+    with metrics.timer("t"):
+        pass
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {} and snapshot["gauges"] == {} and snapshot["timers"] == {}
+
+
+def test_counters_gauges_and_timers():
+    metrics = Metrics()
+    metrics.enable()
+    metrics.incr("saves")
+    metrics.incr("saves", 2)
+    metrics.gauge("tasks", 10)
+    metrics.gauge("tasks", 12)
+    for seconds in (0.002, 0.006, 0.004):
+        metrics.observe("save", seconds)
+
+    @metrics.timed()
+    def work():
+        return 42
+
+    assert work() == 42 and work.__name__ == "work"
+    with metrics.timer("block"):
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"saves": 3}
+    assert snapshot["gauges"] == {"tasks": 12}
+    assert snapshot["timers"]["save"] == {"count": 3, "total_ms": 12.0, "avg_ms": 4.0, "max_ms": 6.0,
+                                          "last_ms": 4.0}
+    assert snapshot["timers"]["work"]["count"] == 1
+    assert snapshot["timers"]["block"]["count"] == 1
+
+
+def test_prometheus_names_and_types():
+    metrics = Metrics()
+    metrics.enable()
+    metrics.incr("storage errors")
+    metrics.gauge("tasks", 5)
+    metrics.observe("merge.external", 0.5)
+    text = metrics.to_prometheus()
+    assert "# TYPE todo_storage_errors_total counter\ntodo_storage_errors_total 1\n" in text
+    assert "todo_tasks 5\n" in text
+    assert "todo_merge_external_seconds_count 1\ntodo_merge_external_seconds_sum 0.500000\n" in text
+    assert "todo_merge_external_seconds_max 0.500000\n" in text
+
+
+def test_exporter_formats(tmp_path):
+    metrics = Metrics()
+    metrics.enable()
+    metrics.incr("saves")
+    jsonl = MetricsExporter(metrics, tmp_path / "metrics.jsonl")
+    jsonl.dump()
+    jsonl.dump()
+    lines = (tmp_path / "metrics.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["counters"] for line in lines] == [{"saves": 1}] * 2
+
+    prom = MetricsExporter(metrics, tmp_path / "metrics.prom")
+    prom.dump()
+    prom.dump()
+    assert (tmp_path / "metrics.prom").read_text(encoding="utf-8") == metrics.to_prometheus()
+
+
+def blocking_call(watchdog, seconds):
+    watchdog.beat()
+    time.sleep(seconds)
+    watchdog.beat()
+
+
+def test_watchdog_records_stall_with_stack():
+    metrics = Metrics()
+    metrics.enable()
+    watchdog = StallWatchdog(metrics, threshold=0.05)
+    watchdog.start()
+    try:
+        blocking_call(watchdog, 0.3)
+        deadline = time.monotonic() + 2
+        while not metrics.stalls and time.monotonic() < deadline:
+            watchdog.beat()
+            time.sleep(0.01)
+    finally:
+        watchdog.stop()
+
+    assert len(metrics.stalls) == 1
+    stall = metrics.stalls[0]
+    assert 250 <= stall["ms"] < 1000
+    assert any("blocking_call" in line for line in stall["stack"])
+    assert metrics.counters["gui_stalls"] == 1
+
+
+def test_watchdog_ignores_regular_beats():
+    metrics = Metrics()
+    metrics.enable()
+    watchdog = StallWatchdog(metrics, threshold=0.1, thread_id=threading.get_ident())
+    watchdog.start()
+    for _ in range(30):
+        watchdog.beat()
+        time.sleep(0.01)
+    watchdog.stop()
+    assert list(metrics.stalls) == []
+
+
+def test_concurrent_recording_and_export():
+    metrics = Metrics()
+    metrics.enable()
+    stop = threading.Event()
+
+    def writer(n):
+        for i in range(2000):
+            metrics.incr("count")
+            metrics.gauge(f"gauge_{n}_{i % 50}", i)
+            metrics.observe("step", 0.001)
+
+    def exporter():
+        while not stop.is_set():
+            metrics.snapshot()
+            metrics.to_prometheus()
+
+    reader = threading.Thread(target=exporter)
+    reader.start()
+    writers = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    reader.join()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["count"] == 8000
+    assert len(snapshot["gauges"]) == 200
+    assert snapshot["timers"]["step"]["count"] == 8000
+    assert "todo_count_total 8000" in metrics.to_prometheus()
@@ -0,0 +1,87 @@
+from core.notifications import NotificationDispatcher, RecordingBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_dispatcher(**kwargs):
+    clock = FakeClock()
+    backend = RecordingBackend()
+    return NotificationDispatcher(backend, clock=clock, **kwargs), backend, clock
+
+
+def test_waits_for_coalescing_window():
+    dispatcher, backend, clock = make_dispatcher(window=1.0)
+    assert dispatcher.next_delay() is None
+    dispatcher.push("a", "提醒", "任务 A")
+    assert dispatcher.next_delay() == 1.0
+    assert not dispatcher.flush()
+    clock.now += 1.0
+    assert dispatcher.next_delay() == 0
+    assert dispatcher.flush()
+    assert backend.shown == [("提醒", "任务 A")]
+    assert len(dispatcher) == 0
+
+
+def test_burst_is_coalesced_into_one_summary():
+    dispatcher, backend, clock = make_dispatcher(window=1.0)
+    for i in range(5):
+        dispatcher.push(i, "提醒", f"任务 {i}")
+        clock.now += 0.1
+    clock.now += 1.0
+    assert dispatcher.flush()
+    assert backend.shown == [("提醒（5 条）", "任务 0\n任务 1\n任务 2\n以及另外 2 条")]
+
+
+def test_same_key_keeps_latest():
+    dispatcher, backend, clock = make_dispatcher(window=0)
+    dispatcher.push("a", "提醒", "旧")
+    dispatcher.push("a", "提醒", "新")
+    assert dispatcher.flush()
+    assert backend.shown == [("提醒", "新")]
+
+
+def test_discard():
+    dispatcher, backend, clock = make_dispatcher(window=0)
+    dispatcher.push("a", "提醒", "A")
+    dispatcher.discard("a")
+    assert dispatcher.next_delay() is None
+    assert not dispatcher.flush()
+    assert backend.shown == []
+
+
+def test_rate_limit_with_token_bucket():
+    dispatcher, backend, clock = make_dispatcher(window=0, interval=10.0, burst=3)
+    for i in range(3):
+        dispatcher.push(i, "提醒", f"任务 {i}")
+        assert dispatcher.flush()
+
+    # 令牌用完：继续排队，直到恢复一个令牌，期间的通知合并为一条
+    dispatcher.push(3, "提醒", "任务 3")
+    dispatcher.push(4, "提醒", "任务 4")
+    assert dispatcher.next_delay() == 10.0
+    clock.now += 9
+    assert not dispatcher.flush()
+    clock.now += 1
+    assert dispatcher.flush()
+    assert len(backend.shown) == 4
+    assert backend.shown[-1] == ("提醒（2 条）", "任务 3\n任务 4")
+
+
+def test_tokens_refill_up_to_burst():
+    dispatcher, backend, clock = make_dispatcher(window=0, interval=10.0, burst=2)
+    for i in range(2):
+        dispatcher.push(i, "提醒", "x")
+        dispatcher.flush()
+    clock.now += 1000
+    for i in range(3):
+        dispatcher.push(i, "提醒", "x")
+        dispatcher.flush()
+    # 空闲很久也只恢复 burst 个令牌
+    assert len(backend.shown) == 4
+    assert dispatcher.next_delay() == 10.0
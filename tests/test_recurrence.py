@@ -0,0 +1,100 @@
+import datetime
+import random
+
+import pytest
+
+from core.recurrence import _add_months, is_repeating, next_occurrence, parse_rule
+
+D = datetime.datetime
+
+
+def brute_force(start, repeat, after):
+    """逐次推移到第一个晚于 after 的时间，作为 next_occurrence 的对照"""
+    kind, n = parse_rule(repeat)
+    if start > after:
+        return start, 0
+    if kind is None:
+        return None, 1
+
+    missed = 0
+    if kind == "workdays":
+        current = start
+        while current <= after:
+            missed += 1
+            current += datetime.timedelta(days=1)
+            while current.weekday() >= 5:
+                current += datetime.timedelta(days=1)
+        return current, missed
+
+    current = start
+    while current <= after:
+        missed += 1
+        current = start + datetime.timedelta(days=n * missed) if kind == "days" else _add_months(start, n * missed)
+    return current, missed
+
+
+@pytest.mark.parametrize("repeat, expected", [
+    ("不重复", (None, 0)),
+    ("每天", ("days", 1)),
+    ("每3天", ("days", 3)),
+    ("每周", ("days", 7)),
+    ("每2周", ("days", 14)),
+    ("每月", ("months", 1)),
+    ("每6月", ("months", 6)),
+    ("工作日", ("workdays", 1)),
+    ("每0天", (None, 0)),
+    ("每年", (None, 0)),
+    ("", (None, 0)),
+    (None, (None, 0)),
+])
+def test_parse_rule(repeat, expected):
+    assert parse_rule(repeat) == expected
+    assert is_repeating(repeat) == (expected[0] is not None)
+
+
+def test_future_start_is_returned_unchanged():
+    start = D(2024, 5, 1, 9)
+    assert next_occurrence(start, "每天", D(2024, 4, 1)) == (start, 0)
+    assert next_occurrence(start, "不重复", D(2024, 4, 1)) == (start, 0)
+
+
+def test_no_repeat_in_the_past():
+    assert next_occurrence(D(2024, 1, 1, 9), "不重复", D(2024, 1, 2)) == (None, 1)
+
+
+def test_daily_catch_up():
+    assert next_occurrence(D(2024, 1, 1, 9), "每天", D(2024, 1, 3, 10)) == (D(2024, 1, 4, 9), 3)
+    # 恰好等于提醒时刻也算错过
+    assert next_occurrence(D(2024, 1, 1, 9), "每天", D(2024, 1, 3, 9)) == (D(2024, 1, 4, 9), 3)
+
+
+def test_monthly_keeps_day_of_month_after_short_months():
+    start = D(2024, 1, 31, 8)
+    assert next_occurrence(start, "每月", D(2024, 2, 1)) == (D(2024, 2, 29, 8), 1)
+    # 按 start 推移而不是逐月累积，二月之后回到 31 日
+    assert next_occurrence(start, "每月", D(2024, 3, 1)) == (D(2024, 3, 31, 8), 2)
+
+
+def test_workdays_skip_weekend():
+    friday = D(2024, 1, 5, 9)
+    assert next_occurrence(friday, "工作日", D(2024, 1, 6, 12)) == (D(2024, 1, 8, 9), 1)
+    assert next_occurrence(friday, "工作日", D(2024, 1, 8, 9)) == (D(2024, 1, 9, 9), 2)
+
+
+def test_long_downtime_is_constant_time():
+    start = D(2000, 1, 1, 7)
+    occurrence, missed = next_occurrence(start, "每天", D(2024, 1, 1, 8))
+    assert occurrence == D(2024, 1, 2, 7)
+    assert missed == (D(2024, 1, 2) - D(2000, 1, 1)).days
+
+
+@pytest.mark.parametrize("repeat", ["每天", "每3天", "每周", "每2周", "每月", "每2月", "工作日"])
+def test_matches_brute_force(repeat):
+    rng = random.Random(repeat)
+    for _ in range(200):
+        start = D(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 400), minutes=rng.randint(0, 1439))
+        if parse_rule(repeat)[0] == "workdays":
+            while start.weekday() >= 5:
+                start += datetime.timedelta(days=1)
+        after = start + datetime.timedelta(days=rng.randint(-3, 120), minutes=rng.randint(-720, 720))
+        assert next_occurrence(start, repeat, after) == brute_force(start, repeat, after), (start, after)
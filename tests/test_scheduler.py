@@ -0,0 +1,79 @@
+import random
+
+from core.scheduler import ReminderScheduler
+
+
+def test_pop_due_in_time_order():
+    scheduler = ReminderScheduler()
+    scheduler.rebuild([("b", 20), ("a", 10), ("c", 30), ("none", None)])
+    assert len(scheduler) == 3
+    assert scheduler.next_deadline() == 10
+    assert scheduler.pop_due(25) == ["a", "b"]
+    assert scheduler.next_deadline() == 30
+    assert scheduler.pop_due(25) == []
+
+
+def test_reschedule_invalidates_old_entry():
+    scheduler = ReminderScheduler()
+    scheduler.schedule("a", 10)
+    scheduler.schedule("a", 50)
+    assert scheduler.next_deadline() == 50
+    assert scheduler.pop_due(10) == []
+    assert scheduler.pop_due(50) == ["a"]
+    assert scheduler.pop_due(100) == []
+
+
+def test_reschedule_earlier():
+    scheduler = ReminderScheduler()
+    scheduler.schedule("a", 50)
+    scheduler.schedule("a", 10)
+    assert scheduler.pop_due(10) == ["a"]
+    assert scheduler.pop_due(50) == []
+
+
+def test_cancel_and_schedule_none():
+    scheduler = ReminderScheduler()
+    scheduler.schedule("a", 10)
+    scheduler.schedule("b", 20)
+    scheduler.cancel("a")
+    scheduler.schedule("b", None)
+    scheduler.cancel("missing")
+    assert len(scheduler) == 0
+    assert scheduler.next_deadline() is None
+    assert scheduler.pop_due(100) == []
+
+
+def test_stale_entries_do_not_accumulate():
+    scheduler = ReminderScheduler()
+    for i in range(10000):
+        scheduler.schedule("a", i)
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+    assert scheduler.pop_due(10 ** 9) == ["a"]
+
+
+def test_matches_brute_force():
+    rng = random.Random(5)
+    scheduler = ReminderScheduler()
+    expected = {}
+    now = 0
+    for _ in range(5000):
+        op = rng.random()
+        task_id = rng.randrange(50)
+        if op < 0.6:
+            fire_at = rng.randint(now, now + 100)
+            scheduler.schedule(task_id, fire_at)
+            expected[task_id] = fire_at
+        elif op < 0.8:
+            scheduler.cancel(task_id)
+            expected.pop(task_id, None)
+        else:
+            now += rng.randint(0, 30)
+            due = scheduler.pop_due(now)
+            want = sorted((fire_at, task_id) for task_id, fire_at in expected.items() if fire_at <= now)
+            assert [fire_at for fire_at, _ in want] == [expected[task_id] for task_id in due]
+            assert set(due) == {task_id for _, task_id in want}
+            for task_id in due:
+                del expected[task_id]
+        assert len(scheduler) == len(expected)
+        assert scheduler.next_deadline() == min(expected.values(), default=None)
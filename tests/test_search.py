@@ -0,0 +1,120 @@
+import datetime
+import random
+
+import pytest
+
+from core.search import TaskIndex, day_range, week_range
+from core.tasks import TaskManager
+
+NOW = datetime.datetime(2024, 3, 13, 12, 0)   # 星期三
+WORDS = ["买牛奶", "写报告", "Review PR", "review code", "开会", "跑步", "阅读", "report"]
+
+
+def make_manager(count=200, seed=1):
+    rng = random.Random(seed)
+    manager = TaskManager()
+    base = int(NOW.timestamp())
+    for i in range(count):
+        text = " ".join(rng.sample(WORDS, 2)) + f" {i}"
+        manager.add(text, base + rng.randint(-10, 10) * 43200, done=rng.random() < 0.3)
+    return manager
+
+
+def brute_search(manager, query):
+    terms = query.lower().split()
+    if not terms:
+        return None
+    return {task.id for task in manager if all(term in task.text.lower() for term in terms)}
+
+
+def brute_filter(manager, query, kind):
+    ids = brute_search(manager, query)
+    now = NOW.timestamp()
+    tests = {
+        "全部": lambda task: True,
+        "已过期": lambda task: task.remind_at < now and not task.done,
+        "今天": lambda task: day_range(NOW)[0] <= task.remind_at < day_range(NOW)[1],
+        "本周": lambda task: week_range(NOW)[0] <= task.remind_at < week_range(NOW)[1],
+        "未完成": lambda task: not task.done,
+        "已完成": lambda task: task.done,
+    }
+    matched = {task.id for task in manager if tests[kind](task)}
+    if kind == "全部":
+        return ids
+    return matched if ids is None else ids & matched
+
+
+QUERIES = ["", "报告", "review", "REVIEW pr", "re", "牛奶 开会", "不存在的词", "1"]
+KINDS = ["全部", "已过期", "今天", "本周", "未完成", "已完成"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_scan(query):
+    manager = make_manager()
+    index = TaskIndex(manager)
+    assert index.search(query) == brute_search(manager, query)
+
+
+def test_search_before_trigrams_are_built():
+    manager = make_manager()
+    index = TaskIndex(manager)
+    index.index_pending(limit=10)
+    assert index.search("review") == brute_search(manager, "review")
+    while not index.index_pending(limit=10):
+        pass
+    assert index.search("review") == brute_search(manager, "review")
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_filter_matches_scan(kind):
+    manager = make_manager()
+    index = TaskIndex(manager)
+    for query in QUERIES:
+        assert index.filter(query, kind, NOW) == brute_filter(manager, query, kind), query
+
+
+def test_unknown_filter():
+    index = TaskIndex(make_manager(10))
+    with pytest.raises(ValueError):
+        index.filter("", "明年", NOW)
+
+
+@pytest.mark.parametrize("batch", [1, 100])
+def test_incremental_updates(batch):
+    """随机修改后与逐个扫描的结果一致；batch 较大时走批量重排的路径"""
+    rng = random.Random(batch)
+    manager = make_manager()
+    index = TaskIndex(manager)
+    manager.add_listener(index.on_records)
+    index.index_pending(limit=10 ** 6)
+    base = int(NOW.timestamp())
+
+    for step in range(60):
+        tasks = list(manager)
+        op = rng.random()
+        if op < 0.3:
+            changes = [(task.id, {"text": " ".join(rng.sample(WORDS, 2))})
+                       for task in rng.sample(tasks, min(batch, len(tasks)))]
+            manager.update_many(changes)
+        elif op < 0.6:
+            changes = [(task.id, {"remind_at": base + rng.randint(-10, 10) * 43200, "done": rng.random() < 0.5})
+                       for task in rng.sample(tasks, min(batch, len(tasks)))]
+            manager.update_many(changes)
+        elif op < 0.8:
+            rows = rng.sample(range(len(tasks)), min(batch, len(tasks) // 4))
+            manager.remove_rows(rows)
+        else:
+            for _ in range(batch):
+                manager.add(rng.choice(WORDS), base + rng.randint(-10, 10) * 43200)
+
+        query = rng.choice(QUERIES)
+        kind = rng.choice(KINDS)
+        assert index.filter(query, kind, NOW) == brute_filter(manager, query, kind), (step, query, kind)
+
+
+def test_changes_before_first_query_are_ignored_until_built():
+    manager = make_manager(20)
+    index = TaskIndex(manager)
+    manager.add_listener(index.on_records)
+    task = manager.add("新任务 review", int(NOW.timestamp()))
+    assert task.id in index.search("review")
@@ -0,0 +1,111 @@
+import json
+import sqlite3
+
+from conftest import task_dict
+from core.journal import JournalStore
+from core.sqlite_store import SCHEMA_VERSION, SqliteStore, migrate_json_to_sqlite
+
+
+def open_store(db_path, json_path=None):
+    store = SqliteStore(db_path, json_path=json_path)
+    return store, store.load()
+
+
+def rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM tasks ORDER BY position")]
+
+
+def test_migrate_json_with_journal(tmp_path):
+    """迁移读入快照并重放变更日志"""
+    json_path, db_path = str(tmp_path / "tasks.json"), str(tmp_path / "tasks.db")
+    journal = JournalStore(json_path)
+    journal.load()
+    journal.record([{"op": "add", "id": str(i), "task": task_dict(str(i), f"任务 {i}")} for i in range(3)])
+    journal.commit()
+    journal.record([{"op": "del", "id": "1"}, {"op": "set", "id": "2", "field": "text", "value": "改过"}])
+    journal.close()
+
+    assert migrate_json_to_sqlite(json_path, db_path) == 2
+    store, items = open_store(db_path)
+    store.close()
+    assert items == [task_dict("0", "任务 0"), task_dict("2", "改过")]
+
+
+def test_first_open_imports_json_once(tmp_path):
+    json_path, db_path = tmp_path / "tasks.json", tmp_path / "tasks.db"
+    json_path.write_text(json.dumps([task_dict("a"), task_dict("b", done=True)]), encoding="utf-8")
+    store, items = open_store(db_path, json_path)
+    assert items == [task_dict("a"), task_dict("b", done=True)]
+    store.record([{"op": "del", "id": "a"}])
+    store.close()
+
+    # 再次打开不重新导入 tasks.json
+    store, items = open_store(db_path, json_path)
+    store.close()
+    assert items == [task_dict("b", done=True)]
+
+
+def test_upgrade_from_version_1_keeps_data(tmp_path):
+    json_path, db_path = tmp_path / "tasks.json", tmp_path / "tasks.db"
+    store, _ = open_store(db_path)
+    store.record([{"op": "add", "id": "a", "task": task_dict("a")}])
+    store.close()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE INDEX idx_tasks_repeat ON tasks(repeat)")
+        conn.execute("PRAGMA user_version = 1")
+    json_path.write_text(json.dumps([task_dict("stale")]), encoding="utf-8")
+
+    store, items = open_store(db_path, json_path)
+    store.close()
+    assert items == [task_dict("a")]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_tasks_repeat" not in indexes
+
+
+def test_wal_mode(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    store, _ = open_store(db_path)
+    store.record([{"op": "add", "id": "a", "task": task_dict("a")}])
+    assert store.flush()
+    assert (tmp_path / "tasks.db-wal").exists()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_batch_is_written_in_one_transaction(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    store, _ = open_store(db_path)
+    store.record([{"op": "add", "id": str(i), "task": task_dict(str(i))} for i in range(100)])
+    store.record([{"op": "set", "id": "5", "field": "repeat", "value": "每天"},
+                  {"op": "done", "id": "6", "value": True},
+                  {"op": "del", "id": "7"},
+                  {"op": "set", "id": "8", "field": "position", "value": 0}])  # 不是任务字段，忽略
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+    assert store.flush()
+    assert statements.count("BEGIN") == 1 and statements.count("COMMIT") == 1
+
+    store.close()
+    store, items = open_store(db_path)
+    store.close()
+    assert [item["id"] for item in items] == [str(i) for i in range(100) if i != 7]
+    assert items[5]["repeat"] == "每天" and items[6]["done"] is True
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    store, _ = open_store(db_path)
+    store.record([{"op": "add", "id": "a", "task": task_dict("a")}])
+    assert store.flush()
+    errors = []
+    store.on_error = errors.append
+    store.record([{"op": "add", "id": "b", "task": task_dict("b")},
+                  {"op": "add", "id": "c", "task": {"text": "缺少字段"}}])
+    assert not store.flush()
+    assert isinstance(errors[0], KeyError)
+    assert rows(db_path) == ["a"]
+    store.close()
@@ -0,0 +1,73 @@
+import json
+import sys
+import time
+
+import pytest
+
+from core.startup_profile import StartupProfiler
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """临时包 profiled_pkg：导入 outer 时会导入 inner"""
+    root = tmp_path / "profiled_pkg"
+    root.mkdir()
+    (root / "__init__.py").write_text("", encoding="utf-8")
+    (root / "inner.py").write_text("import time\ntime.sleep(0.02)\nVALUE = 1\n", encoding="utf-8")
+    (root / "outer.py").write_text("from profiled_pkg import inner\nVALUE = inner.VALUE + 1\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "profiled_pkg"
+    for name in [name for name in sys.modules if name.split(".")[0] == "profiled_pkg"]:
+        del sys.modules[name]
+
+
+def test_import_hook_times_nested_imports(package):
+    profiler = StartupProfiler()
+    profiler.install_import_hook()
+    try:
+        from profiled_pkg import outer
+    finally:
+        profiler.remove_import_hook()
+    assert not any(finder.__class__.__name__ == "_ImportTimer" for finder in sys.meta_path)
+
+    # 模块内部看到的仍是原加载器
+    assert outer.VALUE == 2
+    assert type(outer.__loader__).__name__ != "_TimedLoader"
+
+    imports = {name: (self_ms, total_ms, depth) for name, self_ms, total_ms, depth in profiler.imports}
+    assert set(imports) >= {"profiled_pkg", "profiled_pkg.inner", "profiled_pkg.outer"}
+    inner, outer_ = imports["profiled_pkg.inner"], imports["profiled_pkg.outer"]
+    assert inner[0] >= 15 and inner[2] == 1 and outer_[2] == 0
+    # outer 的累计耗时包含 inner，自身耗时不含
+    assert outer_[1] >= inner[1] and outer_[0] < inner[0]
+
+
+def test_report_json_and_budget(package, tmp_path, capsys):
+    profiler = StartupProfiler(start_time=time.perf_counter() - 1.0)
+    profiler.install_import_hook()
+    try:
+        import profiled_pkg.outer  # noqa: F401
+    finally:
+        profiler.remove_import_hook()
+    profiler.mark("first_paint")
+    path = tmp_path / "report.json"
+
+    assert profiler.write(path)
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert "budget" not in report
+    assert [item["phase"] for item in report["phases"]] == ["first_paint"]
+    assert report["phases"][0]["ms"] >= 1000
+    assert report["imports"][0]["module"] == "profiled_pkg.inner"
+    assert report["imports_total_ms"] >= report["imports"][0]["self_ms"]
+
+    assert profiler.write(path, budget_ms=60_000, budget_phase="first_paint")
+    assert json.loads(path.read_text(encoding="utf-8"))["budget"]["ok"] is True
+
+    assert not profiler.write(path, budget_ms=500, budget_phase="first_paint")
+    budget = json.loads(path.read_text(encoding="utf-8"))["budget"]
+    assert budget["ok"] is False and budget["measured_ms"] >= 1000
+    assert capsys.readouterr().out.rstrip().endswith("，超出预算")
+
+    # 没有打过点的阶段不算在预算内
+    assert not profiler.write(path, budget_ms=60_000, budget_phase="loaded")
+    assert json.loads(path.read_text(encoding="utf-8"))["budget"]["measured_ms"] is None
@@ -0,0 +1,144 @@
+import datetime
+import json
+
+import numpy as np
+import pytest
+
+from core.history import EventLog, completion_events
+from core.stats import StatsManager, to_days
+from core.tasks import TaskManager
+
+D = datetime.date
+
+
+@pytest.fixture
+def logs(tmp_path):
+    focus, completions = EventLog(tmp_path / "focus.jsonl"), EventLog(tmp_path / "completions.jsonl")
+    return focus, completions, tmp_path / "stats.npz"
+
+
+def session(task, start, seconds, completed=True):
+    return {"task": task, "start": start, "seconds": seconds, "completed": completed}
+
+
+def make_stats(logs):
+    focus, completions, cache = logs
+    return StatsManager(focus.path, completions.path, cache)
+
+
+def test_to_days_skips_invalid_dates():
+    days, valid = to_days(["1970-01-02 09:00:00", "坏的时间", "2024-02-29 23:59:59"])
+    assert list(valid) == [True, False, True]
+    assert days[0] == 1 and days[2] == (D(2024, 2, 29) - D(1970, 1, 1)).days
+
+
+def test_daily_rollups(logs):
+    focus, completions, _ = logs
+    focus.append([session("a", "2024-03-01 09:00:00", 1500),
+                  session("a", "2024-03-01 10:00:00", 600, completed=False),
+                  session("b", "2024-03-03 09:00:00", 1500),
+                  session("", "2024-03-03 09:00:00", 999),        # 无效：没有任务
+                  session("b", "坏的时间", 999)])
+    completions.append([{"task": "a", "time": "2024-03-01 18:00:00"}, {"task": "b", "time": "2024-03-03 08:00:00"},
+                        {"task": "c", "time": "2024-03-03 20:00:00"}])
+    stats = make_stats(logs)
+    assert stats.refresh() == 8
+
+    daily = stats.daily(D(2024, 2, 29), D(2024, 3, 3))
+    assert list(daily["focus_seconds"]) == [0, 2100, 0, 1500]
+    assert list(daily["sessions"]) == [0, 2, 0, 1]
+    assert list(daily["pomodoros"]) == [0, 1, 0, 1]
+    assert list(daily["completed"]) == [0, 1, 0, 2]
+    assert stats.totals() == {"focus_seconds": 3600, "sessions": 3, "pomodoros": 2, "completed": 3}
+    assert stats.ranking() == [("a", 2100), ("b", 1500)]
+
+    summary = stats.summary(today=D(2024, 3, 3), days=3)
+    assert summary["today"] == {"focus_seconds": 1500, "sessions": 1, "pomodoros": 1, "completed": 2}
+    assert [day for day, _ in summary["week"]] == [D(2024, 3, 1), D(2024, 3, 2), D(2024, 3, 3)]
+
+
+def test_incremental_refresh_matches_full_rebuild(logs):
+    focus, completions, cache = logs
+    stats = make_stats(logs)
+    for day in range(1, 6):
+        focus.append([session(f"t{day % 3}", f"2024-03-0{day} 09:00:00", 100 * day)])
+        completions.append([{"task": "x", "time": f"2024-03-0{day} 12:00:00"}])
+        assert stats.refresh() == 2
+    assert stats.refresh() == 0
+
+    cache.unlink()
+    rebuilt = make_stats(logs)
+    rebuilt.refresh()
+    for name in stats.columns:
+        assert np.array_equal(stats.columns[name], rebuilt.columns[name])
+    assert stats.ranking() == rebuilt.ranking()
+
+
+def test_cache_is_reused(logs, monkeypatch):
+    focus, completions, _ = logs
+    focus.append([session("a", "2024-03-01 09:00:00", 1500)])
+    make_stats(logs).refresh()
+
+    # 新实例从缓存恢复汇总，只读缓存之后新增的记录
+    focus.append([session("a", "2024-03-02 09:00:00", 300)])
+    stats = make_stats(logs)
+    offsets = []
+    read_from = EventLog.read_from
+    monkeypatch.setattr(EventLog, "read_from", lambda self, offset: offsets.append(offset) or read_from(self, offset))
+    assert stats.refresh() == 1
+    assert offsets[0] > 0
+    assert stats.totals()["focus_seconds"] == 1800
+
+
+def test_cache_is_rebuilt_when_log_is_replaced(logs):
+    focus, completions, cache = logs
+    focus.append([session("a", "2024-03-01 09:00:00", 1500), session("a", "2024-03-02 09:00:00", 1500)])
+    make_stats(logs).refresh()
+
+    # 记录被替换成更短的内容：缓存的位置失效，从头重建
+    with open(focus.path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(session("b", "2024-03-05 09:00:00", 60)) + "\n")
+    stats = make_stats(logs)
+    stats.refresh()
+    assert stats.totals()["focus_seconds"] == 60
+    assert stats.ranking() == [("b", 60)]
+
+
+def test_cache_with_other_version_is_ignored(logs):
+    focus, completions, cache = logs
+    focus.append([session("a", "2024-03-01 09:00:00", 1500)])
+    make_stats(logs).refresh()
+    with np.load(cache) as data:
+        arrays = dict(data)
+    meta = json.loads(str(arrays["meta"]))
+    meta["version"] = -1
+    meta["offsets"]["focus"] = 10 ** 6
+    arrays["meta"] = np.array(json.dumps(meta))
+    with open(cache, "wb") as f:
+        np.savez(f, **arrays)
+
+    stats = make_stats(logs)
+    stats.refresh()
+    assert stats.totals()["focus_seconds"] == 1500
+
+
+def test_corrupt_cache_is_rebuilt(logs):
+    focus, completions, cache = logs
+    focus.append([session("a", "2024-03-01 09:00:00", 1500)])
+    cache.write_bytes(b"not a zip file")
+    stats = make_stats(logs)
+    stats.refresh()
+    assert stats.totals()["focus_seconds"] == 1500
+
+
+def test_only_local_completions_are_logged():
+    """同步 / 外部修改带来的完成已由完成它的设备记录，本机不再记一次"""
+    manager = TaskManager()
+    a = manager.add("本机", 0)
+    b = manager.add("远端", 0)
+    records = []
+    manager.add_listener(records.extend)
+    manager.update_many([(a.id, {"done": True})])
+    manager.update_many([(b.id, {"done": True})], remote=True)
+    assert [event["task"] for event in completion_events(records, now=0)] == [a.id]
+    assert all(record.get("remote") for record in records if record["id"] == b.id)
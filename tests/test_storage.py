@@ -0,0 +1,91 @@
+import io
+import json
+
+from conftest import task_dict
+from core.journal import JournalStore
+from core.storage import TaskStorage, iter_json_array
+
+
+class FlakyStore(TaskStorage):
+    """前 failures 次写盘失败的内存存储"""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.written = []
+        self.errors = []
+        self.on_error = self.errors.append
+        self._loaded.set()
+
+    def load(self):
+        return []
+
+    def _write(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("磁盘已满")
+        self.written.extend(records)
+
+
+def add(task_id):
+    return {"op": "add", "id": task_id, "task": task_dict(task_id)}
+
+
+def test_failed_batch_is_kept_and_retried_in_order():
+    store = FlakyStore(failures=2)
+    store.record([add("a")])
+    assert not store.flush()
+    assert store.written == []
+    assert isinstance(store.error, OSError)
+
+    # 再次失败：新记录排在失败的记录之后
+    store.record([add("b")])
+    assert not store.flush()
+    # 没有新记录时 commit 也会重试
+    assert store.flush()
+    assert [record["id"] for record in store.written] == ["a", "b"]
+    assert store.error is None
+    assert [type(error) for error in store.errors] == [OSError, OSError, type(None)]
+    store.close()
+
+
+def test_coalesced_edits():
+    store = FlakyStore(failures=0)
+    store.record([add("a"), {"op": "set", "id": "a", "field": "text", "value": "1"}])
+    store.record([{"op": "set", "id": "a", "field": "text", "value": "2"}, {"op": "done", "id": "a", "value": True}])
+    store.record([add("b"), {"op": "set", "id": "b", "field": "text", "value": "x"}, {"op": "del", "id": "b"}])
+    assert store.flush()
+    assert store.written == [add("a"), {"op": "set", "id": "a", "field": "text", "value": "2"},
+                             {"op": "done", "id": "a", "value": True}, add("b"), {"op": "del", "id": "b"}]
+    store.close()
+
+
+def test_journal_retry_after_failed_append(tmp_path, monkeypatch):
+    snapshot = str(tmp_path / "tasks.json")
+    store = JournalStore(snapshot)
+    store.load()
+    calls = []
+
+    def failing_fsync(fd):
+        calls.append(fd)
+        if len(calls) == 1:
+            raise OSError("写入失败")
+
+    monkeypatch.setattr("core.journal.os.fsync", failing_fsync)
+    store.record([add("a"), {"op": "set", "id": "a", "field": "text", "value": "改过"}])
+    assert not store.flush()
+    assert store.flush()
+    store.close()
+
+    store = JournalStore(snapshot)
+    items = store.load()
+    store.close()
+    assert items == [task_dict("a", "改过")]
+
+
+def test_iter_json_array_across_read_boundaries():
+    items = [task_dict(str(i), "文字" * i) for i in range(50)]
+    data = json.dumps(items, ensure_ascii=False, indent=2)
+    for read_size in (1, 7, 64, 1 << 20):
+        assert list(iter_json_array(io.StringIO(data), read_size)) == items
+    assert list(iter_json_array(io.StringIO("[]"))) == []
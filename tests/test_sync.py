@@ -0,0 +1,203 @@
+import random
+
+import pytest
+
+from core.sync import SyncEngine, newer, resolve
+from core.tasks import Task, TaskManager
+
+
+class Device:
+    """一台设备：TaskManager + SyncEngine，同步结果按 MainWindow._apply_sync 的方式应用"""
+
+    def __init__(self, sync_dir, state_dir, checkpoint_rounds=20):
+        self.state_path = state_dir / "sync_state.json"
+        self.manager = TaskManager()
+        self.engine = SyncEngine(sync_dir, self.state_path, checkpoint_rounds)
+        self.manager.add_listener(self.engine.on_records)
+
+    def sync(self):
+        winners = self.engine.sync_round()
+        added, changes, removed = resolve(self.manager, winners, self.engine.pending_fields())
+        with self.engine.applying():
+            self.manager.update_many(changes)
+            self.manager.remove_rows(self.manager.row_of(task_id) for task_id in removed)
+            self.manager.add_tasks([Task.from_dict(item) for item in added])
+        self.engine.applied()
+        if self.engine.is_new():
+            self.engine.publish(self.manager)
+
+    def state(self):
+        return {task.id: (task.text, task.remind_at, task.repeat, task.done) for task in self.manager}
+
+
+@pytest.fixture
+def devices(tmp_path):
+    sync_dir = tmp_path / "shared"
+    sync_dir.mkdir()
+
+    def make(name, **kwargs):
+        state_dir = tmp_path / name
+        state_dir.mkdir(exist_ok=True)
+        return Device(sync_dir, state_dir, **kwargs)
+
+    return make
+
+
+def line_count(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def settle(*devices):
+    for _ in range(3):
+        for device in devices:
+            device.sync()
+
+
+def test_newer_breaks_ties_by_device():
+    assert newer([1, "a"], None)
+    assert newer([2, "a"], [1, "b"])
+    assert newer([1, "b"], [1, "a"])
+    assert not newer([1, "a"], [1, "a"])
+
+
+def test_tasks_and_edits_propagate(devices):
+    a, b = devices("a"), devices("b")
+    task = a.manager.add("买牛奶", 1700000000)
+    settle(a, b)
+    assert b.state() == a.state()
+
+    b.manager.update(task.id, text="买豆浆", done=True)
+    settle(a, b)
+    assert a.manager.get(task.id).text == "买豆浆"
+    assert a.manager.get(task.id).done
+
+    a.manager.remove_rows([a.manager.row_of(task.id)])
+    settle(a, b)
+    assert a.state() == b.state() == {}
+
+
+def test_existing_tasks_are_published_on_first_sync(devices):
+    a = devices("a")
+    a.manager.load([{"id": "old", "text": "旧任务", "remind_time": "2024-01-01 09:00:00"}])
+    b = devices("b")
+    settle(a, b)
+    assert set(b.state()) == {"old"}
+
+
+def test_concurrent_edits_converge(devices):
+    a, b = devices("a"), devices("b")
+    task = a.manager.add("任务", 1700000000)
+    settle(a, b)
+
+    # 两边同时修改同一字段和不同字段
+    a.manager.update(task.id, text="A 的文字", repeat="每天")
+    b.manager.update(task.id, text="B 的文字", done=True)
+    settle(a, b)
+    assert a.state() == b.state()
+    merged = a.manager.get(task.id)
+    assert merged.repeat == "每天" and merged.done
+    assert merged.text in ("A 的文字", "B 的文字")
+
+
+def test_random_operations_converge(devices):
+    rng = random.Random(7)
+    group = [devices(name) for name in "abc"]
+    for step in range(40):
+        for device in group:
+            tasks = list(device.manager)
+            op = rng.random()
+            if op < 0.4 or not tasks:
+                device.manager.add(f"任务 {step}", 1700000000 + rng.randint(0, 10 ** 6))
+            elif op < 0.8:
+                device.manager.update(rng.choice(tasks).id, text=f"改 {step}", done=rng.random() < 0.5)
+            else:
+                device.manager.remove_rows([rng.randrange(len(tasks))])
+        rng.choice(group).sync()
+    settle(*group)
+    assert group[0].state() == group[1].state() == group[2].state()
+
+
+def test_restart_resumes_from_checkpoint(devices, tmp_path):
+    a, b = devices("a"), devices("b", checkpoint_rounds=1)
+    first = a.manager.add("第一条", 1700000000)
+    settle(a, b)
+    b.engine.flush()
+    device = b.engine.device
+
+    # 重启：从检查点恢复设备 id 与读取位置，只读入之后的增量
+    restarted = devices("b")
+    restarted.manager.load([{"id": first.id, **first.to_dict()}])
+    second = a.manager.add("第二条", 1700000100)
+    a.sync()
+    restarted.sync()
+    assert restarted.engine.device == device
+    assert not restarted.engine.is_new()
+    assert restarted.state() == a.state()
+    assert second.id in restarted.state()
+
+
+def test_resolve_keeps_pending_local_fields():
+    manager = TaskManager()
+    task = manager.add("本地", 1700000000)
+    winners = {
+        task.id: {"text": "远端", "done": True},
+        "partial": {"text": "缺少其他字段"},
+        "new": {"text": "新任务", "remind_time": "2024-01-01 09:00:00", "repeat": "每天", "done": False},
+    }
+    added, changes, removed = resolve(manager, winners, {task.id: {"text"}})
+    assert changes == [(task.id, {"done": True})]
+    assert added == [{"id": "new", "text": "新任务", "remind_time": "2024-01-01 09:00:00",
+                      "repeat": "每天", "done": False}]
+    assert removed == []
+
+    added, changes, removed = resolve(manager, {task.id: {"deleted": True}}, {})
+    assert removed == [task.id]
+
+
+def test_archiving_is_not_a_delete(devices):
+    a, b = devices("a"), devices("b")
+    task = a.manager.add("做完的事", 1700000000, done=True)
+    settle(a, b)
+    a.manager.remove_rows([a.manager.row_of(task.id)], archived=True)
+    settle(a, b)
+    assert task.id not in a.state()
+    assert task.id in b.state()
+
+
+def test_checkpoint_writes_only_changed_versions(devices):
+    a = devices("a", checkpoint_rounds=1)
+    tasks = [a.manager.add(f"任务 {i}", 1700000000 + i) for i in range(200)]
+    a.sync()
+    a.sync()
+    versions_path = a.engine.versions_log.path
+    lines = line_count(versions_path)
+    assert lines == 200 * 5
+    state_size = a.state_path.stat().st_size
+
+    a.manager.update(tasks[0].id, text="改过")
+    a.sync()
+    a.sync()
+    assert line_count(versions_path) == lines + 1
+    assert a.state_path.stat().st_size < state_size + 16
+    assert "versions" not in a.state_path.read_text(encoding="utf-8")
+
+    # 重启后从版本日志恢复全部版本
+    restarted = SyncEngine(a.engine.sync_dir, a.state_path)
+    restarted.flush()
+    assert restarted.versions == a.engine.versions
+    assert restarted.clock == a.engine.clock
+
+
+def test_versions_log_is_rewritten_when_mostly_stale(devices, monkeypatch):
+    monkeypatch.setattr("core.sync._VERSIONS_SLACK", 0)
+    a = devices("a", checkpoint_rounds=1)
+    task = a.manager.add("任务", 1700000000)
+    for i in range(20):
+        a.manager.update(task.id, text=f"第 {i} 次")
+        a.sync()
+    lines = line_count(a.engine.versions_log.path)
+    assert lines <= 2 * 5 + 1
+    restarted = SyncEngine(a.engine.sync_dir, a.state_path)
+    restarted.flush()
+    assert restarted.versions == a.engine.versions
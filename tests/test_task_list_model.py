@@ -0,0 +1,120 @@
+import random
+import time
+
+from PyQt6.QtCore import QDateTime, QPersistentModelIndex, qInstallMessageHandler
+from PyQt6.QtTest import QAbstractItemModelTester
+from PyQt6.QtWidgets import QListView
+
+from core.tasks import Task, TaskManager
+from views.TaskItemDelegate import TaskItemDelegate
+from views.TaskListModel import TaskListModel
+from views.TodoItemWidget import TodoItemWidget
+
+DAY = 86400
+
+
+def test_editor_commit_moves_row_once(qapp):
+    """编辑器一次提交全部字段：时间改动让行移走后，其余字段不能写到换到原位置的任务上"""
+    manager = TaskManager()
+    model = TaskListModel(manager)
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    now = int(time.time())
+    a = model.add_task("A", now + 3 * DAY, "不重复")
+    b = model.add_task("B", now + 4 * DAY, "每天")
+    c = model.add_task("C", now + 5 * DAY, "不重复")
+
+    view = QListView()
+    view.setModel(model)
+    delegate = TaskItemDelegate(view)
+    # 只把 A 的时间改到 C 之后，B 换到 A 原来的行
+    editor = TodoItemWidget("A", QDateTime.fromSecsSinceEpoch(now + 6 * DAY), "不重复", False)
+    delegate.setModelData(editor, model, model.index_of(a.id))
+
+    assert a.remind_at == editor.remind_time().toSecsSinceEpoch()
+    assert (b.text, b.repeat, b.done) == ("B", "每天", False)
+    assert (c.text, c.repeat, c.done) == ("C", "不重复", False)
+    assert [model.task_at(row) for row in range(model.rowCount())
+            if model.task_at(row) is not None] == [b, c, a]
+    del tester
+
+
+def test_loaded_chunks_keep_selection(qapp):
+    """分块加载不重置模型：选中的任务和持久索引跟随任务移动"""
+    warnings = []
+    qInstallMessageHandler(lambda mode, context, message: warnings.append(message))
+    try:
+        manager = TaskManager()
+        model = TaskListModel(manager)
+        tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+        view = QListView()
+        view.setModel(model)
+        resets = []
+        model.modelReset.connect(lambda: resets.append(True))
+
+        rng = random.Random(3)
+        now = int(time.time())
+        chunks = [[Task(f"任务 {i}", now + rng.randint(-3 * DAY, 3 * DAY), done=rng.random() < 0.2)
+                   for i in range(start, start + size)] for start, size in ((0, 50), (50, 2000), (2050, 4000))]
+        model.append_tasks(chunks[0])
+        chosen = chunks[0][rng.randrange(50)]
+        view.setCurrentIndex(model.index_of(chosen.id))
+        persistent = QPersistentModelIndex(model.index_of(chosen.id))
+
+        for chunk in chunks[1:]:
+            model.append_tasks(chunk)
+            assert model.task_at(view.currentIndex().row()) is chosen
+            assert model.task_at(persistent.row()) is chosen
+            assert [model.task_at(index.row()) for index in view.selectionModel().selectedIndexes()] == [chosen]
+
+        tasks = [task for chunk in chunks for task in chunk]
+        shown = [model.task_at(row) for row in range(model.rowCount()) if model.task_at(row) is not None]
+        assert shown == sorted(tasks, key=lambda task: (model.groups.group_of(task), task.remind_at, task.id))
+        assert resets == []
+        del tester
+    finally:
+        qInstallMessageHandler(None)
+    assert warnings == []
+
+
+def count_updates(model):
+    """模型发出的更新通知（行级的 begin/end 成对通知只计一次）"""
+    updates = []
+    for signal in (model.dataChanged, model.layoutChanged, model.modelReset,
+                   model.rowsMoved, model.rowsRemoved, model.rowsInserted):
+        signal.connect(lambda *args, name=signal: updates.append(name))
+    return updates
+
+
+def test_bulk_operations_notify_once(qapp):
+    """批量修改 / 删除：监听者只收到一批记录，模型只发出一次更新"""
+    manager = TaskManager()
+    model = TaskListModel(manager)
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    now = int(time.time())
+    model.add_tasks([Task(f"任务 {i}", now + DAY + i * 60) for i in range(200)])
+    ids = [task.id for task in manager]
+    batches = []
+    manager.add_listener(batches.append)
+
+    # 位置不变：一次 dataChanged
+    updates = count_updates(model)
+    model.update_tasks((task_id, {"repeat": "每天"}) for task_id in ids[:10])
+    assert len(batches) == 1 and len(batches[0]) == 10
+    assert len(updates) == 1
+
+    # 大量任务换组：整体重新布局一次
+    batches.clear()
+    updates = count_updates(model)
+    model.update_tasks((task_id, {"done": True}) for task_id in ids)
+    assert len(batches) == 1 and len(batches[0]) == 200
+    assert len(updates) == 1
+    assert all(task.done for task in manager)
+
+    # 删除：一批 del 记录，一次模型更新
+    batches.clear()
+    updates = count_updates(model)
+    model.remove_tasks(ids[:150])
+    assert len(batches) == 1 and [record["op"] for record in batches[0]] == ["del"] * 150
+    assert len(updates) == 1
+    assert len(manager) == 50
+    del tester
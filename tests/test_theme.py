@@ -0,0 +1,51 @@
+import pytest
+from PyQt6.QtCore import QDateTime
+from PyQt6.QtGui import QPalette
+from PyQt6.QtWidgets import QApplication
+from qfluentwidgets import Theme, qconfig
+
+from qss.theme import PALETTES, theme_engine
+from views.TodoItemWidget import TodoItemWidget
+
+
+def text_color(widget):
+    return widget.palette().color(QPalette.ColorRole.Text).getRgb()
+
+
+@pytest.fixture
+def engine(qapp):
+    engine = theme_engine()
+    yield engine
+    engine.set_theme(Theme.LIGHT)
+
+
+@pytest.mark.parametrize("theme", [Theme.LIGHT, Theme.DARK])
+def test_style_sheet_and_state_properties_per_theme(engine, theme):
+    changes = []
+    engine.changed.connect(lambda: changes.append(qconfig.theme))
+    engine.set_theme(theme.value.lower())
+    assert qconfig.theme == theme
+    palette = PALETTES[theme]
+
+    # 应用级样式表使用当前主题的颜色，共享的颜色对象原地更新
+    sheet = QApplication.instance().styleSheet()
+    assert "TodoItemWidget" in sheet and "rgba({}, {}, {}, {})".format(*palette["editor_background"]) in sheet
+    assert engine.text_color.getRgb() == palette["text"]
+    assert engine.overdue_color.getRgb() == palette["overdue"]
+
+    # 状态属性决定编辑器文字颜色
+    now = QDateTime.currentDateTime()
+    editor = TodoItemWidget("任务", now.addDays(1), "不重复", done=True)
+    line_edit = editor.text_edit
+    assert line_edit.property("done") is True and line_edit.property("overdue") is False
+    assert text_color(line_edit) == palette["muted"]
+
+    editor.set_data("任务", now.addDays(-1), "不重复", False)
+    assert line_edit.property("done") is False and line_edit.property("overdue") is True
+    assert text_color(line_edit) == palette["overdue"]
+
+    # 再次设置同一主题不会重复刷新
+    count = len(changes)
+    engine.set_theme(theme)
+    assert len(changes) == count
+    editor.deleteLater()
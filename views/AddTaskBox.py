@@ -2,6 +2,8 @@ from PyQt6.QtCore import QTime, QDate, QDateTime
 from PyQt6.QtWidgets import QHBoxLayout
 from qfluentwidgets import MessageBoxBase, SubtitleLabel, LineEdit, TimePicker, CalendarPicker, ComboBox, BodyLabel
 
+from core.recurrence import REPEAT_OPTIONS
+
 
 class AddTaskBox(MessageBoxBase):
 
@@ -24,7 +26,7 @@ class AddTaskBox(MessageBoxBase):
 
         self.repeat_layout = QHBoxLayout()
         self.repeat_combo = ComboBox()
-        self.repeat_combo.addItems(["不重复", "每天", "每周"])
+        self.repeat_combo.addItems(REPEAT_OPTIONS)
         self.repeat_layout.addWidget(BodyLabel("重复周期:"))
         self.repeat_layout.addWidget(self.repeat_combo)
 
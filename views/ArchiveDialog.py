@@ -0,0 +1,86 @@
+import threading
+
+from PyQt6.QtCore import QTimer, pyqtSignal
+from PyQt6.QtWidgets import QAbstractItemView, QListWidgetItem
+from qfluentwidgets import MessageBoxBase, SubtitleLabel, SearchLineEdit, ListWidget, BodyLabel
+
+# 搜索结果最多显示的条数
+RESULT_LIMIT = 500
+
+
+class ArchiveDialog(MessageBoxBase):
+    """归档浏览：搜索已归档的任务，选中后恢复到任务列表
+
+    归档需要解压全部分段，搜索在后台线程中进行，只显示最后一次输入的结果。
+    """
+
+    _resultsReady = pyqtSignal(int, list)   # (查询序号, 任务字典列表)
+
+    def __init__(self, archive, parent=None):
+        super().__init__(parent)
+        self.archive = archive
+        self._generation = 0
+        self._results = []
+
+        self.titleLabel = SubtitleLabel('已归档的任务')
+
+        self.search_edit = SearchLineEdit()
+        self.search_edit.setPlaceholderText('搜索归档')
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start())
+
+        self.result_list = ListWidget()
+        self.result_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.result_list.setMinimumHeight(320)
+
+        self.status_label = BodyLabel('正在读取归档...')
+
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(self.search_edit)
+        self.viewLayout.addWidget(self.result_list)
+        self.viewLayout.addWidget(self.status_label)
+
+        self.widget.setMinimumWidth(480)
+
+        self.yesButton.setText('恢复所选')
+        self.cancelButton.setText('关闭')
+
+        # 输入防抖
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.search)
+
+        self._resultsReady.connect(self._show_results)
+        self.search()
+
+    def search(self):
+        self._generation += 1
+        generation, query = self._generation, self.search_edit.text()
+
+        def run():
+            try:
+                results = self.archive.search(query, RESULT_LIMIT)
+            except Exception as e:
+                print("搜索归档失败:", e)
+                results = []
+            try:
+                self._resultsReady.emit(generation, results)
+            except RuntimeError:    # 对话框已关闭
+                pass
+
+        threading.Thread(target=run, name="archive-search", daemon=True).start()
+
+    def _show_results(self, generation, results):
+        if generation != self._generation:
+            return
+        self.result_list.clear()
+        for entry in results:
+            item = QListWidgetItem(f"{entry['text']}    {entry['remind_time']}    （归档于 {entry['archived_at']}）")
+            self.result_list.addItem(item)
+        self._results = results
+        more = f"（仅显示前 {RESULT_LIMIT} 条）" if len(results) >= RESULT_LIMIT else ""
+        self.status_label.setText(f"找到 {len(results)} 个任务{more}")
+
+    def selected_entries(self):
+        """选中的归档任务字典"""
+        return [self._results[index.row()] for index in self.result_list.selectedIndexes()]
@@ -0,0 +1,51 @@
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import QLabel
+
+from core.metrics import metrics
+
+
+class DebugOverlay(QLabel):
+    """调试浮层：半透明显示在父窗口右下角，每 500 ms 刷新一次统计；隐藏时不刷新
+
+    外观由应用级样式表设置（qss/theme.py）。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setFont(QFont("Consolas", 9))
+        self.setTextFormat(Qt.TextFormat.PlainText)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.refresh_timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.refresh_timer.start()
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        lines = [f"{'计时':<20}{'次数':>6}{'平均ms':>9}{'最大ms':>9}{'最近ms':>9}"]
+        for name, stat in sorted(snapshot["timers"].items()):
+            lines.append(f"{name:<20}{stat['count']:>6}{stat['avg_ms']:>9.1f}"
+                         f"{stat['max_ms']:>9.1f}{stat['last_ms']:>9.1f}")
+        for name, value in sorted({**snapshot["counters"], **snapshot["gauges"]}.items()):
+            lines.append(f"{name:<20}{value:>6}")
+        if snapshot["stalls"]:
+            stall = snapshot["stalls"][-1]
+            lines.append(f"最近卡顿: {stall['time']}  {stall['ms']} ms")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(parent.width() - self.width() - 12, parent.height() - self.height() - 12)
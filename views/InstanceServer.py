@@ -0,0 +1,93 @@
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+from core import ipc
+
+
+class InstanceServer(QObject):
+    """单实例服务端：在 QLocalServer 上接收命令行客户端和后来启动的 main.py 的请求
+
+    每个连接读一行 JSON 请求，交给 handler(request) -> 响应字典，写回一行后断开。
+    set_ready 之前（任务尚未加载完）收到的请求先排队，并立即回复一行 {"pending": true}，
+    客户端据此改用更长的等待时间。
+    """
+
+    def __init__(self, name, handler, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.handler = handler
+        self._ready = False
+        self._queued = []      # [(socket, request)]
+        self._buffers = {}     # socket -> 已收到的字节
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+
+    def listen(self):
+        """开始监听；地址被占用但没有实例应答时（上次异常退出残留），清理后重试"""
+        if self.server.listen(ipc.server_address(self.name)):
+            return True
+        if ipc.request(self.name, {"cmd": "ping"}, timeout=1.0) is not None:
+            return False
+        QLocalServer.removeServer(ipc.server_address(self.name))
+        return self.server.listen(ipc.server_address(self.name))
+
+    def close(self):
+        self.server.close()
+
+    def set_ready(self):
+        self._ready = True
+        queued, self._queued = self._queued, []
+        for socket, request in queued:
+            self._respond(socket, request)
+
+    def _accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._read(s))
+            socket.disconnected.connect(lambda s=socket: self._drop(s))
+
+    def _drop(self, socket):
+        self._buffers.pop(socket, None)
+        self._queued = [(s, request) for s, request in self._queued if s is not socket]
+        socket.deleteLater()
+
+    def _read(self, socket):
+        if socket not in self._buffers:    # 已经收到完整请求
+            return
+        data = self._buffers[socket] + bytes(socket.readAll())
+        if b"\n" not in data:
+            self._buffers[socket] = data
+            return
+        del self._buffers[socket]
+        try:
+            request = ipc.decode(data.split(b"\n", 1)[0])
+        except ValueError as e:
+            self._send(socket, {"ok": False, "error": f"无法解析的请求: {e}"})
+            return
+
+        if request.get("cmd") == "ping" or self._ready:
+            self._respond(socket, request)
+        else:
+            self._queued.append((socket, request))
+            socket.write(ipc.encode({"pending": True}))
+            socket.flush()
+
+    def _respond(self, socket, request):
+        if request.get("cmd") == "ping":
+            response = {"ok": True}
+        else:
+            try:
+                response = self.handler(request)
+            except Exception as e:
+                print("处理请求失败:", e)
+                response = {"ok": False, "error": str(e)}
+        self._send(socket, response)
+
+    def _send(self, socket, response):
+        if socket.state() != QLocalSocket.LocalSocketState.ConnectedState:
+            return
+        socket.write(ipc.encode(response))
+        socket.flush()
+        socket.disconnectFromServer()
@@ -1,38 +1,106 @@
 import datetime
-import json
+import math
 import os
 import sys
+import threading
+import time
 
-from PyQt6.QtCore import Qt, QTimer, QPoint, QDateTime
-from PyQt6.QtGui import QColor, QIcon
+from PyQt6.QtCore import Qt, QTimer, QPoint, QEvent, QFileSystemWatcher, QPersistentModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor, QIcon, QKeySequence, QPainter, QShortcut
 from PyQt6.QtWidgets import (
-    QVBoxLayout, QHBoxLayout, QListWidget, QSystemTrayIcon,
-    QListWidgetItem, QApplication
+    QVBoxLayout, QHBoxLayout, QAbstractItemView, QListView, QSystemTrayIcon, QApplication
 )
 from qfluentwidgets import (
-    ListWidget, RoundMenu, FluentIcon, Action, isDarkTheme, ToolButton, MessageBox, SubtitleLabel
+    ListView, RoundMenu, FluentIcon, Action, isDarkTheme, ToolButton, MessageBox, SubtitleLabel,
+    SearchLineEdit, ComboBox, InfoBar
 )
 from qfluentwidgets.common.animation import BackgroundAnimationWidget
 from qfluentwidgets.components.widgets.frameless_window import FramelessWindow
 from qfluentwidgets.window.fluent_window import FluentTitleBar
 
-from config import IMG_PATH, DATA_FILE
-from views.AddTaskBox import AddTaskBox
-from views.TodoItemWidget import TodoItemWidget
+from config import (
+    IMG_PATH, DATA_FILE, DB_FILE, STORAGE_BACKEND, SAVE_DEBOUNCE_MS, SAVE_RETRY_MS, JOURNAL_COMPACT_BYTES,
+    LOAD_FIRST_CHUNK, LOAD_CHUNK_SIZE, ARCHIVE_AFTER_DAYS, ARCHIVE_SEGMENT_BYTES,
+    NOTIFY_WINDOW_MS, NOTIFY_INTERVAL_S, NOTIFY_BURST, FOCUS_MINUTES, THEME, SYNC_DIR, SYNC_INTERVAL_S,
+    SYNC_DEBOUNCE_MS, SYNC_CHECKPOINT_ROUNDS, METRICS_ENABLED, METRICS_FILE, METRICS_DUMP_INTERVAL_S, STALL_THRESHOLD_MS
+)
+from core.archive import TaskArchive
+from core.commands import execute
+from core.focus_timer import FocusLog, FocusTimer
+from core.history import CompletionTimes, EventLog, completion_events
+from core.journal import file_signature, read_snapshot
+from core.merge import merge_external
+from core.metrics import metrics, MetricsExporter, StallWatchdog
+from core.notifications import NotificationDispatcher
+from core.recurrence import REPEAT_OPTIONS, next_occurrence
+from core.scheduler import ReminderScheduler
+from core.search import FILTER_OPTIONS, TaskIndex
+from core.storage import create_storage
+from core.sync import SyncEngine, resolve
+from core.tasks import Task, TaskManager
+from qss.theme import theme_engine
+from views.TaskItemDelegate import TaskItemDelegate
+from views.TaskListModel import TaskListModel
+from views.TaskLoader import TaskLoader
+from views.TimerWidget import TimerWidget
+
+DATE_FORMAT = "%Y年%m月%d日"
+
+# 右键菜单“推迟”选项
+RESCHEDULE_OPTIONS = [
+    ("1 小时", datetime.timedelta(hours=1)),
+    ("1 天", datetime.timedelta(days=1)),
+    ("1 周", datetime.timedelta(weeks=1)),
+]
+
+
+class TrayNotificationBackend:
+    """通知后端：托盘气泡"""
+
+    def __init__(self, tray_icon, duration_ms=5000):
+        self.tray_icon = tray_icon
+        self.duration_ms = duration_ms
+
+    def show(self, title, message):
+        self.tray_icon.showMessage(title, message, QSystemTrayIcon.MessageIcon.Information, self.duration_ms)
 
 
 class MainWindow(BackgroundAnimationWidget, FramelessWindow):
     """ Fluent window with ToDo list """
 
-    def __init__(self, parent=None):
+    loadingFinished = pyqtSignal()
+    firstPainted = pyqtSignal(float)  # 从启动到首屏任务绘制的耗时（毫秒）
+    firstFrame = pyqtSignal(float)    # 从启动到窗口首帧的耗时（毫秒），不论是否有任务
+    startupFinished = pyqtSignal()    # 首帧之后的延后初始化（托盘、提醒定时器）完成
+    archiveFinished = pyqtSignal(int)  # 一轮自动归档完成，参数为移出任务列表的数量
+
+    externalMerged = pyqtSignal(int, int, int)   # 合并了一次外部修改：(新增, 修改, 删除) 的任务数
+
+    _archiveWritten = pyqtSignal(list)   # 后台线程写完归档的任务 id
+    _saveError = pyqtSignal(object)      # 后台写盘失败的错误信息，恢复后为 None
+    _externalRead = pyqtSignal(object, object)   # 后台线程读到的外部快照：(签名, 任务字典列表)
+    _focusLoaded = pyqtSignal(dict)      # 后台线程读到 / 写入后的专注累计：{task_id: 秒数}
+    syncMerged = pyqtSignal(int, int, int)   # 应用了一轮同步：(新增, 修改, 删除) 的任务数
+    _syncRound = pyqtSignal(object)      # 后台线程完成一轮同步：胜出的远端字段，失败时为 None
+
+    def __init__(self, parent=None, start_time=None, data_file=None, db_file=None, backend=None,
+                 archive_after_days=None, sync_dir=None):
+        self._start_time = time.perf_counter() if start_time is None else start_time
+        self.first_paint_ms = None
+        self.first_frame_ms = None
         self._isMicaEnabled = False
         self._lightBackgroundColor = QColor(240, 244, 249)
         self._darkBackgroundColor = QColor(32, 32, 32)
         self._isMaximizedFake = False
         self._normalGeometry = None
+        self.focus_widget = None
 
         super().__init__(parent=parent)
 
+        # 主题：共享的样式表、字体和颜色，切换时整体刷新一次
+        self.theme = theme_engine()
+        self.theme.set_theme(THEME)
+
         self.resize(800, 600)
 
         # 顶层布局
@@ -65,28 +133,193 @@ class MainWindow(BackgroundAnimationWidget, FramelessWindow):
         # 顶部按钮布局
         button_layout = QHBoxLayout()
 
-        date_str = datetime.datetime.now().strftime("%Y年%m月%d日")
-        time_label = SubtitleLabel()
-        time_label.setText(date_str)
+        # 日期：零点时与任务分组一起刷新（check_day）
+        self.date_label = SubtitleLabel()
+        self.date_label.setText(datetime.datetime.now().strftime(DATE_FORMAT))
+
+        # 搜索与筛选
+        self.search_edit = SearchLineEdit()
+        self.search_edit.setPlaceholderText("搜索任务")
+        self.search_edit.setFixedWidth(240)
+        self.search_edit.textChanged.connect(self.apply_filter)
+
+        self.filter_combo = ComboBox()
+        self.filter_combo.addItems(FILTER_OPTIONS)
+        self.filter_combo.currentTextChanged.connect(self.apply_filter)
 
         add_button = ToolButton(FluentIcon.ADD)
         add_button.clicked.connect(self.add_task_dialog)
 
-        button_layout.addWidget(time_label)
+        archive_button = ToolButton(FluentIcon.LIBRARY)
+        archive_button.setToolTip("已归档的任务")
+        archive_button.clicked.connect(self.archive_dialog)
+
+        theme_button = ToolButton(FluentIcon.CONSTRACT)
+        theme_button.setToolTip("切换深色 / 浅色")
+        theme_button.clicked.connect(self.theme.toggle)
+
+        stats_button = ToolButton(FluentIcon.PIE_SINGLE)
+        stats_button.setToolTip("专注统计")
+        stats_button.clicked.connect(self.stats_dialog)
+
+        button_layout.addWidget(self.date_label)
         button_layout.addStretch(1)
+        button_layout.addWidget(self.search_edit)
+        button_layout.addWidget(self.filter_combo)
+        button_layout.addWidget(theme_button)
+        button_layout.addWidget(stats_button)
+        button_layout.addWidget(archive_button)
         button_layout.addWidget(add_button)
         button_layout.setContentsMargins(10, 10, 0, 0)
 
-        # 任务列表
-        self.task_list = ListWidget()
-        self.task_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        # 任务数据：TaskManager 为唯一数据来源，存储与提醒调度都监听它的变更记录
+        self.tasks = TaskManager()
+        self.tasks.add_listener(self.mark_dirty)
+        self.tasks.add_listener(self.update_reminders)
+
+        # 搜索索引：首次搜索时建立，之后随变更记录增量更新
+        self.task_index = TaskIndex(self.tasks)
+        self.tasks.add_listener(self.task_index.on_records)
+        self.index_timer = QTimer(self)
+        self.index_timer.setInterval(0)
+        self.index_timer.timeout.connect(self._index_step)
+
+        # 任务列表（模型/视图，只绘制可见行），按已过期 / 今天 / 以后 / 已完成分组
+        self.task_model = TaskListModel(self.tasks, self)
+        self.day_timer = QTimer(self)
+        self.day_timer.setSingleShot(True)
+        self.day_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.day_timer.timeout.connect(self.check_day)
+        self.arm_day_timer()
+
+        # 保存：变更记录先登记，防抖后交给后台线程写入存储后端
+        self.store = create_storage(backend or STORAGE_BACKEND, data_file or DATA_FILE, db_file or DB_FILE,
+                                    compact_threshold=JOURNAL_COMPACT_BYTES)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DEBOUNCE_MS)
+        self.save_timer.timeout.connect(self.submit_save)
+        self._save_error_bar = None
+        self._saveError.connect(self._on_save_error)
+        self.store.on_error = lambda e: self._saveError.emit(None if e is None else str(e))
+
+        # 外部修改：监视数据文件，读入后逐任务合并（本地未压缩进快照的修改优先）
+        self._tasks_loaded = False
+        self._merging = False
+        self._rejected_signature = None    # 内容无效、不再重试的外部文件签名
+        self.file_watcher = None
+        self._externalRead.connect(self._merge_external)
+        self.external_timer = QTimer(self)
+        self.external_timer.setSingleShot(True)
+        self.external_timer.setInterval(300)
+        self.external_timer.timeout.connect(self.check_external_change)
+        self.setup_file_watcher()
+
+        # 归档：已完成的旧任务移出任务列表，加载完成后及之后每小时检查一次
+        self.archive = TaskArchive(os.path.join(os.path.dirname(os.fspath(data_file or DATA_FILE)), "archive"),
+                                   ARCHIVE_SEGMENT_BYTES)
+        self.archive_after_days = ARCHIVE_AFTER_DAYS if archive_after_days is None else archive_after_days
+        self._archiving = False
+        self._restored_ids = set()   # 本次运行中从归档恢复的任务，不再自动归档
+        self._archiveWritten.connect(self._on_archive_written)
+        self.archive_timer = QTimer(self)
+        self.archive_timer.setInterval(3600 * 1000)
+        self.archive_timer.timeout.connect(self.archive_done_tasks)
+
+        self.task_list = ListView()
+        self.task_list.setModel(self.task_model)
+        self.task_list.setItemDelegate(TaskItemDelegate(self.task_list))
+        self.task_list.setUniformItemSizes(True)
+        # 分批布局：筛选结果变化时先布局首批行，其余在之后的事件循环中完成，输入不卡顿
+        self.task_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.task_list.setBatchSize(2000)
+        self.task_list.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked |
+                                       QAbstractItemView.EditTrigger.EditKeyPressed)
+        self.task_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.task_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.task_list.customContextMenuRequested.connect(self.show_context_menu)
+        self.theme.changed.connect(self._on_theme_changed)
+
+        # 专注计时器：专注记录单独追加到数据文件旁的 focus.jsonl，不重写任务数据
+        data_dir = os.path.dirname(os.fspath(data_file or DATA_FILE))
+        self.focus_log = FocusLog(os.path.join(data_dir, "focus.jsonl"))
+        self.focus_widget = TimerWidget(FocusTimer(FOCUS_MINUTES * 60), self)
+        self.focus_widget.sessionEnded.connect(self._on_focus_ended)
+        self._focusLoaded.connect(self._apply_focus_time)
+
+        # 统计：完成任务的事件随保存追加到 completions.jsonl；汇总在第一次打开统计时创建（按需导入 NumPy）
+        self.completion_log = EventLog(os.path.join(data_dir, "completions.jsonl"))
+        self._completions = []
+        self._completions_lock = threading.Lock()   # 后台写入失败时会放回记录
+        self.completion_times = CompletionTimes(self.completion_log)   # 归档按完成时间计算任务年龄
+        self.tasks.add_listener(self.record_completions)
+        self.stats = None
+        self.stats_cache = os.path.join(data_dir, "stats.npz")
+
+        # 多设备同步：配置了共享目录时，经由它交换逐字段的增量（加载完成后开始）
+        sync_dir = sync_dir or SYNC_DIR
+        self.sync = None
+        self._syncing = False
+        if sync_dir:
+            self.sync = SyncEngine(sync_dir, os.path.join(data_dir, "sync_state.json"), SYNC_CHECKPOINT_ROUNDS)
+            self.tasks.add_listener(self.sync.on_records)
+        self._syncRound.connect(self._apply_sync)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.timeout.connect(self.sync_now)
 
         # 添加到主布局
         self.main_layout.addLayout(button_layout)
+        self.main_layout.addWidget(self.focus_widget)
         self.main_layout.addWidget(self.task_list)
 
+        # 提醒调度：只为最早的提醒时间设置一个单次定时器（定时器与托盘在首帧之后创建）
+        self.scheduler = ReminderScheduler()
+        self.timer = None
+        self.tray_icon = None
+        self.instance_server = None
+
+        # 提醒通知：排队合并、限流后交给托盘（后端在托盘创建时设置）
+        self.notifier = NotificationDispatcher(None, NOTIFY_WINDOW_MS / 1000, NOTIFY_INTERVAL_S, NOTIFY_BURST)
+        self.notify_timer = QTimer(self)
+        self.notify_timer.setSingleShot(True)
+        self.notify_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.notify_timer.timeout.connect(self.flush_notifications)
+
+        self.setup_metrics()
+
+        # 窗口显示后再分块加载任务数据
+        self.task_list.viewport().installEventFilter(self)
+        QTimer.singleShot(0, self.load_tasks)
+
+    def setup_metrics(self):
+        """开启统计时：界面卡顿检测、定期导出统计文件、调试浮层（Ctrl+Shift+D）；关闭时什么都不创建"""
+        self.watchdog = None
+        self.metrics_exporter = None
+        if not (METRICS_ENABLED or os.environ.get("TODO_METRICS") == "1"):
+            return
+
+        from views.DebugOverlay import DebugOverlay
+
+        metrics.enable()
+        self.watchdog = StallWatchdog(metrics, STALL_THRESHOLD_MS / 1000)
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(max(STALL_THRESHOLD_MS // 4, 10))
+        self.heartbeat_timer.timeout.connect(self.watchdog.beat)
+        self.heartbeat_timer.start()
+        self.watchdog.start()
+
+        self.metrics_exporter = MetricsExporter(metrics, METRICS_FILE, METRICS_DUMP_INTERVAL_S)
+        self.metrics_exporter.start()
+
+        self.debug_overlay = DebugOverlay(self)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.debug_overlay.toggle)
+
+    def finish_startup(self):
+        """首帧之后的初始化：托盘图标、提醒定时器；可重复调用"""
+        if self.timer is not None:
+            return
+
         # 托盘图标
         self.tray_icon = QSystemTrayIcon(QIcon(str(IMG_PATH / "todo.svg")), self)
         self.tray_icon.setToolTip("Todo List 正在后台运行")
@@ -96,14 +329,14 @@ class MainWindow(BackgroundAnimationWidget, FramelessWindow):
         tray_menu.addAction(Action('打开', triggered=self.show_window))
         tray_menu.addAction(Action('退出', triggered=self.quit_app))
         self.tray_icon.setContextMenu(tray_menu)
+        self.notifier.backend = TrayNotificationBackend(self.tray_icon)
 
-        # 定时器检查提醒
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.check_reminders)
-        self.timer.start(60 * 1000)
-
-        # 加载任务数据
-        self.load_tasks()
+        self.startupFinished.emit()
+        self.arm_reminder_timer()
 
     # ========== Mica 相关 ==========
     def isMicaEffectEnabled(self):
@@ -119,10 +352,27 @@ class MainWindow(BackgroundAnimationWidget, FramelessWindow):
         else:
             self.windowEffect.removeBackgroundEffect(self.winId())
 
+    def _on_theme_changed(self):
+        self._apply_mica()
+        self.task_list.viewport().update()
+
     def _apply_mica(self):
         if self._isMicaEnabled:
             self.windowEffect.setMicaEffect(self.winId(), isDarkTheme())
 
+    def _normalBackgroundColor(self):
+        """没有 Mica 时自行绘制背景（深色 / 浅色）"""
+        if self._isMicaEnabled:
+            return QColor(0, 0, 0, 0)
+        return self._darkBackgroundColor if isDarkTheme() else self._lightBackgroundColor
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        painter = QPainter(self)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.backgroundColor)
+        painter.drawRect(self.rect())
+
     # ✅ 伪造最大化（带恢复）
     def toggle_maximize(self):
         screen = self.screen().availableGeometry()
@@ -149,46 +399,491 @@ class MainWindow(BackgroundAnimationWidget, FramelessWindow):
 
     # ========== 任务相关 ==========
     def add_task_dialog(self):
+        from views.AddTaskBox import AddTaskBox
+
         dialog = AddTaskBox(self)
         if dialog.exec():
             text, remind_time, repeat = dialog.get_data()
             if text:
                 self.add_task(text, remind_time, repeat, done=False)
-                self.save_tasks()
 
+    @metrics.timed()
     def add_task(self, text, remind_time, repeat, done=False):
-        item = QListWidgetItem(self.task_list)
-        widget = TodoItemWidget(text, remind_time, repeat, done, save_callback=self.save_tasks)
-        item.setSizeHint(widget.sizeHint())
-        self.task_list.addItem(item)
-        self.task_list.setItemWidget(item, widget)
+        self.task_model.add_task(text, remind_time.toSecsSinceEpoch(), repeat, done)
+
+    def selected_rows(self):
+        """按选区范围展开行号，不逐个生成 QModelIndex"""
+        rows = []
+        for selection_range in self.task_list.selectionModel().selection():
+            rows.extend(range(selection_range.top(), selection_range.bottom() + 1))
+        return rows
+
+    def selected_ids(self):
+        """选中的任务 id（跳过范围选择中夹带的分组标题行）"""
+        tasks = (self.task_model.task_at(row) for row in self.selected_rows())
+        return [task.id for task in tasks if task is not None]
 
     def show_context_menu(self, pos: QPoint):
-        item = self.task_list.itemAt(pos)
-        if item is None and not self.task_list.selectedItems():
+        index = self.task_list.indexAt(pos)
+        task = self.task_model.task_at(index.row()) if index.isValid() else None
+        if task is None and not self.selected_ids():
             return
 
-        menu = RoundMenu()
-        delete_action = menu.addAction(Action(FluentIcon.DELETE, "删除选中任务"))
-        action = menu.exec(self.task_list.mapToGlobal(pos))
-        if action == delete_action:
-            self.delete_selected()
+        menu = RoundMenu(parent=self)
+        if task is not None:
+            menu.addAction(Action(FluentIcon.STOP_WATCH, "开始专注", triggered=lambda: self.start_focus(task.id)))
+        menu.addAction(Action(FluentIcon.DELETE, "删除选中任务", triggered=lambda: self.delete_selected()))
+        menu.addAction(Action(FluentIcon.ACCEPT, "标记为已完成", triggered=lambda: self.mark_selected(True)))
+        menu.addAction(Action(FluentIcon.CANCEL, "标记为未完成", triggered=lambda: self.mark_selected(False)))
+
+        reschedule_menu = RoundMenu("推迟", self)
+        reschedule_menu.setIcon(FluentIcon.HISTORY)
+        for text, delta in RESCHEDULE_OPTIONS:
+            reschedule_menu.addAction(Action(text, triggered=lambda _=False, d=delta: self.reschedule_selected(d)))
+        menu.addMenu(reschedule_menu)
+
+        repeat_menu = RoundMenu("重复", self)
+        repeat_menu.setIcon(FluentIcon.SYNC)
+        for repeat in REPEAT_OPTIONS:
+            repeat_menu.addAction(Action(repeat, triggered=lambda _=False, r=repeat: self.set_selected_repeat(r)))
+        menu.addMenu(repeat_menu)
+
+        menu.exec(self.task_list.mapToGlobal(pos))
 
+    def apply_filter(self):
+        """按搜索词和筛选条件隐藏不匹配的行（只重置一次模型，不重建控件）"""
+        with metrics.timer("apply_filter"):
+            ids = self.task_index.filter(self.search_edit.text(), self.filter_combo.currentText())
+            self.task_model.set_filter(ids)
+        self.task_list.updateSelectedRows()
+
+    # ========== 批量操作：一次模型更新，一次保存 ==========
+    @metrics.timed()
     def delete_selected(self):
-        for item in self.task_list.selectedItems():
-            row = self.task_list.row(item)
-            self.task_list.takeItem(row)
-        self.save_tasks()
+        self.task_model.remove_tasks(self.selected_ids())
+        self.task_list.updateSelectedRows()
+        self.submit_save()
+
+    @metrics.timed()
+    def mark_selected(self, done):
+        self.task_model.update_tasks((task_id, {"done": done}) for task_id in self.selected_ids())
+        self.submit_save()
+
+    @metrics.timed()
+    def reschedule_selected(self, delta: datetime.timedelta):
+        """按墙上时间把选中任务的提醒时间推迟 delta"""
+        changes = []
+        for task_id in self.selected_ids():
+            remind_at = datetime.datetime.fromtimestamp(self.tasks.get(task_id).remind_at) + delta
+            changes.append((task_id, {"remind_at": remind_at.timestamp()}))
+        self.task_model.update_tasks(changes)
+        self.submit_save()
+
+    @metrics.timed()
+    def set_selected_repeat(self, repeat):
+        self.task_model.update_tasks((task_id, {"repeat": repeat}) for task_id in self.selected_ids())
+        self.submit_save()
+
+    # ========== 专注 ==========
+    def start_focus(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is not None:
+            self.focus_widget.start(task.id, self._focus_title(task))
+
+    def _focus_title(self, task):
+        if task.focus_time_spent:
+            return f"{task.text}（已专注 {task.focus_time_spent} 分钟）"
+        return task.text
+
+    def load_focus_log(self):
+        threading.Thread(target=lambda: self._focusLoaded.emit(self.focus_log.load()), daemon=True).start()
+
+    def _on_focus_ended(self, session):
+        """专注结束：后台追加记录，完成时发出通知"""
+        task = self.tasks.get(session["task"])
+        if session["completed"] and task is not None:
+            self.notifier.push(("focus", task.id), "专注完成", f"{task.text}：本次专注 {session['seconds'] // 60} 分钟")
+            self.arm_notify_timer()
+
+        def run():
+            try:
+                total = self.focus_log.append_session(session)
+            except OSError as e:
+                print("保存专注记录失败:", e)
+                return
+            self._focusLoaded.emit({session["task"]: total})
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _apply_focus_time(self, seconds):
+        for task_id, total in seconds.items():
+            task = self.tasks.get(task_id)
+            if task is not None:
+                task.focus_time_spent = total // 60
+        task = self.tasks.get(self.focus_widget.timer.task_id)
+        if task is not None:
+            self.focus_widget.set_task_text(self._focus_title(task))
+
+    # ========== 统计 ==========
+    def record_completions(self, records):
+        """本机的完成写入完成记录；同步 / 外部修改带来的完成只用于归档计时（从看到它的时刻算起）"""
+        now = time.time()
+        for record in records:
+            if record["op"] == "done" and record["value"]:
+                self.completion_times.note(record["id"], now)
+        events = completion_events(records, now)
+        if events:
+            with self._completions_lock:
+                self._completions.extend(events)
+
+    def _take_completions(self):
+        with self._completions_lock:
+            events, self._completions = self._completions, []
+        return events
+
+    def _append_completions(self, events):
+        """写入完成记录；失败时放回待写列表的最前面，下次保存时按原顺序重试"""
+        try:
+            self.completion_log.append(events)
+        except OSError as e:
+            print("保存完成记录失败:", e)
+            with self._completions_lock:
+                self._completions[:0] = events
+            return False
+        return True
+
+    def write_completions(self, background=True):
+        events = self._take_completions()
+        if not events:
+            return
+
+        def run():
+            self._append_completions(events)
+
+        if background:
+            threading.Thread(target=run, name="completion-log", daemon=True).start()
+        else:
+            run()
 
+    def stats_dialog(self):
+        from core.stats import StatsManager
+        from views.StatsWindow import StatsWindow
+
+        if self.stats is None:
+            self.stats = StatsManager(self.focus_log.path, self.completion_log.path, self.stats_cache)
+        events = self._take_completions()
+
+        def refresh():
+            # 写入失败时记录已放回待写列表，本次统计暂不包含它们
+            if events:
+                self._append_completions(events)
+            self.stats.refresh()
+            return self.stats.summary()
+
+        def task_name(task_id):
+            task = self.tasks.get(task_id)
+            return task.text if task is not None else "（已删除或归档的任务）"
+
+        StatsWindow(refresh, task_name, self).exec()
+
+    # ========== 单实例 ==========
+    def start_instance_server(self, name):
+        """开始接受命令行与再次启动的 main.py 的请求；已有实例在监听时返回 False"""
+        from views.InstanceServer import InstanceServer
+
+        self.instance_server = InstanceServer(name, self.handle_request, self)
+        if not self.instance_server.listen():
+            self.instance_server = None
+            return False
+        if self._tasks_loaded:
+            self.instance_server.set_ready()
+        return True
+
+    def handle_request(self, request):
+        if request.get("cmd") == "show":
+            self.show_window()
+            return {"ok": True}
+        response = execute(self.tasks, request, self.task_model.add_tasks, self.task_model.update_tasks)
+        if response["ok"] and request.get("cmd") != "list":
+            self.submit_save()
+        return response
+
+    # ========== 外部修改 ==========
+    def setup_file_watcher(self):
+        path = self.store.watch_path()
+        if path is None:
+            return
+        self.file_watcher = QFileSystemWatcher(self)
+        # 同时监视目录：原子替换（rename）后文件监视会失效，需要重新添加
+        self.file_watcher.addPath(os.path.dirname(os.path.abspath(path)))
+        if os.path.exists(path):
+            self.file_watcher.addPath(path)
+        self.file_watcher.fileChanged.connect(self.external_timer.start)
+        self.file_watcher.directoryChanged.connect(self.external_timer.start)
+
+    def check_external_change(self):
+        """数据文件的签名与上次读取 / 写入时不同时，后台读取并合并"""
+        if self.file_watcher is None:
+            return
+        path = self.store.watch_path()
+        if os.path.exists(path) and path not in self.file_watcher.files():
+            self.file_watcher.addPath(path)
+        if not self._tasks_loaded or self._merging:
+            return
+        signature = file_signature(path)
+        if signature is None or signature in (self.store.snapshot_signature(), self._rejected_signature):
+            return
+
+        self._merging = True
+
+        def run():
+            # 无论成功与否都要发出信号，_merge_external 会清除 _merging
+            try:
+                signature, tasks = read_snapshot(path)
+            except OSError as e:
+                print("读取外部修改失败:", e)
+                signature, tasks = None, None
+            except Exception as e:
+                # 内容无效：这一版文件不再重试，等它再次被修改
+                print("外部修改的内容无效，未合并:", e)
+                signature, tasks = file_signature(path), None
+            self._externalRead.emit(signature, tasks)
+
+        threading.Thread(target=run, name="external-change", daemon=True).start()
+
+    def _merge_external(self, signature, tasks):
+        self._merging = False
+        if tasks is None and signature is not None:
+            self._rejected_signature = signature
+            return
+        if signature is None or signature != file_signature(self.store.watch_path()):
+            # 读取期间文件又被修改（或内容不完整），稍后再读
+            self.external_timer.start()
+            return
+
+        with metrics.timer("merge_external"):
+            added, changes, removed = merge_external(self.tasks, tasks, self.store.local_edits())
+            if changes:
+                self.task_model.update_tasks(changes, remote=True)
+            if removed:
+                self.task_model.remove_tasks(removed)
+                self.task_list.updateSelectedRows()
+            if added:
+                self.task_model.add_tasks([Task.from_dict(item) for item in added])
+
+        # 之后以外部文件为快照；合并产生的记录写入日志后压缩，磁盘上即为合并结果
+        self.store.adopt_snapshot(signature)
+        self.submit_save()
+        self.store.compact()
+        self.externalMerged.emit(len(added), len(changes), len(removed))
+
+    # ========== 同步 ==========
+    def sync_now(self):
+        """后台线程进行一轮同步；本地任务先写盘，检查点才会认为上一轮的结果已合并"""
+        if self.sync is None or self._syncing or not self._tasks_loaded:
+            return
+        self._syncing = True
+
+        def run():
+            try:
+                # 上一轮应用的结果没能写盘时不进行这一轮，免得检查点把它们当作已合并
+                winners = self.sync.sync_round() if self.store.wait() else None
+            except OSError as e:
+                print("同步失败:", e)
+                winners = None
+            self._syncRound.emit(winners)
+
+        threading.Thread(target=run, name="task-sync", daemon=True).start()
+
+    def _apply_sync(self, winners):
+        self._syncing = False
+        if winners:
+            with metrics.timer("apply_sync"):
+                added, changes, removed = resolve(self.tasks, winners, self.sync.pending_fields())
+                with self.sync.applying():
+                    if changes:
+                        self.task_model.update_tasks(changes, remote=True)
+                    if removed:
+                        self.task_model.remove_tasks(removed)
+                        self.task_list.updateSelectedRows()
+                    if added:
+                        self.task_model.add_tasks([Task.from_dict(item) for item in added])
+            self.submit_save()
+            self.syncMerged.emit(len(added), len(changes), len(removed))
+        if winners is not None:
+            self.sync.applied()
+        if self.sync.is_new():
+            # 首次加入同步：其他设备还没有的本地任务随下一轮发出
+            self.sync.publish(self.tasks)
+        # 同步期间的本地修改尽快发出
+        self.sync_timer.start(SYNC_DEBOUNCE_MS if self.sync.pending_fields() else SYNC_INTERVAL_S * 1000)
+
+    def request_sync(self):
+        """本地有修改：稍后同步一轮（不推迟已经更早安排的同步）"""
+        if self.sync is None or self._syncing:
+            return
+        remaining = self.sync_timer.remainingTime()
+        if remaining < 0 or remaining > SYNC_DEBOUNCE_MS:
+            self.sync_timer.start(SYNC_DEBOUNCE_MS)
+
+    # ========== 归档 ==========
+    def archive_done_tasks(self):
+        """把完成已超过 archive_after_days 天的任务写入归档（后台线程），写完后移出任务列表
+
+        完成时间取完成记录（completions.jsonl 与本次运行中的完成）中最近的一次；
+        提醒时间更晚时以提醒时间为准，没有完成记录的任务（有完成日志之前完成的）只看提醒时间。
+        """
+        if self.archive_after_days <= 0 or self._archiving:
+            return
+        cutoff = time.time() - self.archive_after_days * 86400
+        candidates = [{"id": task.id, **task.to_dict()} for task in self.tasks
+                      if task.done and task.remind_at < cutoff and task.id not in self._restored_ids]
+        if not candidates:
+            return
+
+        self._archiving = True
+
+        def run():
+            try:
+                self.completion_times.refresh()
+                tasks = [task for task in candidates if (self.completion_times.get(task["id"]) or 0) < cutoff]
+                self.archive.append(tasks)
+            except Exception as e:
+                print("归档任务失败:", e)
+                self._archiveWritten.emit([])
+                return
+            self._archiveWritten.emit([task["id"] for task in tasks])
+
+        threading.Thread(target=run, name="task-archive", daemon=True).start()
+
+    def _on_archive_written(self, task_ids):
+        """归档已落盘：移出仍是完成状态的任务；期间被改回未完成的任务从归档中撤销"""
+        self._archiving = False
+        archived, reverted = [], []
+        for task_id in task_ids:
+            task = self.tasks.get(task_id)
+            if task is not None and task.done:
+                archived.append(task_id)
+            else:
+                reverted.append(task_id)
+        if reverted:
+            threading.Thread(target=self.archive.restore, args=(reverted,), name="task-archive", daemon=True).start()
+        if archived:
+            self.task_model.remove_tasks(archived, archived=True)
+            self.task_list.updateSelectedRows()
+            self.submit_save()
+        self.archiveFinished.emit(len(archived))
+
+    def archive_dialog(self):
+        from views.ArchiveDialog import ArchiveDialog
+
+        dialog = ArchiveDialog(self.archive, self)
+        if dialog.exec():
+            self.restore_archived(dialog.selected_entries())
+
+    def restore_archived(self, entries):
+        """把归档中的任务移回任务列表：先保存到存储，再在归档中登记恢复"""
+        tasks = [Task.from_dict(entry) for entry in entries]
+        if not tasks:
+            return
+        self.task_model.add_tasks(tasks)
+        self.submit_save()
+        task_ids = [task.id for task in tasks]
+        self._restored_ids.update(task_ids)
+
+        def run():
+            # 任务写入存储后才登记恢复，中途退出时任务至多在两处各有一份，不会丢失；
+            # 写盘失败时保留归档中的副本
+            if not self.store.wait():
+                return
+            try:
+                self.archive.restore(task_ids)
+            except Exception as e:
+                print("恢复归档任务失败:", e)
+
+        threading.Thread(target=run, name="task-archive", daemon=True).start()
+
+    def update_reminders(self, records):
+        """任务增删改时增量更新调度堆"""
+        for record in records:
+            task = self.tasks.get(record["id"])
+            if task is None:
+                self.scheduler.cancel(record["id"])
+            else:
+                self.scheduler.schedule(task.id, task.deadline())
+            # 已删除或已完成的任务不再弹出尚在排队的提醒
+            if task is None or task.done:
+                self.notifier.discard(record["id"])
+        self.arm_reminder_timer()
+
+    def arm_reminder_timer(self):
+        if self.timer is None:
+            return
+        deadline = self.scheduler.next_deadline()
+        if deadline is None:
+            self.timer.stop()
+            return
+        # 最长等待一小时后重新计算，应对系统时间调整或休眠
+        delay = min(max(deadline - time.time(), 0), 3600)
+        self.timer.start(int(delay * 1000))
+
+    @metrics.timed()
     def check_reminders(self):
-        for i in range(self.task_list.count()):
-            item = self.task_list.item(i)
-            widget = self.task_list.itemWidget(item)
-            if widget:
-                widget.check_reminder(self.tray_icon)
+        now = datetime.datetime.now()
+        changes = []
+        for task_id in self.scheduler.pop_due(now.timestamp()):
+            task = self.tasks.get(task_id)
+            if task is None:
+                continue
+
+            # 直接算出下一个晚于现在的时间，错过的多个周期只合并提醒一次
+            start = datetime.datetime.fromtimestamp(task.remind_at)
+            next_time, missed = next_occurrence(start, task.repeat, now)
+            if missed > 1:
+                message = f"{task.text} 已错过 {missed} 次提醒"
+            else:
+                message = f"{task.text} 时间到了！"
+            self.notifier.push(task_id, "待办提醒", message)
+
+            if next_time is not None:
+                changes.append((task_id, {"remind_at": next_time.timestamp()}))
+            else:
+                self.tasks.set_notified(task_id)
+
+        # 所有到期的重复任务合并为一次模型更新
+        if changes:
+            self.task_model.update_tasks(changes)
+        self.arm_reminder_timer()
+        self.arm_notify_timer()
+
+    # ========== 日期 ==========
+    def arm_day_timer(self):
+        """在下一个零点检查日期；最长等待一小时后重新计算，应对系统时间调整或休眠"""
+        now = datetime.datetime.now()
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        self.day_timer.start(int(min((midnight - now).total_seconds(), 3600) * 1000) + 1)
+
+    def check_day(self):
+        """日期变化时刷新日期，任务分组整段移动（不重建列表）"""
+        now = datetime.datetime.now()
+        self.date_label.setText(now.strftime(DATE_FORMAT))
+        self.task_model.roll_over(now)
+        self.arm_day_timer()
+
+    def arm_notify_timer(self):
+        delay = self.notifier.next_delay()
+        if delay is None:
+            self.notify_timer.stop()
+        else:
+            self.notify_timer.start(math.ceil(delay * 1000))
+
+    def flush_notifications(self):
+        self.notifier.flush()
+        self.arm_notify_timer()
 
     # ========== 窗口事件 ==========
     def closeEvent(self, event):
+        self.finish_startup()
         self.save_tasks()
         w = MessageBox("最小化到托盘", "程序会继续在后台运行，是否最小化到托盘", self)
         w.yesButton.setText('确认')
@@ -207,32 +902,118 @@ class MainWindow(BackgroundAnimationWidget, FramelessWindow):
         self.activateWindow()
 
     def quit_app(self):
+        if self.instance_server is not None:
+            self.instance_server.close()
+        session = self.focus_widget.timer.stop()
+        if session is not None:
+            try:
+                self.focus_log.append_session(session)
+            except OSError as e:
+                print("保存专注记录失败:", e)
         self.save_tasks()
+        if self.sync is not None:
+            try:
+                self.sync.flush()
+            except OSError as e:
+                print("同步失败:", e)
+        self.store.close()
+        if self.metrics_exporter is not None:
+            self.watchdog.stop()
+            self.metrics_exporter.stop()
         QApplication.quit()
 
+    def mark_dirty(self, records):
+        """登记变更记录，重新开始防抖计时"""
+        self.store.record(records)
+        metrics.gauge("tasks", len(self.tasks))
+        self.save_timer.start()
+
+    @metrics.timed()
+    def submit_save(self):
+        """把记录交给后台线程，不在界面线程做任何磁盘 I/O"""
+        self.save_timer.stop()
+        self.store.commit()
+        self.write_completions()
+        self.request_sync()
+
+    @metrics.timed()
     def save_tasks(self):
-        tasks = []
-        for i in range(self.task_list.count()):
-            item = self.task_list.item(i)
-            widget = self.task_list.itemWidget(item)
-            if widget:
-                tasks.append(widget.to_dict())
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(tasks, f, ensure_ascii=False, indent=2)
+        """立即保存并等待写盘完成（关闭、退出时调用）"""
+        self.save_timer.stop()
+        self.store.flush()
+        self.write_completions(background=False)
 
-    def load_tasks(self):
-        if not os.path.exists(DATA_FILE):
+    def _on_save_error(self, message):
+        """写盘失败：修改保留在存储的重试队列中，提示一次并定时重试；恢复后再提示"""
+        if message is None:
+            if self._save_error_bar is not None:
+                self._save_error_bar.close()
+                self._save_error_bar = None
+                InfoBar.success("任务已保存", "之前未能写入的修改已经保存", duration=3000, parent=self)
             return
-        try:
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                tasks = json.load(f)
-            for task in tasks:
-                dt = QDateTime.fromString(task["remind_time"], "yyyy-MM-dd HH:mm:ss")
-                if not dt.isValid():
-                    dt = QDateTime.currentDateTime()
-                self.add_task(task["text"], dt, task.get("repeat", "不重复"), task.get("done", False))
-        except Exception as e:
-            print("加载任务失败:", e)
+        if self._save_error_bar is None:
+            self._save_error_bar = InfoBar.error("保存任务失败", f"{message}\n修改仍保留在内存中，稍后自动重试",
+                                                 duration=-1, parent=self)
+        QTimer.singleShot(SAVE_RETRY_MS, self.store.commit)
+
+    def load_tasks(self):
+        """后台线程流式解析，分块插入列表，完成后发出 loadingFinished"""
+        self._load_started = time.perf_counter()
+        self.loader = TaskLoader(self.store, LOAD_FIRST_CHUNK, LOAD_CHUNK_SIZE, self)
+        self.loader.chunkLoaded.connect(self._on_tasks_loaded)
+        self.loader.failed.connect(lambda e: print("加载任务失败:", e))
+        self.loader.finished.connect(self.loadingFinished)
+        self.loader.finished.connect(self._on_loading_finished)
+        self.loader.start()
+
+    @metrics.timed("load_chunk")
+    def _on_tasks_loaded(self, tasks):
+        # 新任务可能插在可见行之前：已经滚动过的列表保持顶部的行不动
+        top = None
+        if self.task_list.verticalScrollBar().value() > 0:
+            top = QPersistentModelIndex(self.task_list.indexAt(QPoint(0, 0)))
+        self.task_model.append_tasks(tasks)
+        if top is not None and top.isValid():
+            self.task_list.scrollTo(self.task_model.index(top.row()), QAbstractItemView.ScrollHint.PositionAtTop)
+        self.task_index.add_tasks(tasks)
+        for task in tasks:
+            self.scheduler.schedule(task.id, task.deadline())
+        self.arm_reminder_timer()
+
+    def _on_loading_finished(self):
+        metrics.observe("load_tasks", time.perf_counter() - self._load_started)
+        metrics.gauge("tasks", len(self.tasks))
+        # 加载过程中已经开始搜索时，用完整数据重新筛选一次
+        if self.task_model.is_filtered():
+            self.apply_filter()
+        # 空闲时分批建立搜索索引
+        self.index_timer.start()
+        # 加载期间数据文件被外部修改时，现在合并
+        self._tasks_loaded = True
+        self.check_external_change()
+        if self.instance_server is not None:
+            self.instance_server.set_ready()
+        self.archive_done_tasks()
+        self.archive_timer.start()
+        self.load_focus_log()
+        self.sync_now()
+
+    def _index_step(self):
+        if self.task_index.index_pending():
+            self.index_timer.stop()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and obj is self.task_list.viewport():
+            # 首帧：之后再做托盘等不影响首屏的初始化
+            if self.first_frame_ms is None:
+                self.first_frame_ms = (time.perf_counter() - self._start_time) * 1000
+                self.firstFrame.emit(self.first_frame_ms)
+                QTimer.singleShot(0, self.finish_startup)
+            # 记录首屏（含任务）绘制耗时
+            if self.first_paint_ms is None and self.task_model.task_count() > 0:
+                self.first_paint_ms = (time.perf_counter() - self._start_time) * 1000
+                self.firstPainted.emit(self.first_paint_ms)
+        return super().eventFilter(obj, event)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -241,3 +1022,6 @@ class MainWindow(BackgroundAnimationWidget, FramelessWindow):
     def changeEvent(self, event):
         super().changeEvent(event)
         self._apply_mica()
+        # 最小化时停止计时器的显示刷新，恢复时重新开始
+        if event.type() == QEvent.Type.WindowStateChange and self.focus_widget is not None:
+            self.focus_widget.arm_refresh()
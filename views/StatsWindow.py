@@ -0,0 +1,84 @@
+import threading
+
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtGui import QFont
+from qfluentwidgets import MessageBoxBase, SubtitleLabel, StrongBodyLabel, BodyLabel
+
+from config import FOCUS_MINUTES
+
+WEEKDAYS = "一二三四五六日"
+# 趋势条的最大长度（字符）
+BAR_WIDTH = 24
+
+
+def format_minutes(seconds):
+    return f"{seconds // 60} 分钟"
+
+
+class StatsWindow(MessageBoxBase):
+    """专注统计：今日专注、最近 7 天趋势、任务专注时间排名
+
+    refresh() 在后台线程中调用（读入新增记录、更新按天汇总），返回 StatsManager.summary()；
+    task_name(task_id) 返回排名中显示的任务名。
+    """
+
+    _summaryReady = pyqtSignal(object)
+
+    def __init__(self, refresh, task_name, parent=None):
+        super().__init__(parent)
+        self.task_name = task_name
+
+        self.titleLabel = SubtitleLabel('专注统计')
+        self.today_label = StrongBodyLabel('正在统计...')
+        self.week_label = BodyLabel()
+        self.week_label.setFont(QFont("Consolas", 10))
+        self.ranking_label = BodyLabel()
+
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(self.today_label)
+        self.viewLayout.addWidget(StrongBodyLabel('最近 7 天'))
+        self.viewLayout.addWidget(self.week_label)
+        self.viewLayout.addWidget(StrongBodyLabel('任务专注时间排名'))
+        self.viewLayout.addWidget(self.ranking_label)
+
+        self.widget.setMinimumWidth(480)
+        self.yesButton.setText('关闭')
+        self.cancelButton.hide()
+
+        self._summaryReady.connect(self._show_summary)
+
+        def run():
+            try:
+                summary = refresh()
+            except Exception as e:
+                print("统计失败:", e)
+                summary = None
+            try:
+                self._summaryReady.emit(summary)
+            except RuntimeError:    # 对话框已关闭
+                pass
+
+        threading.Thread(target=run, name="focus-stats", daemon=True).start()
+
+    def _show_summary(self, summary):
+        if summary is None:
+            self.today_label.setText('统计失败')
+            return
+
+        today = summary["today"]
+        self.today_label.setText(f"今日专注：{today['pomodoros']} 番茄钟（{format_minutes(today['focus_seconds'])}），"
+                                 f"完成 {today['completed']} 个任务")
+
+        peak = max((day["focus_seconds"] for _, day in summary["week"]), default=0) or FOCUS_MINUTES * 60
+        lines = []
+        for date, day in summary["week"]:
+            bar = "█" * round(BAR_WIDTH * day["focus_seconds"] / peak)
+            lines.append(f"{date:%m-%d} 周{WEEKDAYS[date.weekday()]}  {bar:<{BAR_WIDTH}} "
+                         f"{day['focus_seconds'] // 60:>4} 分钟  完成 {day['completed']}")
+        self.week_label.setText("\n".join(lines))
+
+        ranking = [f"{i}. {self.task_name(task_id)}  {format_minutes(seconds)}"
+                   for i, (task_id, seconds) in enumerate(summary["ranking"], 1)]
+        total = summary["total"]
+        ranking.append(f"累计专注 {format_minutes(total['focus_seconds'])}，{total['pomodoros']} 个番茄钟")
+        self.ranking_label.setText("\n".join(ranking))
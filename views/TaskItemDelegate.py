@@ -0,0 +1,133 @@
+import time
+
+from PyQt6.QtCore import Qt, QRect, QRectF, QSize, QEvent, QModelIndex, QDateTime
+from PyQt6.QtGui import QPainter
+from PyQt6.QtWidgets import QStyleOptionViewItem
+from qfluentwidgets import FluentIcon
+from qfluentwidgets.components.widgets.list_view import ListItemDelegate
+
+from qss.theme import theme_engine
+from views.TaskListModel import TaskListModel
+from views.TodoItemWidget import TodoItemWidget
+
+ROW_HEIGHT = 48
+CHECKBOX_X = 15
+CHECKBOX_SIZE = 19
+INFO_WIDTH = 230
+CHEVRON_SIZE = 12
+
+
+class TaskItemDelegate(ListItemDelegate):
+    """待办事项委托：只绘制可见行，编辑时才创建 TodoItemWidget
+
+    分组标题行绘制组名与任务数，点击折叠 / 展开。
+    字体与颜色使用主题引擎中共享的对象，切换主题后视图重绘一次即可。
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.theme = theme_engine()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def initStyleOption(self, option: QStyleOptionViewItem, index: QModelIndex):
+        super().initStyleOption(option, index)
+        # 文字与勾选框由 paint 自行绘制
+        option.text = ""
+        option.features &= ~QStyleOptionViewItem.ViewItemFeature.HasCheckIndicator
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        header = index.data(TaskListModel.HeaderRole)
+        if header is not None:
+            self.paint_header(painter, option.rect, *header)
+            return
+
+        rect = QRect(option.rect)
+        super().paint(painter, option, index)
+
+        task = index.data(TaskListModel.TaskRole)
+        done = task.done
+        theme = self.theme
+        textColor = theme.muted_color if done else theme.text_color
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+
+        # 提醒时间与重复周期（右侧，逾期未完成时使用逾期颜色）
+        info_rect = QRect(rect.right() - INFO_WIDTH - 10, rect.y(), INFO_WIDTH, rect.height())
+        info = f"提醒: {time.strftime('%Y-%m-%d %H:%M', time.localtime(task.remind_at))}    重复: {task.repeat}"
+        painter.setFont(theme.info_font)
+        painter.setPen(theme.overdue_color if not done and task.remind_at <= time.time() else textColor)
+        painter.drawText(info_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight, info)
+
+        # 任务文字（勾选后变灰并加删除线）
+        text_x = rect.x() + CHECKBOX_X + CHECKBOX_SIZE + 12
+        text_rect = QRect(text_x, rect.y(), info_rect.x() - text_x - 10, rect.height())
+        painter.setFont(theme.done_font if done else theme.text_font)
+        painter.setPen(textColor)
+        text = painter.fontMetrics().elidedText(task.text, Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+
+        painter.restore()
+
+    def paint_header(self, painter: QPainter, rect: QRect, name, count, collapsed):
+        """分组标题：折叠箭头、组名、任务数"""
+        theme = self.theme
+        painter.save()
+        painter.setRenderHints(QPainter.RenderHint.TextAntialiasing | QPainter.RenderHint.Antialiasing)
+
+        icon = FluentIcon.CHEVRON_RIGHT_MED if collapsed else FluentIcon.CHEVRON_DOWN_MED
+        icon.render(painter, QRectF(rect.x() + CHECKBOX_X + (CHECKBOX_SIZE - CHEVRON_SIZE) / 2,
+                                    rect.center().y() - CHEVRON_SIZE / 2, CHEVRON_SIZE, CHEVRON_SIZE))
+
+        text_x = rect.x() + CHECKBOX_X + CHECKBOX_SIZE + 12
+        painter.setFont(theme.header_font)
+        painter.setPen(theme.text_color)
+        text_rect = QRect(text_x, rect.y(), rect.width() - text_x, rect.height())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, name)
+
+        count_x = text_x + painter.fontMetrics().horizontalAdvance(name) + 10
+        painter.setFont(theme.info_font)
+        painter.setPen(theme.muted_color)
+        painter.drawText(QRect(count_x, rect.y(), rect.width() - count_x, rect.height()),
+                         Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, str(count))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        """点击勾选框直接切换完成状态，无需打开编辑器；点击分组标题折叠 / 展开"""
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            if index.data(TaskListModel.HeaderRole) is not None:
+                model.toggle_group(index.data(TaskListModel.GroupRole))
+                return True
+            rect = option.rect
+            box = QRectF(rect.x() + CHECKBOX_X, rect.center().y() - CHECKBOX_SIZE / 2,
+                         CHECKBOX_SIZE, CHECKBOX_SIZE).adjusted(-4, -4, 4, 4)
+            if box.contains(event.position()):
+                model.setData(index, not index.data(TaskListModel.DoneRole), TaskListModel.DoneRole)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    # ========== 编辑器 ==========
+    def createEditor(self, parent, option, index):
+        task = index.data(TaskListModel.TaskRole)
+        editor = TodoItemWidget(task.text, QDateTime.fromSecsSinceEpoch(task.remind_at), task.repeat, task.done,
+                                parent=parent)
+        # 编辑时实时提交到模型
+        editor.save_callback = lambda: self.commitData.emit(editor)
+        return editor
+
+    def setEditorData(self, editor: TodoItemWidget, index):
+        task = index.data(TaskListModel.TaskRole)
+        editor.set_data(task.text, QDateTime.fromSecsSinceEpoch(task.remind_at), task.repeat, task.done)
+
+    def setModelData(self, editor: TodoItemWidget, model, index):
+        """所有字段一次提交：修改后行可能移到别处，index 随之失效，不能逐个字段 setData"""
+        task = model.task_at(index.row())
+        if task is None:
+            return
+        model.update_task(task.id, text=editor.text_edit.text(), remind_at=editor.remind_time().toSecsSinceEpoch(),
+                          repeat=editor.repeat_combo.currentText(), done=editor.checkbox.isChecked())
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
@@ -0,0 +1,443 @@
+import datetime
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QDateTime
+
+from core.groups import GROUP_NAMES, TaskGroups
+from core.tasks import TaskManager
+
+# 一次修改中需要换位置的任务超过该数量时不逐行移动，整体重新布局一次
+_BULK_MOVES = 64
+
+
+class TaskListModel(QAbstractListModel):
+    """任务列表模型：TaskManager 的分组视图，修改经由模型转发给 TaskManager
+
+    行按组排列（见 core/groups.py）：每组一个标题行，之后是组内按提醒时间排序的任务，
+    折叠的组只有标题行。任务修改后只把它自己的行移到新位置（beginMoveRows），
+    跨过零点时各组之间整段移动，都不重置模型。
+    筛选时显示一份只含匹配任务的分组，完整分组同步维护，取消筛选时直接换回。
+    """
+
+    RemindTimeRole = Qt.ItemDataRole.UserRole + 1   # epoch 秒
+    RepeatRole = Qt.ItemDataRole.UserRole + 2
+    DoneRole = Qt.ItemDataRole.UserRole + 3
+    IdRole = Qt.ItemDataRole.UserRole + 4
+    TaskRole = Qt.ItemDataRole.UserRole + 5
+    GroupRole = Qt.ItemDataRole.UserRole + 6        # 行所在的组
+    HeaderRole = Qt.ItemDataRole.UserRole + 7       # 标题行：(组名, 任务数, 是否折叠)，任务行为 None
+
+    _FIELDS = {
+        Qt.ItemDataRole.EditRole: "text",
+        RemindTimeRole: "remind_at",
+        RepeatRole: "repeat",
+        DoneRole: "done",
+    }
+
+    def __init__(self, manager: TaskManager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.groups = TaskGroups()     # 全部任务
+        self._shown = self.groups      # 显示的分组，筛选时只含匹配的任务
+        self._filter = None            # 筛选出的任务 id，None 表示不筛选
+        self.collapsed = set()
+
+    # ========== 行号 ==========
+    def _size(self, group):
+        return 0 if group in self.collapsed else len(self._shown.groups[group])
+
+    def _row(self, group, index=-1):
+        """(组, 组内序号) -> 行号；序号 -1 为标题行，等于组长度时为下一组的标题行"""
+        row = 0
+        for g in range(group):
+            row += 1 + self._size(g)
+        return row + 1 + index
+
+    def _locate_row(self, row):
+        """行号 -> (组, 组内序号)，标题行的序号为 -1"""
+        for group in range(len(GROUP_NAMES)):
+            if row == 0:
+                return group, -1
+            row -= 1
+            size = self._size(group)
+            if row < size:
+                return group, row
+            row -= size
+        raise IndexError(row)
+
+    def task_at(self, row):
+        """行号 -> 任务，标题行返回 None"""
+        group, index = self._locate_row(row)
+        return None if index < 0 else self.manager.get(self._shown.task_id(group, index))
+
+    def task_count(self):
+        return len(self._shown)
+
+    # ========== 筛选 ==========
+    def is_filtered(self):
+        return self._filter is not None
+
+    def set_filter(self, task_ids):
+        """只显示 task_ids 中的任务（保持分组与顺序），None 取消筛选；只重置一次模型"""
+        if task_ids is not None and len(task_ids) >= len(self.manager):
+            task_ids = None
+        if task_ids is None and self._filter is None:
+            return
+
+        self.beginResetModel()
+        if task_ids is None:
+            self._filter = None
+            self._shown = self.groups
+        else:
+            self._filter = set(task_ids)
+            self._shown = self.groups.subset(self._filter)
+        self.endResetModel()
+
+    # ========== Qt 模型接口 ==========
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._row(len(GROUP_NAMES))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        group, position = self._locate_row(index.row())
+        if role == self.GroupRole:
+            return group
+        if position < 0:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return GROUP_NAMES[group]
+            if role == self.HeaderRole:
+                return GROUP_NAMES[group], len(self._shown.groups[group]), group in self.collapsed
+            return None
+
+        task = self.manager.get(self._shown.task_id(group, position))
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return task.text
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if task.done else Qt.CheckState.Unchecked
+        if role == self.RemindTimeRole:
+            return task.remind_at
+        if role == self.RepeatRole:
+            return task.repeat
+        if role == self.DoneRole:
+            return task.done
+        if role == self.IdRole:
+            return task.id
+        if role == self.TaskRole:
+            return task
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        task = self.task_at(index.row())
+        if task is None:
+            return False
+
+        if role == Qt.ItemDataRole.CheckStateRole:
+            role, value = self.DoneRole, Qt.CheckState(value) == Qt.CheckState.Checked
+        elif role == self.RemindTimeRole and isinstance(value, QDateTime):
+            value = value.toSecsSinceEpoch()
+
+        field = self._FIELDS.get(role)
+        if field is None:
+            return False
+
+        if self.manager.update(task.id, **{field: value}):
+            self._reposition([task.id])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self._locate_row(index.row())[1] < 0:
+            return Qt.ItemFlag.ItemIsEnabled
+        return (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable |
+                Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsUserCheckable)
+
+    # ========== 分组 ==========
+    def toggle_group(self, group):
+        """折叠 / 展开一组"""
+        size = len(self._shown.groups[group])
+        header = self._row(group)
+        if size:
+            if group in self.collapsed:
+                self.beginInsertRows(QModelIndex(), header + 1, header + size)
+            else:
+                self.beginRemoveRows(QModelIndex(), header + 1, header + size)
+        self.collapsed ^= {group}
+        if size:
+            if group in self.collapsed:
+                self.endRemoveRows()
+            else:
+                self.endInsertRows()
+        self._headers_changed(group)
+
+    def roll_over(self, now=None):
+        """日期变化后重新划分分组：各组之间整段移动行，不重置模型（系统时间被调回时才重置）"""
+        now = now or datetime.datetime.now()
+        if now.date() == self._shown.day:
+            return
+        if self._shown is not self.groups:
+            self._roll_over_silently(self.groups, now)
+
+        moves = self._shown.day_moves(now)
+        if moves is None:
+            self.beginResetModel()
+            if self._shown is self.groups:
+                self._roll_over_silently(self.groups, now)
+            else:
+                self._shown = self.groups.subset(self._filter)
+            self.endResetModel()
+            return
+        for source, count, target in moves:
+            self._move_block(source, count, target)
+        self._shown.set_day(now)
+
+    def _roll_over_silently(self, groups, now):
+        moves = groups.day_moves(now)
+        groups.set_day(now)
+        if moves is None:
+            groups.rebuild(self.manager)
+            return
+        for move in moves:
+            groups.move_block(*move)
+
+    def _move_block(self, source, count, target):
+        """source 组开头的 count 个任务移到 target 组末尾（target 在 source 之前）"""
+        source_visible = source not in self.collapsed
+        target_visible = target not in self.collapsed
+        first = self._row(source, 0)
+        end = self._row(target, len(self._shown.groups[target]))
+        if source_visible and target_visible:
+            self.beginMoveRows(QModelIndex(), first, first + count - 1, QModelIndex(), end)
+        elif source_visible:
+            self.beginRemoveRows(QModelIndex(), first, first + count - 1)
+        elif target_visible:
+            self.beginInsertRows(QModelIndex(), end, end + count - 1)
+
+        self._shown.move_block(source, count, target)
+
+        if source_visible and target_visible:
+            self.endMoveRows()
+        elif source_visible:
+            self.endRemoveRows()
+        elif target_visible:
+            self.endInsertRows()
+        self._headers_changed(source, target)
+
+    def _headers_changed(self, *groups):
+        """标题行显示组内任务数，组成员变化后刷新"""
+        for group in set(groups):
+            index = self.index(self._row(group))
+            self.dataChanged.emit(index, index)
+
+    # ========== 换位置 ==========
+    def _reposition(self, task_ids):
+        """任务字段修改后：位置不变的只刷新，位置变化的移到新位置；大量修改时整体重新布局一次"""
+        if len(task_ids) > _BULK_MOVES:
+            self._relayout([self.manager.get(task_id) for task_id in task_ids])
+            return
+
+        shown = self._shown
+        moved = []
+        unchanged = []
+        for task_id in task_ids:
+            task = self.manager.get(task_id)
+            position = shown.position(task_id)
+            if position is None:
+                # 筛选中被隐藏的任务
+                self.groups.move(task)
+            elif shown.locate(task) == position:
+                # 位置不变，也要更新组内记录的提醒时间
+                self._move_silently(task)
+                unchanged.append(task_id)
+            else:
+                moved.append(task)
+
+        for task in moved:
+            self._move(task)
+
+        rows = [row for row in (self.index_of(task_id).row() for task_id in unchanged) if row >= 0]
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+
+    def _move_silently(self, task):
+        if self._shown is not self.groups:
+            self.groups.move(task)
+        self._shown.move(task)
+
+    def _move(self, task):
+        """把一个任务的行移到按当前字段应处的位置（目标组折叠时为删除行，原组折叠时为插入行）"""
+        shown = self._shown
+        old_group, old_index = shown.position(task.id)
+        group, index = shown.locate(task)
+        if (group, index) == (old_group, old_index):
+            # 同一批中先移动的任务已经让出了位置
+            self._move_silently(task)
+            row = self.index_of(task.id)
+            if row.isValid():
+                self.dataChanged.emit(row, row)
+            return
+        source_visible = old_group not in self.collapsed
+        target_visible = group not in self.collapsed
+        source = self._row(old_group, old_index)
+        # 插入位置换算成移动前的行号
+        target = self._row(group, index + 1 if group == old_group and index >= old_index else index)
+
+        if source_visible and target_visible:
+            self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), target)
+        elif source_visible:
+            self.beginRemoveRows(QModelIndex(), source, source)
+        elif target_visible:
+            self.beginInsertRows(QModelIndex(), target, target)
+
+        self._move_silently(task)
+
+        if source_visible and target_visible:
+            self.endMoveRows()
+        elif source_visible:
+            self.endRemoveRows()
+        elif target_visible:
+            self.endInsertRows()
+        if group != old_group:
+            self._headers_changed(old_group, group)
+
+    def _move_many_silently(self, tasks):
+        if self._shown is not self.groups:
+            self.groups.move_many(tasks)
+            tasks = [task for task in tasks if task.id in self._shown]
+        self._shown.move_many(tasks)
+
+    def _relayout(self, tasks):
+        """大量任务修改：整体重新布局一次，选中与编辑中的行跟随各自的任务"""
+        if self.collapsed:
+            # 有折叠的组时行数会变化，只能重置
+            self.beginResetModel()
+            self._move_many_silently(tasks)
+            self.endResetModel()
+            return
+
+        self._change_layout(lambda: self._move_many_silently(tasks))
+
+    def _change_layout(self, change):
+        """执行 change 并通知视图整体重新布局一次（不重置模型）：
+        选中、当前行与编辑中的行跟随各自的任务，标题行跟随所在的组"""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        anchors = [self.data(index, self.IdRole) or self._locate_row(index.row())[0] for index in persistent]
+        change()
+        self.changePersistentIndexList(persistent, [
+            self.index_of(anchor) if isinstance(anchor, str) else self.index(self._row(anchor))
+            for anchor in anchors
+        ])
+        self.layoutChanged.emit()
+
+    # ========== 任务操作 ==========
+    def index_of(self, task_id):
+        position = self._shown.position(task_id)
+        if position is None or position[0] in self.collapsed:
+            return QModelIndex()
+        return self.index(self._row(*position))
+
+    def _insert(self, task):
+        """把已加入 manager 的任务插入分组；筛选中也显示"""
+        if self._shown is not self.groups:
+            self.groups.add(task)
+            self._filter.add(task.id)
+        group, index = self._shown.locate(task)
+        visible = group not in self.collapsed
+        if visible:
+            row = self._row(group, index)
+            self.beginInsertRows(QModelIndex(), row, row)
+        self._shown.add(task)
+        if visible:
+            self.endInsertRows()
+        self._headers_changed(group)
+
+    def add_task(self, text, remind_at, repeat, done=False):
+        """新任务插入到所在组的对应位置，筛选中也显示"""
+        task = self.manager.add(text, remind_at, repeat, done)
+        self._insert(task)
+        return task
+
+    def add_tasks(self, tasks):
+        """加入已有 id 的任务（从归档恢复、导入、同步），与 add_task 一样总是可见"""
+        added = self.manager.add_tasks(tasks)
+        if len(added) <= _BULK_MOVES:
+            for task in added:
+                self._insert(task)
+            return added
+
+        self.beginResetModel()
+        self.groups.extend(added)
+        if self._shown is not self.groups:
+            self._filter.update(task.id for task in added)
+            self._shown.extend(added)
+        self.endResetModel()
+        return added
+
+    def update_task(self, task_id, **fields):
+        if self.manager.update(task_id, **fields):
+            self._reposition([task_id])
+
+    def update_tasks(self, changes, remote=False):
+        """批量修改，changes 为 (task_id, 字段字典) 序列；位置不变的行只发出一次 dataChanged；
+        remote 见 TaskManager.update_many"""
+        changed_ids = self.manager.update_many(changes, remote)
+        self._reposition(changed_ids)
+        return changed_ids
+
+    def load(self, items):
+        """整体加载任务，只触发一次模型重置"""
+        self.beginResetModel()
+        self._filter = None
+        self._shown = self.groups
+        self.manager.load(items)
+        self.groups.rebuild(self.manager)
+        self.endResetModel()
+
+    def append_tasks(self, tasks):
+        """分块加载时加入一批任务：并入各组的有序位置；筛选中时新任务暂不显示
+
+        新任务散布在各组各处，逐段插入行的开销与已有行数成正比，这里整体重新布局一次，
+        不重置模型：加载过程中的选中、当前行和打开的编辑器都保留。
+        """
+        if not tasks:
+            return
+        self.manager.extend(tasks)
+        if self._shown is not self.groups:
+            self.groups.extend(tasks)
+            return
+        self._change_layout(lambda: self.groups.extend(tasks))
+
+    def remove_tasks(self, task_ids, archived=False):
+        """按 id 删除任务，筛选中被隐藏的任务也一并删除；archived 表示移入归档（见 TaskManager.remove_rows）；
+        少量且可见的行连续时直接删除，否则整体重置一次"""
+        task_ids = {task_id for task_id in task_ids if self.manager.get(task_id) is not None}
+        if not task_ids:
+            return
+
+        rows = []
+        if len(task_ids) <= _BULK_MOVES:
+            rows = sorted(row for row in (self.index_of(task_id).row() for task_id in task_ids) if row >= 0)
+        contiguous = len(task_ids) <= _BULK_MOVES and (not rows or rows[-1] - rows[0] + 1 == len(rows))
+        if not contiguous:
+            self.beginResetModel()
+        elif rows:
+            self.beginRemoveRows(QModelIndex(), rows[0], rows[-1])
+
+        self.manager.remove_rows((self.manager.row_of(task_id) for task_id in task_ids), archived)
+        self.groups.remove_many(task_ids)
+        if self._shown is not self.groups:
+            self._shown.remove_many(task_ids)
+            self._filter -= task_ids
+
+        if not contiguous:
+            self.endResetModel()
+            return
+        if rows:
+            self.endRemoveRows()
+        self._headers_changed(*range(len(GROUP_NAMES)))
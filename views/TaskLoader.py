@@ -0,0 +1,71 @@
+import queue
+import threading
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class TaskLoader(QObject):
+    """启动时的分块加载器
+
+    后台线程流式读取并解析任务，界面线程每次事件循环只插入一批，
+    中间让出事件循环，保证首屏先绘制、加载过程中窗口保持响应。
+    每次插入都会让列表重新布局一次（与总行数成正比），所以首批之后
+    批次大小逐次翻倍，布局次数只随任务数对数增长。
+    """
+
+    chunkLoaded = pyqtSignal(list)  # list[Task]
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    _chunkReady = pyqtSignal()
+
+    def __init__(self, store, first_size=50, chunk_size=2000, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.first_size = first_size
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue()
+        self._scheduled = False
+        self._chunkReady.connect(self._schedule)
+
+    def start(self):
+        threading.Thread(target=self._run, name="task-loader", daemon=True).start()
+
+    def _run(self):
+        batch, target = [], self.first_size
+        try:
+            for chunk in self.store.iter_tasks(self.first_size, self.chunk_size):
+                batch.extend(chunk)
+                if len(batch) >= target:
+                    self._queue.put(batch)
+                    self._chunkReady.emit()
+                    batch, target = [], max(self.chunk_size, target * 2)
+            if batch:
+                self._queue.put(batch)
+        except Exception as e:
+            self._queue.put(e)
+        self._queue.put(None)
+        self._chunkReady.emit()
+
+    def _schedule(self):
+        if not self._scheduled:
+            self._scheduled = True
+            QTimer.singleShot(0, self._deliver)
+
+    def _deliver(self):
+        self._scheduled = False
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            return
+
+        if item is None:
+            self.finished.emit()
+            return
+        if isinstance(item, Exception):
+            self.failed.emit(str(item))
+        else:
+            self.chunkLoaded.emit(item)
+
+        if not self._queue.empty():
+            self._schedule()
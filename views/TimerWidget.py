@@ -0,0 +1,124 @@
+import math
+
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QHBoxLayout, QWidget
+from qfluentwidgets import FluentIcon, StrongBodyLabel, TitleLabel, ToolButton
+
+
+def format_remaining(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class TimerWidget(QWidget):
+    """专注计时器控件：任务名、剩余时间、暂停 / 继续、停止；没有进行中的专注时隐藏
+
+    不逐秒轮询：剩余时间由 FocusTimer 按截止时间计算，刷新定时器只在可见且窗口
+    未最小化时、按显示的秒数变化的时刻单次触发；隐藏到托盘后只剩截止时间处的一次唤醒。
+    """
+
+    sessionEnded = pyqtSignal(dict)   # 一次专注结束（完成或中途停止）的记录，见 core/focus_timer.py
+
+    def __init__(self, timer, parent=None):
+        super().__init__(parent)
+        self.timer = timer
+
+        self.task_label = StrongBodyLabel()
+        self.time_label = TitleLabel(format_remaining(timer.duration))
+
+        self.pause_button = ToolButton(FluentIcon.PAUSE)
+        self.pause_button.setToolTip("暂停")
+        self.pause_button.clicked.connect(self.toggle_pause)
+
+        stop_button = ToolButton(FluentIcon.CLOSE)
+        stop_button.setToolTip("停止专注")
+        stop_button.clicked.connect(self.stop)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(10, 0, 0, 0)
+        layout.addWidget(self.task_label, 1)
+        layout.addWidget(self.time_label)
+        layout.addWidget(self.pause_button)
+        layout.addWidget(stop_button)
+
+        # 显示刷新：下一次秒数变化时
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        # 完成：截止时间处，不论是否可见
+        self.finish_timer = QTimer(self)
+        self.finish_timer.setSingleShot(True)
+        self.finish_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.finish_timer.timeout.connect(self._check_finish)
+
+        self.hide()
+
+    # ========== 控制 ==========
+    def start(self, task_id, text, duration=None):
+        session = self.timer.start(task_id, duration)
+        if session is not None:
+            self.sessionEnded.emit(session)
+        self.task_label.setText(text)
+        self.show()
+        self._arm()
+
+    def toggle_pause(self):
+        if self.timer.is_running():
+            self.timer.pause()
+        else:
+            self.timer.resume()
+        self._arm()
+
+    def stop(self):
+        session = self.timer.stop()
+        self._arm()
+        self.hide()
+        if session is not None:
+            self.sessionEnded.emit(session)
+
+    def set_task_text(self, text):
+        self.task_label.setText(text)
+
+    # ========== 定时 ==========
+    def _arm(self):
+        running = self.timer.is_running()
+        self.pause_button.setIcon(FluentIcon.PAUSE if running else FluentIcon.PLAY)
+        self.pause_button.setToolTip("暂停" if running else "继续")
+        if running:
+            self.finish_timer.start(math.ceil(self.timer.remaining() * 1000))
+        else:
+            self.finish_timer.stop()
+        self.refresh()
+
+    def refresh(self):
+        self.time_label.setText(format_remaining(self.timer.display_seconds()))
+        self.arm_refresh()
+
+    def arm_refresh(self):
+        """可见且窗口未最小化时安排下一次刷新，否则不刷新（重新显示时 showEvent 会补上）"""
+        delay = self.timer.next_tick_delay()
+        if delay is None or not self.isVisible() or self.window().isMinimized():
+            self.refresh_timer.stop()
+            return
+        self.refresh_timer.start(max(1, math.ceil(delay * 1000)))
+
+    def _check_finish(self):
+        session = self.timer.finish()
+        if session is None:
+            # 定时器早于截止时间触发，按剩余时间重新安排
+            if self.timer.is_running():
+                self.finish_timer.start(max(1, math.ceil(self.timer.remaining() * 1000)))
+            return
+        self._arm()
+        self.hide()
+        self.sessionEnded.emit(session)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
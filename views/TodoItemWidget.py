@@ -1,58 +1,45 @@
-from PyQt6.QtCore import QTime, QDate, QDateTime
-from PyQt6.QtWidgets import QWidget, QHBoxLayout, QSystemTrayIcon
+from PyQt6.QtCore import Qt, QTime, QDate, QDateTime
+from PyQt6.QtWidgets import QWidget, QHBoxLayout
 from qfluentwidgets import CheckBox, LineEdit, ComboBox, BodyLabel, TimePicker, CalendarPicker
 
+from core.recurrence import REPEAT_OPTIONS
+from qss.theme import theme_engine
+
 
 class TodoItemWidget(QWidget):
-    """每一行的待办事项控件"""
+    """待办事项编辑控件，只在编辑某一行时由委托创建"""
 
     def __init__(self, text, remind_time, repeat, done=False, parent=None, save_callback=None):
         super().__init__(parent)
 
-        self.notified = False
         self.save_callback = save_callback  # 传入保存函数
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground)   # 背景色见 qss/theme.py
 
         layout = QHBoxLayout(self)
         layout.setContentsMargins(5, 2, 5, 2)
 
         # 完成状态
         self.checkbox = CheckBox()
-        self.checkbox.setChecked(done)
         self.checkbox.stateChanged.connect(self.update_style)
         self.checkbox.stateChanged.connect(self.trigger_save)
 
-        # 任务文字（可编辑）
+        # 任务文字（可编辑），完成 / 逾期的样式由主题引擎按状态属性匹配
+        self.theme = theme_engine()
         self.text_edit = LineEdit()
-        self.text_edit.setText(text)
+        self.theme.style_editor(self.text_edit)
         self.text_edit.textChanged.connect(self.trigger_save)
 
         # 提醒时间
         self.time_edit = TimePicker()
         self.date_edit = CalendarPicker()
-
-        now = remind_time  # QDateTime
-
-        date = now.date()  # QDate
-        time = now.time()  # QTime
-
-        year = date.year()
-        month = date.month()
-        day = date.day()
-
-        hour = time.hour()
-        minute = time.minute()
-        second = time.second()
-
-        self.time_edit.setTime(QTime(hour, minute, second))
-        self.date_edit.setDate(QDate(year, month, day))
-
+        self.time_edit.timeChanged.connect(self.update_style)
+        self.date_edit.dateChanged.connect(self.update_style)
         self.time_edit.timeChanged.connect(self.trigger_save)
         self.date_edit.dateChanged.connect(self.trigger_save)
 
         # 重复周期
         self.repeat_combo = ComboBox()
-        self.repeat_combo.addItems(["不重复", "每天", "每周"])
-        self.repeat_combo.setCurrentText(repeat)
+        self.repeat_combo.addItems(REPEAT_OPTIONS)
         self.repeat_combo.currentTextChanged.connect(self.trigger_save)
 
         layout.addWidget(self.checkbox)
@@ -63,52 +50,52 @@ class TodoItemWidget(QWidget):
         layout.addWidget(BodyLabel("重复:"))
         layout.addWidget(self.repeat_combo)
 
+        self.set_data(text, remind_time, repeat, done)
+
+    def set_data(self, text, remind_time: QDateTime, repeat, done):
+        """填充控件，值未变化的控件不会被重新设置，避免编辑时光标跳动"""
+        callback, self.save_callback = self.save_callback, None
+
+        if self.checkbox.isChecked() != done:
+            self.checkbox.setChecked(done)
+        if self.text_edit.text() != text:
+            self.text_edit.setText(text)
+
+        date, time = remind_time.date(), remind_time.time()
+        time = QTime(time.hour(), time.minute(), time.second())
+        if self.date_edit.date != date:
+            self.date_edit.setDate(QDate(date.year(), date.month(), date.day()))
+        if self.time_edit.time != time:
+            self.time_edit.setTime(time)
+
+        if self.repeat_combo.currentText() != repeat:
+            if self.repeat_combo.findText(repeat) < 0:
+                # 数据文件中的自定义规则（如“每3天”）
+                self.repeat_combo.addItem(repeat)
+            self.repeat_combo.setCurrentText(repeat)
+
+        self.save_callback = callback
         self.update_style()
 
     def update_style(self):
-        """勾选后文字变灰并加删除线"""
-        font = self.text_edit.font()
-        font.setStrikeOut(self.checkbox.isChecked())
-        self.text_edit.setFont(font)
-
-        if self.checkbox.isChecked():
-            self.text_edit.setStyleSheet("color: gray;")
-        else:
-            self.text_edit.setStyleSheet("color: black;")
+        """勾选后文字变灰并加删除线，逾期未完成时使用逾期颜色"""
+        done = self.checkbox.isChecked()
+        overdue = not done and self.remind_time() <= QDateTime.currentDateTime()
+        self.text_edit.setFont(self.theme.done_font if done else self.theme.text_font)
+        self.theme.set_state(self.text_edit, done=done, overdue=overdue)
 
     def trigger_save(self):
-        """调用主窗口的保存函数"""
+        """调用保存函数（作为编辑器时由委托提交数据到模型）"""
         if self.save_callback:
             self.save_callback()
 
-    def check_reminder(self, tray_icon: QSystemTrayIcon):
-        if self.checkbox.isChecked():
-            return
-        current_time = QDateTime.currentDateTime()
-        remind_time = QDateTime(self.date_edit.date, self.time_edit.time)   # ✅ 修复
-        repeat = self.repeat_combo.currentText()
-        if current_time >= remind_time and not self.notified:
-            tray_icon.showMessage(
-                "待办提醒",
-                f"{self.text_edit.text()} 时间到了！",
-                QSystemTrayIcon.MessageIcon.Information,
-                5000
-            )
-            self.notified = True
-            if repeat == "每天":
-                self.date_edit.setDate(self.date_edit.date().addDays(1))
-                self.notified = False
-            elif repeat == "每周":
-                self.date_edit.setDate(self.date_edit.date().addDays(7))
-                self.notified = False
+    def remind_time(self):
+        return QDateTime(self.date_edit.date, self.time_edit.time)
 
     def to_dict(self):
-        date = self.date_edit.date # QDate
-        time = self.time_edit.time # QTime
-        remind_time = QDateTime(date, time)
         return {
             "text": self.text_edit.text(),
-            "remind_time": remind_time.toString("yyyy-MM-dd HH:mm:ss"),
+            "remind_time": self.remind_time().toString("yyyy-MM-dd HH:mm:ss"),
             "repeat": self.repeat_combo.currentText(),
             "done": self.checkbox.isChecked()
         }